@@ -1,14 +1,21 @@
 import json 
+import time
+from collections import defaultdict
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
 from langchain_core.runnables import RunnableSerializable
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable, Optional
+from utils.rate_limiter import RateLimitExceeded, estimate_tokens, get_limiter
 
 class CustomAgentExecutor:
-    def __init__(self, prompt, llm, tools, max_iterations: int = 5):
+    def __init__(self, prompt, llm, tools, max_iterations: int = 5, upstream: Optional[str] = "openai"):
         self.chat_history: List[BaseMessage] = []
+        # LLM calls draw on this shared rate limit (None disables, e.g. for stub models)
+        self.limiter = get_limiter(upstream) if upstream else None
         self.max_iterations = max_iterations
         self.name2tool = {tool.name: tool.func for tool in tools}
         self.tools = tools
+        self.tool_schema_tokens = estimate_tokens(*(getattr(tool, "openai_schema", "") for tool in tools))
+        self.last_run_stats: Dict[str, Any] = {}
 
         # Create agent with tools but don't force tool use
         self.agent: RunnableSerializable = (
@@ -18,33 +25,79 @@ class CustomAgentExecutor:
                 "agent_scratchpad": lambda x: x.get("agent_scratchpad", [])
             }
             | prompt
-            | llm.bind_tools(tools)  # Remove tool_choice="any" to allow flexibility
+            # Lazy tools bind by their stored schema so binding doesn't import them
+            | llm.bind_tools([getattr(tool, "openai_schema", tool) for tool in tools])  # Remove tool_choice="any" to allow flexibility
         )
 
-    def invoke(self, input_text: str) -> Dict[str, Any]:
+    def invoke(self, input_text: str, on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
         """
-        Invoke the agent and return the final answer.
+        Invoke the agent with this executor's own chat history and return the final answer.
         
         Args:
             input_text (str): User input
+            on_event: Optional callback receiving progress events
+                ({"type": "thinking" | "tool_start" | "tool_end", ...}) for streaming clients
             
         Returns:
             Dict[str, Any]: Dictionary containing the answer
         """
+        result = self.run(input_text, self.chat_history, on_event=on_event)
+        
+        # Update chat history
+        try:
+            self.chat_history.extend([
+                HumanMessage(content=input_text),
+                AIMessage(content=result["answer"])
+            ])
+        except Exception as e:
+            print(f"⚠️ Could not update chat history: {str(e)}")
+        
+        self.last_run_stats = result["stats"]
+        return {"answer": result["answer"]}
+
+    def run(self, input_text: str, chat_history: Optional[List[BaseMessage]] = None,
+            on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Stateless agent loop: answer input_text given the caller's chat history.
+        
+        Nothing on the executor is read or written per call, so one executor
+        can serve many sessions concurrently; callers own the history.
+        
+        Returns:
+            Dict[str, Any]: {"answer": str, "stats": run statistics}
+        """
+        chat_history = chat_history or []
         count = 0
         agent_scratchpad = []
         final_answer = None
+        started = time.perf_counter()
+        stats = {
+            "iterations": 0,
+            "llm_calls": 0,
+            "llm_seconds": 0.0,
+            "tool_calls": defaultdict(int),
+            "tool_seconds": defaultdict(float),
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        }
         
         try:
             while count < self.max_iterations:
                 print(f"\n--- Iteration {count + 1} ---")
+                self._emit(on_event, {"type": "thinking", "iteration": count + 1})
                 
                 # Invoke the agent
-                response = self.agent.invoke({
+                llm_started = time.perf_counter()
+                response, (prompt_tokens, completion_tokens) = self._invoke_agent({
                     "input": input_text,
-                    "chat_history": self.chat_history,
+                    "chat_history": chat_history,
                     "agent_scratchpad": agent_scratchpad
                 })
+                stats["llm_seconds"] += time.perf_counter() - llm_started
+                stats["llm_calls"] += 1
+                stats["iterations"] = count + 1
+                stats["prompt_tokens"] += prompt_tokens
+                stats["completion_tokens"] += completion_tokens
                 
                 # Add the response to scratchpad
                 agent_scratchpad.append(response)
@@ -70,6 +123,7 @@ class CustomAgentExecutor:
                         tool_call_id = tool_call.get("id", f"call_{count}_{i}")
                         
                         print(f"Executing: {tool_name}({tool_args})")
+                        self._emit(on_event, {"type": "tool_start", "tool": tool_name, "args": tool_args})
                         
                         # Check if tool exists
                         if tool_name not in self.name2tool:
@@ -84,7 +138,14 @@ class CustomAgentExecutor:
                             continue
                         
                         # Execute the tool
-                        tool_output = self.name2tool[tool_name](**tool_args)
+                        tool_started = time.perf_counter()
+                        try:
+                            tool_output = self.name2tool[tool_name](**tool_args)
+                        finally:
+                            stats["tool_calls"][tool_name] += 1
+                            stats["tool_seconds"][tool_name] += time.perf_counter() - tool_started
+                            self._emit(on_event, {"type": "tool_end", "tool": tool_name,
+                                                  "seconds": round(time.perf_counter() - tool_started, 3)})
                         print(f"✅ Tool output type: {type(tool_output)}")
                         
                         # Create tool message
@@ -104,6 +165,9 @@ class CustomAgentExecutor:
                             count = self.max_iterations  # Exit outer loop
                             break
                             
+                    except RateLimitExceeded:
+                        # An upstream is saturated: give up the turn so the API can answer "busy"
+                        raise
                     except Exception as e:
                         error_msg = f"Error executing {tool_name}: {str(e)}"
                         print(f"❌ {error_msg}")
@@ -123,23 +187,74 @@ class CustomAgentExecutor:
                 else:
                     final_answer = "I encountered an issue while processing your request. Please try again."
             
+        except RateLimitExceeded:
+            # Let callers (the API's admission control) report "busy" instead of an answer
+            raise
         except Exception as e:
             final_answer = f"I encountered an unexpected error: {str(e)}. Please try again."
             print(f"❌ Unexpected error: {str(e)}")
         
-        # Update chat history
+        stats["total_seconds"] = time.perf_counter() - started
+        stats["tool_calls"] = dict(stats["tool_calls"])
+        stats["tool_seconds"] = dict(stats["tool_seconds"])
+
+        print(f"\n🎯 Final Answer: {final_answer}")
+        return {"answer": final_answer, "stats": stats}
+
+    def _invoke_agent(self, inputs: Dict[str, Any]) -> tuple:
+        """One LLM call within the shared rate limit; returns (response, (prompt, completion) tokens)."""
+        if self.limiter is None:
+            response = self.agent.invoke(inputs)
+            return response, self._token_usage(response)
+
+        messages = [inputs["input"], *inputs["chat_history"], *inputs["agent_scratchpad"]]
+        estimate = estimate_tokens(*(getattr(m, "content", m) for m in messages)) + self.tool_schema_tokens
+        with self.limiter.limit(estimate) as settle:
+            response = self.agent.invoke(inputs)
+            usage = self._token_usage(response)
+            settle(sum(usage) or estimate)
+        return response, usage
+
+    @staticmethod
+    def _emit(on_event, event: Dict[str, Any]) -> None:
+        if on_event is None:
+            return
         try:
-            self.chat_history.extend([
-                HumanMessage(content=input_text),
-                AIMessage(content=final_answer)
-            ])
+            on_event(event)
         except Exception as e:
-            print(f"⚠️ Could not update chat history: {str(e)}")
-        
-        print(f"\n🎯 Final Answer: {final_answer}")
-        return {"answer": final_answer}
+            print(f"⚠️ Event callback failed: {str(e)}")
+
+    @staticmethod
+    def _token_usage(response) -> tuple:
+        """(prompt, completion) tokens reported for one LLM response, or (0, 0) if unavailable."""
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
 
     def clear_history(self):
         """Clear the chat history."""
         self.chat_history = []
-        print("Chat history cleared.")
\ No newline at end of file
+        print("Chat history cleared.")
+
+def create_agent_executor(model: str = "gpt-4o-mini", temperature: float = 0.1, max_iterations: int = 5,
+                          prompt=None, tools=None) -> CustomAgentExecutor:
+    """
+    Build a CustomAgentExecutor with the app's prompt, model and tool set.
+
+    run() is stateless and safe to share across threads (callers pass their
+    own history); invoke() keeps history on the executor for single-user use.
+    """
+    # Imported here so importing this module stays cheap; the prompt is
+    # vendored and tool implementations load on first call, so this makes
+    # no network requests
+    from langchain_openai import ChatOpenAI
+
+    if prompt is None:
+        from utils.agent_prompt import get_agent_prompt
+        prompt = get_agent_prompt()
+    if tools is None:
+        from tools.finalTools import tools
+    llm = ChatOpenAI(model=model, temperature=temperature)
+    return CustomAgentExecutor(prompt=prompt, llm=llm, tools=tools, max_iterations=max_iterations)
@@ -1,12 +1,13 @@
+import os
 import streamlit as st
-from langchain.agents import create_openai_tools_agent, AgentExecutor
-from langchain_openai import ChatOpenAI
-from tools.finalTools import tools as available_tools
-from langchain import hub
-from langchain_core.messages import HumanMessage, AIMessage
+import httpx
 from datetime import datetime
 import json
 
+# The agent runs in server.py; this app is a thin client of its HTTP API
+AGENT_API_URL = os.getenv("AGENT_API_URL", "http://localhost:8000")
+REQUEST_TIMEOUT = httpx.Timeout(180.0, connect=5.0)
+
 # Page config
 st.set_page_config(
     page_title="Duke University Assistant",
@@ -15,54 +16,61 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize the chatbot in session state
 @st.cache_resource
-def initialize_agent():
-    """Initialize the agent (cached to avoid recreating)."""
-    prompt = hub.pull("hwchase17/openai-functions-agent")
-    llm = ChatOpenAI(model='gpt-4o-mini', temperature=0.1)
-    
-    agent = create_openai_tools_agent(
-        prompt=prompt, 
-        llm=llm, 
-        tools=available_tools
-    )
-    
-    agent_executor = AgentExecutor(
-        agent=agent, 
-        tools=available_tools, 
-        verbose=True, 
-        handle_parsing_errors=True, 
-        max_iterations=10,
-        return_intermediate_steps=True
-    )
-    
-    return agent_executor
+def get_client():
+    """One pooled HTTP client shared across reruns and sessions."""
+    return httpx.Client(base_url=AGENT_API_URL, timeout=REQUEST_TIMEOUT)
+
+def stream_answer(message, session_id, status):
+    """Send a message to the agent service, showing tool progress; returns the final event."""
+    result = None
+    with get_client().stream("POST", "/chat/stream", json={"message": message, "session_id": session_id}) as response:
+        if response.status_code == 503:
+            # Rejected at admission: the service is saturated
+            response.read()
+            return {"type": "busy", **response.json()}
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            if event["type"] == "session":
+                st.session_state.session_id = event["session_id"]
+            elif event["type"] == "tool_start":
+                status.update(label=f"🔧 Using {event['tool']}...")
+            elif event["type"] == "thinking":
+                status.update(label="Thinking...")
+            elif event["type"] in ("answer", "busy", "error"):
+                result = event
+    return result or {"type": "error", "error": "The agent service closed the connection."}
 
 def main():
     st.title("🏫 Duke University Assistant")
     st.markdown("Ask me about Duke's programs, courses, professors, events, and more!")
     
     # Initialize session state
-    if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = None
     if "messages" not in st.session_state:
         st.session_state.messages = []
-    if "agent_executor" not in st.session_state:
-        st.session_state.agent_executor = initialize_agent()
     
     # Sidebar
     with st.sidebar:
         st.header("💬 Chat Controls")
         
         if st.button("🗑️ Clear Chat History"):
-            st.session_state.chat_history = []
+            if st.session_state.session_id:
+                try:
+                    get_client().delete(f"/sessions/{st.session_state.session_id}")
+                except httpx.HTTPError:
+                    pass
+            st.session_state.session_id = None
             st.session_state.messages = []
             st.success("Chat history cleared!")
         
         st.header("📊 Session Info")
         st.write(f"Messages: {len(st.session_state.messages)}")
-        st.write(f"History length: {len(st.session_state.chat_history)}")
+        st.write(f"Session: {st.session_state.session_id or 'new'}")
         
         if st.button("💾 Download Chat"):
             chat_data = {
@@ -110,49 +118,45 @@ def main():
         
         # Generate response
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    # Invoke the agent
-                    result = st.session_state.agent_executor.invoke({
-                        "input": prompt,
-                        "chat_history": st.session_state.chat_history
-                    })
-                    
-                    response = result.get('output', 'I apologize, but I encountered an issue.')
-                    intermediate_steps = result.get('intermediate_steps', [])
-                    tools_used = [step[0].tool for step in intermediate_steps if hasattr(step[0], 'tool')]
-                    
-                    # Display response
-                    st.write(response)
-                    
-                    # Show tools used
-                    if tools_used:
-                        with st.expander("🔧 Tools used in this response"):
-                            st.write(", ".join(tools_used))
-                    
-                    # Update session state
-                    st.session_state.messages.append({
-                        "role": "assistant", 
-                        "content": response,
-                        "tools_used": tools_used
-                    })
-                    
-                    # Update chat history for agent context
-                    st.session_state.chat_history.extend([
-                        HumanMessage(content=prompt),
-                        AIMessage(content=response)
-                    ])
-                    
-                    # Limit chat history
-                    if len(st.session_state.chat_history) > 20:
-                        st.session_state.chat_history = st.session_state.chat_history[-20:]
+            try:
+                with st.status("Thinking...") as status:
+                    result = stream_answer(prompt, st.session_state.session_id, status)
+                    status.update(label="Done", state="complete" if result["type"] == "answer" else "error")
+
+                if result["type"] == "busy":
+                    # Not recorded by the service, so drop it here too and let the user resend
+                    st.session_state.messages.pop()
+                    st.warning(f"⏳ {result.get('message', 'The assistant is busy')}. "
+                               f"Please try again in {result.get('retry_after', 5)} seconds.")
+                    return
+
+                if result["type"] == "error":
+                    raise RuntimeError(result["error"])
+
+                response = result.get('answer', 'I apologize, but I encountered an issue.')
+                tools_used = result.get('tools_used', [])
+
+                # Display response
+                st.write(response)
+                
+                # Show tools used
+                if tools_used:
+                    with st.expander("🔧 Tools used in this response"):
+                        st.write(", ".join(tools_used))
                 
-                except Exception as e:
-                    error_msg = f"I encountered an error: {str(e)}. Please try rephrasing your question."
-                    st.error(error_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
+                # Update session state
+                st.session_state.messages.append({
+                    "role": "assistant", 
+                    "content": response,
+                    "tools_used": tools_used
+                })
+            
+            except Exception as e:
+                error_msg = f"I encountered an error: {str(e)}. Please try rephrasing your question."
+                st.error(error_msg)
+                st.session_state.messages.append({"role": "assistant", "content": error_msg})
 
 if __name__ == "__main__":
     main()
 
-# To run: streamlit run duke_chatbot_web.py
\ No newline at end of file
+# To run: python server.py, then streamlit run app.py
\ No newline at end of file
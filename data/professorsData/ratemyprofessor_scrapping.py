@@ -11,6 +11,13 @@ import json
 import os
 import random
 import logging
+import argparse
+
+from rmp_parser import (
+    SNAPSHOT_DIR, LOG_FILE, CHECKPOINT_FILE, ProfessorLog,
+    extract_professor_data, write_snapshot, load_checkpoint, save_checkpoint,
+    parse_pending_snapshots,
+)
 
 # Set up logging
 logging.basicConfig(
@@ -129,114 +136,6 @@ def get_professor_card_selector(driver):
     
     return None
 
-def extract_professor_data(card):
-    """Extract data from a single professor card"""
-    prof_data = {
-        'name': 'Unknown',
-        'department': 'Unknown',
-        'rating': 'N/A',
-        'would_take_again': 'N/A',
-        'num_ratings': 'N/A'
-    }
-    
-    try:
-        # Extract professor name
-        name_selectors = [
-            '[data-testid="cardName"]', 
-            '.CardName__StyledCardName-sc-1gyrgim-0',
-            '.NameTitle__Name-dowf0z-0'
-        ]
-        
-        for selector in name_selectors:
-            try:
-                name_elem = card.find_element(By.CSS_SELECTOR, selector)
-                prof_data['name'] = name_elem.text.strip()
-                break
-            except:
-                continue
-        
-        # Extract department
-        dept_selectors = [
-            '[data-testid="cardSchoolName"]',
-            '.CardSchool__Department-sc-19lmz2k-0',
-            '.CardSchool__School-sc-19lmz2k-1'
-        ]
-        
-        for selector in dept_selectors:
-            try:
-                dept_elem = card.find_element(By.CSS_SELECTOR, selector)
-                prof_data['department'] = dept_elem.text.strip()
-                break
-            except:
-                continue
-        
-        # Extract rating
-        rating_selectors = [
-            '[data-testid="cardRating"]',
-            '.CardNumRating__CardNumRatingNumber-sc-17t4b9u-2',
-            '.CardNumRating-xir6a4-0'
-        ]
-        
-        for selector in rating_selectors:
-            try:
-                rating_elem = card.find_element(By.CSS_SELECTOR, selector)
-                prof_data['rating'] = rating_elem.text.strip()
-                break
-            except:
-                continue
-        
-        # Extract would take again percentage
-        wta_selectors = [
-            '[data-testid="cardWouldTakeAgain"]',
-            '.CardFeedback__CardFeedbackNumber-lq6nix-2',
-            '.CardFeedback-xn2mng-0'
-        ]
-        
-        for selector in wta_selectors:
-            try:
-                wta_elem = card.find_element(By.CSS_SELECTOR, selector)
-                wta_text = wta_elem.text.strip()
-                # Extract percentage value if it exists
-                if "%" in wta_text:
-                    prof_data['would_take_again'] = wta_text
-                else:
-                    prof_data['would_take_again'] = wta_text + "%" if wta_text.replace('.', '').isdigit() else wta_text
-                break
-            except:
-                continue
-        
-        # Extract number of ratings
-        ratings_count_selectors = [
-            '[data-testid="cardNumRatings"]',
-            '.CardNumRating__CardNumRatingCount-sc-17t4b9u-3',
-            '.TeacherInfo__StyledTeacherInfo-ti1fio-0 span'
-        ]
-        
-        for selector in ratings_count_selectors:
-            try:
-                ratings_count_elem = card.find_element(By.CSS_SELECTOR, selector)
-                ratings_text = ratings_count_elem.text.strip()
-                
-                # Clean up the ratings text
-                if "ratings" in ratings_text.lower():
-                    # Extract just the number
-                    import re
-                    numbers = re.findall(r'\d+', ratings_text)
-                    if numbers:
-                        prof_data['num_ratings'] = numbers[0]
-                    else:
-                        prof_data['num_ratings'] = ratings_text
-                else:
-                    prof_data['num_ratings'] = ratings_text
-                break
-            except:
-                continue
-        
-    except Exception as e:
-        logging.warning(f"Error extracting professor data: {str(e)}")
-    
-    return prof_data
-
 def click_show_more(driver):
     """Try multiple methods to click 'Show More' button"""
     try:
@@ -250,10 +149,9 @@ def click_show_more(driver):
             try:
                 show_more = driver.find_element(By.XPATH, selector)
                 driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", show_more)
-                time.sleep(1)
+                WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.XPATH, selector)))
                 show_more.click()
                 logging.info(f"Clicked 'Show More' button")
-                time.sleep(random.uniform(3, 5))  # Random delay after clicking
                 return True
             except:
                 continue
@@ -263,16 +161,6 @@ def click_show_more(driver):
         logging.warning(f"Error clicking 'Show More': {str(e)}")
         return False
 
-def save_to_json(professors_data, filename="duke_professors.json"):
-    try:
-        with open(filename, 'w', encoding='utf-8') as jsonfile:
-            json.dump(professors_data, jsonfile, indent=4)
-        
-        logging.info(f"Successfully saved {len(professors_data)} professors to {filename}")
-        logging.info(f"File saved at: {os.path.abspath(filename)}")
-    except Exception as e:
-        logging.error(f"Error saving to JSON: {str(e)}")
-
 def load_existing_professors(filename="duke_professors.json"):
     """Load existing professor data to avoid duplicates"""
     try:
@@ -288,163 +176,136 @@ def load_existing_professors(filename="duke_professors.json"):
         logging.warning(f"Error loading existing data: {str(e)}")
         return []
 
-def main():
-    driver = None
-    output_file = "duke_professors.json"
-    
+def wait_for_more_cards(driver, card_selector, previous_count, timeout=15):
+    """Wait until more than previous_count cards are rendered instead of sleeping a fixed time"""
     try:
-        logging.info("Starting RateMyProfessors scraper for Duke University")
-        
-        # Load existing data to avoid duplicates
-        existing_professors = load_existing_professors(output_file)
-        existing_names = {prof['name'] for prof in existing_professors}
-        
-        driver = setup_driver()
-        driver.set_page_load_timeout(30)
-        
-        logging.info("Opening RateMyProfessors search page for Duke University...")
-        
-        # Try accessing the site with retry mechanism
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                driver.get("https://www.ratemyprofessors.com/search/professors/1350?q=*")
-                break
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    logging.warning(f"Failed to load page (attempt {attempt+1}/{max_retries}): {str(e)}")
-                    time.sleep(5)
-                else:
-                    logging.error(f"Failed to load page after {max_retries} attempts: {str(e)}")
-                    return
-        
-        # Wait for page to initialize
-        time.sleep(5)
-        
-        # Handle cookie consent
+        WebDriverWait(driver, timeout).until(
+            lambda d: len(d.find_elements(By.CSS_SELECTOR, card_selector)) > previous_count
+        )
+        return True
+    except TimeoutException:
+        return False
+
+def open_search_page(driver, max_retries=3):
+    for attempt in range(max_retries):
+        try:
+            driver.get("https://www.ratemyprofessors.com/search/professors/1350?q=*")
+            return True
+        except Exception as e:
+            if attempt < max_retries - 1:
+                logging.warning(f"Failed to load page (attempt {attempt+1}/{max_retries}): {str(e)}")
+                time.sleep(5)
+            else:
+                logging.error(f"Failed to load page after {max_retries} attempts: {str(e)}")
+    return False
+
+def compact(output_file, log_file=LOG_FILE):
+    """Fold the JSONL log into the JSON file the chatbot reads"""
+    log = ProfessorLog(log_file)
+    existing = load_existing_professors(output_file)
+    return log.compact(output_file, existing=existing)
+
+def fetch_stage(snapshot_dir=SNAPSHOT_DIR, checkpoint_file=CHECKPOINT_FILE, max_clicks=302,
+                cards_per_snapshot=80, compact_every=5, output_file="duke_professors.json", workers=None):
+    """
+    Click through the RateMyProfessors listing and save raw card HTML snapshots.
+
+    Cards already saved according to the checkpoint are skipped, so an
+    interrupted run resumes where it stopped. Every compact_every snapshots the
+    pending snapshots are parsed and the log is compacted.
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    checkpoint = load_checkpoint(checkpoint_file)
+    saved_count = checkpoint.get("cards_saved", 0)
+    snapshot_number = checkpoint.get("next_snapshot", 0)
+    if saved_count:
+        logging.info(f"Resuming after {saved_count} saved cards")
+
+    driver = setup_driver()
+    driver.set_page_load_timeout(30)
+    try:
+        if not open_search_page(driver):
+            return
         accept_cookies(driver)
-        
-        # Find the correct card selector
-        card_selector = get_professor_card_selector(driver)
+
+        card_selector = None
+        for _ in range(3):
+            card_selector = get_professor_card_selector(driver)
+            if card_selector:
+                break
+            wait_for_element(driver, By.CSS_SELECTOR, '[data-testid="TeacherCard"], [class*="TeacherCard"]', timeout=10)
         if not card_selector:
             logging.error("Could not find professor cards selector")
             return
-        
-        # Track professors to avoid duplicates during this session
-        all_professors = []
-        seen_names = existing_names.copy()
-        
-        # Process all visible professors initially
-        visible_cards = driver.find_elements(By.CSS_SELECTOR, card_selector)
-        logging.info(f"Initially found {len(visible_cards)} professor cards")
-        
-        # Process the initial cards
-        for i, card in enumerate(visible_cards):
-            try:
-                prof_data = extract_professor_data(card)
-                
-                # Add professor if we have at least a valid name and not seen before
-                if prof_data['name'] != 'Unknown' and prof_data['name'] not in seen_names:
-                    seen_names.add(prof_data['name'])
-                    all_professors.append(prof_data)
-                    
-                    if i < 3 or i % 10 == 0:  # Log a sample of the processed data
-                        logging.info(f"Processed professor {i+1}: {prof_data['name']} | "
-                                    f"{prof_data['department']} | Rating: {prof_data['rating']} | "
-                                    f"Would Take Again: {prof_data['would_take_again']} | "
-                                    f"# Ratings: {prof_data['num_ratings']}")
-            except Exception as e:
-                logging.warning(f"Error processing card {i+1}: {str(e)}")
-                continue
-        
-        # Remember how many cards we've seen so far
-        processed_count = len(visible_cards)
-        logging.info(f"Initial processing complete. Found {len(all_professors)} professors")
-        
-        # Continue clicking "Show More" to get more professors
-        max_clicks = 302  # Set based on total professors / 8 (new professors per click)
-        click_count = 0
-        
-        while click_count < max_clicks:
-            # Try to click "Show More" button
+
+        pending_html = []
+        clicks = 0
+
+        def flush():
+            nonlocal pending_html, snapshot_number
+            if not pending_html:
+                return
+            path = os.path.join(snapshot_dir, f"batch_{snapshot_number:05d}.html")
+            write_snapshot(pending_html, path)
+            snapshot_number += 1
+            pending_html = []
+
+            current = load_checkpoint(checkpoint_file)
+            current.update({"cards_saved": saved_count, "next_snapshot": snapshot_number})
+            save_checkpoint(current, checkpoint_file)
+            logging.info(f"Saved snapshot {path} ({saved_count} cards so far)")
+
+            if snapshot_number % compact_every == 0:
+                parse_pending_snapshots(snapshot_dir, ProfessorLog(), checkpoint_file, workers)
+                compact(output_file)
+
+        while True:
+            cards = driver.find_elements(By.CSS_SELECTOR, card_selector)
+            if len(cards) > saved_count:
+                pending_html.extend(card.get_attribute("outerHTML") for card in cards[saved_count:])
+                saved_count = len(cards)
+                if len(pending_html) >= cards_per_snapshot:
+                    flush()
+
+            if clicks >= max_clicks:
+                break
             if not click_show_more(driver):
                 logging.info("No more 'Show More' button found, ending collection")
                 break
-            
-            # Get all current cards
-            current_cards = driver.find_elements(By.CSS_SELECTOR, card_selector)
-            
-            # Only process the new cards that appeared
-            if len(current_cards) > processed_count:
-                new_cards = current_cards[processed_count:]
-                logging.info(f"Found {len(new_cards)} new cards after clicking 'Show More'")
-                
-                # Process just the new cards
-                new_count = 0
-                for i, card in enumerate(new_cards):
-                    try:
-                        prof_data = extract_professor_data(card)
-                        
-                        # Add professor if valid and not seen before
-                        if prof_data['name'] != 'Unknown' and prof_data['name'] not in seen_names:
-                            seen_names.add(prof_data['name'])
-                            all_professors.append(prof_data)
-                            new_count += 1
-                            
-                            if i < 3 or i % 10 == 0:  # Log a sample
-                                logging.info(f"New professor {new_count}: {prof_data['name']} | "
-                                            f"{prof_data['department']} | Rating: {prof_data['rating']}")
-                    except Exception as e:
-                        logging.warning(f"Error processing new card {i+1}: {str(e)}")
-                        continue
-                
-                # Update our counter of processed cards
-                processed_count = len(current_cards)
-                logging.info(f"Found {new_count} new professors after click {click_count+1}")
-                
-                # Break if we didn't find any new professors
-                if new_count == 0:
-                    logging.info("No new professors found, possibly reached the end")
-                    # One more chance - sometimes there's a rendering delay
-                    time.sleep(2)
-                    continue
-            else:
-                logging.info("No new cards appeared after clicking 'Show More'")
-                # Give it one more chance - sometimes there's a loading delay
-                time.sleep(3)
-            
-            click_count += 1
-            
-            # Save intermediately every 10 clicks to avoid losing data
-            if click_count % 10 == 0:
-                combined_professors = existing_professors.copy()
-                for prof in all_professors:
-                    if prof['name'] not in existing_names:
-                        combined_professors.append(prof)
-                save_to_json(combined_professors, f"{output_file}.partial")
-                logging.info(f"Saved partial results with {len(combined_professors)} professors")
-        
-        # Combine with existing data
-        combined_professors = existing_professors.copy()
-        
-        # Add new professors that weren't in the existing data
-        for prof in all_professors:
-            if prof['name'] not in existing_names:
-                combined_professors.append(prof)
-        
-        # Print summary
-        logging.info(f"Data collection complete. Found {len(all_professors)} new professors")
-        logging.info(f"Total professors after combining with existing data: {len(combined_professors)}")
-        
-        # Save final results to JSON
-        save_to_json(combined_professors, output_file)
-        
+            clicks += 1
+            if not wait_for_more_cards(driver, card_selector, len(cards)):
+                logging.info("No new cards appeared after clicking 'Show More', ending collection")
+                break
+
+        flush()
+    finally:
+        driver.quit()
+        logging.info("Driver closed successfully")
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Duke professors from RateMyProfessors.")
+    parser.add_argument("stage", nargs="?", default="all", choices=["fetch", "parse", "compact", "all"],
+                        help="fetch: save card snapshots, parse: parse snapshots into the JSONL log, "
+                             "compact: write the JSON output, all: every stage in order")
+    parser.add_argument("--output", default="duke_professors.json", help="Compacted JSON output file")
+    parser.add_argument("--snapshots", default=SNAPSHOT_DIR, help="Directory for raw card HTML snapshots")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="Checkpoint file for resuming")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--max-clicks", type=int, default=302, help="Maximum 'Show More' clicks")
+    args = parser.parse_args()
+
+    try:
+        if args.stage in ("fetch", "all"):
+            logging.info("Starting RateMyProfessors scraper for Duke University")
+            fetch_stage(args.snapshots, args.checkpoint, max_clicks=args.max_clicks,
+                        output_file=args.output, workers=args.workers)
+        if args.stage in ("parse", "all"):
+            parse_pending_snapshots(args.snapshots, ProfessorLog(), args.checkpoint, args.workers)
+        if args.stage in ("compact", "all"):
+            total = compact(args.output)
+            logging.info(f"Total professors after combining with existing data: {total}")
     except Exception as e:
         logging.error(f"Unexpected error: {str(e)}")
-    finally:
-        if driver:
-            driver.quit()
-            logging.info("Driver closed successfully")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,265 @@
+import os
+import re
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import BeautifulSoup
+
+# Same value as selenium's By.CSS_SELECTOR, so extract_professor_data works on
+# live WebElements and on saved snapshots without importing selenium here.
+CSS_SELECTOR = "css selector"
+
+SNAPSHOT_DIR = "rmp_snapshots"
+LOG_FILE = "duke_professors.jsonl"
+CHECKPOINT_FILE = "rmp_checkpoint.json"
+CARD_WRAPPER = "rmp-card"
+
+
+class NoSuchSnapshotElement(Exception):
+    """Raised when a selector matches nothing inside a saved card."""
+
+
+class SnapshotElement:
+    """Wraps a BeautifulSoup tag with the small part of the WebElement API the parser uses."""
+
+    def __init__(self, tag):
+        self._tag = tag
+
+    @property
+    def text(self):
+        return " ".join(self._tag.stripped_strings)
+
+    def find_element(self, by, selector):
+        if by != CSS_SELECTOR:
+            raise ValueError(f"Unsupported locator strategy for snapshots: {by}")
+        found = self._tag.select_one(selector)
+        if found is None:
+            raise NoSuchSnapshotElement(selector)
+        return SnapshotElement(found)
+
+
+def extract_professor_data(card):
+    """Extract data from a single professor card"""
+    prof_data = {
+        'name': 'Unknown',
+        'department': 'Unknown',
+        'rating': 'N/A',
+        'would_take_again': 'N/A',
+        'num_ratings': 'N/A'
+    }
+
+    try:
+        # Extract professor name
+        name_selectors = [
+            '[data-testid="cardName"]',
+            '.CardName__StyledCardName-sc-1gyrgim-0',
+            '.NameTitle__Name-dowf0z-0'
+        ]
+
+        for selector in name_selectors:
+            try:
+                name_elem = card.find_element(CSS_SELECTOR, selector)
+                prof_data['name'] = name_elem.text.strip()
+                break
+            except:
+                continue
+
+        # Extract department
+        dept_selectors = [
+            '[data-testid="cardSchoolName"]',
+            '.CardSchool__Department-sc-19lmz2k-0',
+            '.CardSchool__School-sc-19lmz2k-1'
+        ]
+
+        for selector in dept_selectors:
+            try:
+                dept_elem = card.find_element(CSS_SELECTOR, selector)
+                prof_data['department'] = dept_elem.text.strip()
+                break
+            except:
+                continue
+
+        # Extract rating
+        rating_selectors = [
+            '[data-testid="cardRating"]',
+            '.CardNumRating__CardNumRatingNumber-sc-17t4b9u-2',
+            '.CardNumRating-xir6a4-0'
+        ]
+
+        for selector in rating_selectors:
+            try:
+                rating_elem = card.find_element(CSS_SELECTOR, selector)
+                prof_data['rating'] = rating_elem.text.strip()
+                break
+            except:
+                continue
+
+        # Extract would take again percentage
+        wta_selectors = [
+            '[data-testid="cardWouldTakeAgain"]',
+            '.CardFeedback__CardFeedbackNumber-lq6nix-2',
+            '.CardFeedback-xn2mng-0'
+        ]
+
+        for selector in wta_selectors:
+            try:
+                wta_elem = card.find_element(CSS_SELECTOR, selector)
+                wta_text = wta_elem.text.strip()
+                # Extract percentage value if it exists
+                if "%" in wta_text:
+                    prof_data['would_take_again'] = wta_text
+                else:
+                    prof_data['would_take_again'] = wta_text + "%" if wta_text.replace('.', '').isdigit() else wta_text
+                break
+            except:
+                continue
+
+        # Extract number of ratings
+        ratings_count_selectors = [
+            '[data-testid="cardNumRatings"]',
+            '.CardNumRating__CardNumRatingCount-sc-17t4b9u-3',
+            '.TeacherInfo__StyledTeacherInfo-ti1fio-0 span'
+        ]
+
+        for selector in ratings_count_selectors:
+            try:
+                ratings_count_elem = card.find_element(CSS_SELECTOR, selector)
+                ratings_text = ratings_count_elem.text.strip()
+
+                # Clean up the ratings text
+                if "ratings" in ratings_text.lower():
+                    # Extract just the number
+                    numbers = re.findall(r'\d+', ratings_text)
+                    if numbers:
+                        prof_data['num_ratings'] = numbers[0]
+                    else:
+                        prof_data['num_ratings'] = ratings_text
+                else:
+                    prof_data['num_ratings'] = ratings_text
+                break
+            except:
+                continue
+
+    except Exception as e:
+        logging.warning(f"Error extracting professor data: {str(e)}")
+
+    return prof_data
+
+
+def write_snapshot(card_htmls, path):
+    """Save a batch of raw card outerHTML strings as one snapshot file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for html in card_htmls:
+            f.write(f'<section class="{CARD_WRAPPER}">{html}</section>\n')
+    os.replace(tmp_path, path)
+
+
+def parse_snapshot(path):
+    """Parse every card in a snapshot file; runs in worker processes."""
+    with open(path, 'r', encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    professors = []
+    for wrapper in soup.select(f"section.{CARD_WRAPPER}"):
+        prof_data = extract_professor_data(SnapshotElement(wrapper))
+        if prof_data['name'] != 'Unknown':
+            professors.append(prof_data)
+    return professors
+
+
+def load_checkpoint(path=CHECKPOINT_FILE):
+    """Load scraper progress: cards snapshotted, next snapshot number, snapshots parsed."""
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"cards_saved": 0, "next_snapshot": 0, "parsed_snapshots": []}
+
+
+def save_checkpoint(checkpoint, path=CHECKPOINT_FILE):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class ProfessorLog:
+    """
+    Append-only JSONL log of parsed professors.
+
+    New records are appended as they are parsed, so nothing is rewritten per
+    save. compact() drops superseded records (last write per name wins) and
+    exports the merged result in the duke_professors.json format.
+    """
+
+    def __init__(self, path=LOG_FILE):
+        self.path = path
+
+    def append(self, professors):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for prof in professors:
+                f.write(json.dumps(prof) + "\n")
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave one truncated trailing line
+                    logging.warning(f"Skipping corrupt line in {self.path}")
+        return records
+
+    def compact(self, output_file, existing=None):
+        """Deduplicate the log in place and write existing + logged professors to output_file."""
+        logged = {prof['name']: prof for prof in self.read()}
+        merged = {prof['name']: prof for prof in existing or []}
+        merged.update(logged)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for prof in logged.values():
+                f.write(json.dumps(prof) + "\n")
+        os.replace(tmp_path, self.path)
+
+        tmp_path = f"{output_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(list(merged.values()), f, indent=4)
+        os.replace(tmp_path, output_file)
+        logging.info(f"Compacted {len(merged)} professors into {output_file}")
+        return len(merged)
+
+
+def parse_pending_snapshots(snapshot_dir=SNAPSHOT_DIR, log=None, checkpoint_file=CHECKPOINT_FILE, workers=None):
+    """
+    Parse every snapshot not yet recorded in the checkpoint with a process pool
+    and append the results to the log. Safe to re-run after a crash.
+    """
+    log = log or ProfessorLog()
+    checkpoint = load_checkpoint(checkpoint_file)
+    parsed = set(checkpoint.get("parsed_snapshots", []))
+
+    if not os.path.isdir(snapshot_dir):
+        return 0
+    pending = sorted(name for name in os.listdir(snapshot_dir) if name.endswith(".html") and name not in parsed)
+    if not pending:
+        return 0
+
+    total = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        paths = [os.path.join(snapshot_dir, name) for name in pending]
+        for name, professors in zip(pending, executor.map(parse_snapshot, paths)):
+            log.append(professors)
+            total += len(professors)
+            # Re-read so progress written by the fetch stage meanwhile is kept
+            checkpoint = load_checkpoint(checkpoint_file)
+            checkpoint.setdefault("parsed_snapshots", []).append(name)
+            save_checkpoint(checkpoint, checkpoint_file)
+
+    logging.info(f"Parsed {total} professors from {len(pending)} snapshots")
+    return total
@@ -0,0 +1,296 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import threading
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from evaluation.eval_runner import load_questions, QUESTIONS_CSV
+from evaluation.run_store import git_commit, save_run
+
+BENCHMARK_DIR = "evaluation/benchmarks"
+
+# gpt-4o-mini list prices, USD per 1M tokens
+PRICE_PER_M_INPUT = 0.15
+PRICE_PER_M_OUTPUT = 0.60
+
+# Typical live latencies (seconds) used by the stubbed tools
+STUB_TOOL_LATENCY = {
+    "get_current_date": 0.001,
+    "rate_my_professor_info": 0.01,
+    "query_professors": 0.01,
+    "mem_search": 0.8,
+    "pratt_search": 0.8,
+    "get_courses": 0.3,
+    "get_course_details": 0.6,
+    "get_multiple_course_details": 0.8,
+    "search_courses": 0.05,
+    "get_events": 0.2,
+    "get_AIPI_details": 0.8,
+    "web_search": 3.0,
+}
+
+# Keyword routing for the stubbed LLM: first match wins, web_search otherwise
+STUB_ROUTES = [
+    (("professor", "rating", "rate my"), "rate_my_professor_info"),
+    (("event", "happening", "concert", "seminar"), "get_events"),
+    (("aipi", "artificial intelligence"), "get_AIPI_details"),
+    (("course", "class", "credit", "prerequisite"), "search_courses"),
+    (("mem", "master of engineering management"), "mem_search"),
+    (("pratt", "engineering", "policy", "gpa"), "pratt_search"),
+    (("date", "today", "time"), "get_current_date"),
+]
+
+STUB_TOOL_OUTPUT = "Stubbed tool output. " * 100
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile (q in 0-100) of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def distribution(values):
+    return {
+        "mean": round(sum(values) / len(values), 4) if values else None,
+        "p50": round(percentile(values, 50), 4) if values else None,
+        "p95": round(percentile(values, 95), 4) if values else None,
+        "p99": round(percentile(values, 99), 4) if values else None,
+        "max": round(max(values), 4) if values else None,
+    }
+
+
+def estimate_tokens(text):
+    return max(len(str(text)) // 4, 1)
+
+
+class StubChatModel:
+    """
+    Stand-in for ChatOpenAI with a fixed latency: the first turn calls one tool
+    chosen by keyword, the next turn answers. Token counts are estimated from
+    message lengths so cost numbers stay comparable in shape.
+    """
+
+    def __init__(self, latency=0.4, jitter=0.2, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def bind_tools(self, tools, **kwargs):
+        from langchain_core.runnables import RunnableLambda
+        return RunnableLambda(self._respond)
+
+    def _sleep(self):
+        with self._lock:
+            delay = self.latency * (1 + self._random.uniform(-self.jitter, self.jitter))
+        time.sleep(max(delay, 0))
+
+    def _respond(self, prompt_value):
+        from langchain_core.messages import AIMessage, ToolMessage
+
+        messages = prompt_value.to_messages()
+        self._sleep()
+        prompt_tokens = sum(estimate_tokens(m.content) for m in messages)
+
+        if isinstance(messages[-1], ToolMessage):
+            content = "Here is what I found. " * 20
+            return AIMessage(content=content, usage_metadata={
+                "input_tokens": prompt_tokens, "output_tokens": estimate_tokens(content),
+                "total_tokens": prompt_tokens + estimate_tokens(content)})
+
+        question = str(messages[-1].content).lower()
+        tool_name = next((name for keywords, name in STUB_ROUTES if any(k in question for k in keywords)), "web_search")
+        return AIMessage(content="", tool_calls=[{"name": tool_name, "args": {"query": question}, "id": f"stub_{tool_name}"}],
+                         usage_metadata={"input_tokens": prompt_tokens, "output_tokens": 20,
+                                         "total_tokens": prompt_tokens + 20})
+
+
+def stub_tool(name, scale=1.0):
+    latency = STUB_TOOL_LATENCY.get(name, 0.5) * scale
+
+    def run(**kwargs):
+        time.sleep(latency)
+        return STUB_TOOL_OUTPUT
+
+    return run
+
+
+def build_executor(mode, max_iterations=5, model="gpt-4o-mini", llm_latency=0.4, tool_scale=1.0):
+    """
+    live:       real LLM, real tools
+    stub-tools: real LLM, tools replaced by fixed-latency stubs
+    stub:       stubbed LLM and tools (no network; measures executor overhead)
+    """
+    from agent_executor import CustomAgentExecutor, create_agent_executor
+    from utils.agent_prompt import get_agent_prompt
+
+    if mode == "stub":
+        tools = [SimpleNamespace(name=name, func=stub_tool(name, tool_scale)) for name in STUB_TOOL_LATENCY]
+        # No rate limit: the stub model makes no API calls
+        return CustomAgentExecutor(prompt=get_agent_prompt(), llm=StubChatModel(llm_latency), tools=tools,
+                                   max_iterations=max_iterations, upstream=None)
+
+    executor = create_agent_executor(model=model, max_iterations=max_iterations)
+    if mode == "stub-tools":
+        executor.name2tool = {name: stub_tool(name, tool_scale) for name in executor.name2tool}
+    return executor
+
+
+def run_benchmark(questions, mode="stub", concurrency=1, max_iterations=5, model="gpt-4o-mini",
+                  llm_latency=0.4, tool_scale=1.0, price_in=PRICE_PER_M_INPUT, price_out=PRICE_PER_M_OUTPUT):
+    """Run each question with an empty history through one shared executor and collect per-question stats."""
+    executor = build_executor(mode, max_iterations, model, llm_latency, tool_scale)
+
+    def run_one(question):
+        started = time.perf_counter()
+        error, stats = None, {}
+        try:
+            result = executor.run(question)
+            answer, stats = result["answer"], result["stats"]
+        except Exception as e:
+            answer, error = "", str(e)
+        stats.setdefault("total_seconds", time.perf_counter() - started)
+
+        return {
+            "question": question,
+            "total_seconds": round(stats["total_seconds"], 4),
+            "llm_seconds": round(stats.get("llm_seconds", 0.0), 4),
+            "llm_calls": stats.get("llm_calls", 0),
+            "tool_seconds": {k: round(v, 4) for k, v in stats.get("tool_seconds", {}).items()},
+            "tool_calls": stats.get("tool_calls", {}),
+            "iterations": stats.get("iterations", 0),
+            "prompt_tokens": stats.get("prompt_tokens", 0),
+            "completion_tokens": stats.get("completion_tokens", 0),
+            "cost_usd": round((stats.get("prompt_tokens", 0) * price_in
+                               + stats.get("completion_tokens", 0) * price_out) / 1_000_000, 6),
+            "answer_chars": len(answer),
+            "error": error,
+        }
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="benchmark") as pool:
+        return list(pool.map(run_one, questions))
+
+
+def summarize(records, wall_seconds):
+    """Aggregate per-question records into latency, time split, iteration and token statistics."""
+    totals = [r["total_seconds"] for r in records]
+    llm = [r["llm_seconds"] for r in records]
+
+    tools = {}
+    for record in records:
+        for name, seconds in record["tool_seconds"].items():
+            entry = tools.setdefault(name, {"calls": 0, "seconds": []})
+            entry["calls"] += record["tool_calls"].get(name, 0)
+            entry["seconds"].append(seconds)
+    tool_seconds_total = sum(sum(entry["seconds"]) for entry in tools.values())
+    time_total = sum(totals) or 1.0
+
+    return {
+        "questions": len(records),
+        "errors": sum(1 for r in records if r["error"]),
+        "wall_seconds": round(wall_seconds, 3),
+        "latency_seconds": distribution(totals),
+        "llm_seconds": distribution(llm),
+        "time_share": {
+            "llm": round(sum(llm) / time_total, 4),
+            "tools": round(tool_seconds_total / time_total, 4),
+            "other": round(max(time_total - sum(llm) - tool_seconds_total, 0) / time_total, 4),
+        },
+        "tools": {
+            name: {"calls": entry["calls"], "questions": len(entry["seconds"]),
+                   "total_seconds": round(sum(entry["seconds"]), 4), **distribution(entry["seconds"])}
+            for name, entry in sorted(tools.items())
+        },
+        "iterations": distribution([r["iterations"] for r in records]),
+        "prompt_tokens": {**distribution([r["prompt_tokens"] for r in records]),
+                          "total": sum(r["prompt_tokens"] for r in records)},
+        "completion_tokens": {**distribution([r["completion_tokens"] for r in records]),
+                              "total": sum(r["completion_tokens"] for r in records)},
+        "cost_usd": {"per_question": distribution([r["cost_usd"] for r in records]),
+                     "total": round(sum(r["cost_usd"] for r in records), 6)},
+    }
+
+
+def print_summary(summary):
+    latency = summary["latency_seconds"]
+    print(f"\n📊 {summary['questions']} questions ({summary['errors']} errors) in {summary['wall_seconds']}s")
+    print(f"   latency  p50 {latency['p50']}s  p95 {latency['p95']}s  p99 {latency['p99']}s")
+    share = summary["time_share"]
+    print(f"   time     llm {share['llm']:.0%}  tools {share['tools']:.0%}  other {share['other']:.0%}")
+    for name, entry in summary["tools"].items():
+        print(f"   🛠️ {name:<28} {entry['calls']:>4} calls  mean {entry['mean']}s  p95 {entry['p95']}s")
+    print(f"   iterations mean {summary['iterations']['mean']}  p95 {summary['iterations']['p95']}")
+    print(f"   tokens   prompt {summary['prompt_tokens']['mean']}/q  completion {summary['completion_tokens']['mean']}/q"
+          f"  cost ${summary['cost_usd']['total']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and cost benchmark for CustomAgentExecutor")
+    parser.add_argument("--questions", default=QUESTIONS_CSV)
+    parser.add_argument("--limit", type=int, default=None, help="Only run the first N questions")
+    parser.add_argument("--mode", choices=["live", "stub-tools", "stub"], default="stub",
+                        help="live: real LLM and tools; stub-tools: real LLM, stubbed tools; stub: no network")
+    parser.add_argument("--concurrency", type=int, default=1, help="Questions in flight (1 gives clean latencies)")
+    parser.add_argument("--max-iterations", type=int, default=5)
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--stub-llm-latency", type=float, default=0.4, help="Seconds per stubbed LLM call")
+    parser.add_argument("--stub-tool-scale", type=float, default=1.0, help="Multiplier for stubbed tool latencies")
+    parser.add_argument("--save-run", action="store_true", help="Also store the per-question records in evaluation/runs")
+    parser.add_argument("--notes", default="", help="Free-text note stored with the run metadata")
+    parser.add_argument("--output", default=None, help=f"JSON report path (default: {BENCHMARK_DIR}/<timestamp>.json)")
+    args = parser.parse_args()
+
+    questions = load_questions(args.questions, args.limit)
+
+    started = time.perf_counter()
+    records = run_benchmark(questions, mode=args.mode, concurrency=args.concurrency,
+                            max_iterations=args.max_iterations, model=args.model,
+                            llm_latency=args.stub_llm_latency, tool_scale=args.stub_tool_scale)
+    summary = summarize(records, time.perf_counter() - started)
+
+    timestamp = datetime.now(timezone.utc)
+    report = {
+        "meta": {
+            "timestamp": timestamp.isoformat(),
+            "git_commit": git_commit(),
+            "mode": args.mode,
+            "model": args.model if args.mode != "stub" else "stub",
+            "concurrency": args.concurrency,
+            "max_iterations": args.max_iterations,
+            "questions_file": args.questions,
+            "python": platform.python_version(),
+        },
+        "summary": summary,
+        "questions": records,
+    }
+
+    output = args.output or os.path.join(BENCHMARK_DIR, f"benchmark_{timestamp.strftime('%Y%m%dT%H%M%SZ')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print_summary(summary)
+    print(f"\n💾 Report written to {output}")
+
+    if args.save_run:
+        path = save_run(records, {"kind": f"benchmark-{args.mode}", **report["meta"], "notes": args.notes})
+        print(f"💾 Run stored at {path}")
+
+
+if __name__ == "__main__":
+    main()
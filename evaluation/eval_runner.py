@@ -0,0 +1,265 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+QUESTIONS_CSV = "evaluation/eval_Q_data.csv"
+CHECKPOINT_FILE = "evaluation/eval_checkpoint.jsonl"
+RESULTS_CSV = "evaluation_results.csv"
+JUDGE_MODEL = "llama3:8b"
+
+# Executor stats kept with each answer for the run store
+RUN_STATS = ("total_seconds", "llm_seconds", "tool_seconds", "tool_calls", "iterations",
+             "prompt_tokens", "completion_tokens")
+
+CSV_FIELDS = [
+    "Input Question",
+    "Input Answer",
+    "Relevant Question to Duke university (yes/no)",
+    "Clarity of answer (1-5)",
+    "General Comments",
+]
+
+
+def load_questions(csv_path=QUESTIONS_CSV, limit=None):
+    """Questions from the eval CSV (same file and encoding as reference_free_llm_judge)."""
+    with open(csv_path, "r", encoding="latin1", newline="") as f:
+        questions = [row["questions"].strip() for row in csv.DictReader(f) if row.get("questions", "").strip()]
+    return questions[:limit] if limit else questions
+
+
+class Checkpoint:
+    """
+    Append-only JSONL record of eval progress.
+
+    Each question gets an "answered" record once the agent responds and a
+    "judged" record once scored, so a restart neither regenerates answers nor
+    re-runs the judge for work that already finished. Records with an "error"
+    are retried on the next run.
+    """
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.answers = {}
+        self.judged = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # partially written last line after a crash
+                    if record.get("error"):
+                        continue
+                    if record["stage"] == "answered":
+                        self.answers[record["question"]] = record
+                    elif record["stage"] == "judged":
+                        self.judged[record["question"]] = record
+
+    def append(self, record):
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            if not record.get("error"):
+                (self.answers if record["stage"] == "answered" else self.judged)[record["question"]] = record
+
+
+class AgentPool:
+    """
+    One shared, stateless CustomAgentExecutor; every question starts with an
+    empty history. Answers come back with the executor's run stats (latency,
+    tokens, tools) so they can be stored with the judge scores.
+    """
+
+    def __init__(self, max_iterations=5):
+        self.max_iterations = max_iterations
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def answer(self, question):
+        from agent_executor import create_agent_executor
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = create_agent_executor(max_iterations=self.max_iterations)
+        return self._executor.run(question)
+
+
+def run_evaluation(questions, checkpoint, answer_fn, judge_fn, concurrency=4, judge_concurrency=None,
+                   judge_batch_fn=None, judge_batch_size=1):
+    """
+    Answer and judge questions concurrently, checkpointing every result.
+
+    Answers are generated on a pool of `concurrency` workers and handed to a
+    separate judge pool as soon as they are ready, so the two stages overlap.
+    With judge_batch_fn and judge_batch_size > 1, answers are grouped and each
+    group is judged in one call. Questions already judged in the checkpoint
+    are skipped.
+    """
+    judge_concurrency = judge_concurrency or concurrency
+    batch_size = max(judge_batch_size, 1) if judge_batch_fn else 1
+    todo = [q for q in dict.fromkeys(questions) if q not in checkpoint.judged]
+    print(f"📋 {len(questions) - len(todo)} of {len(questions)} questions already judged, {len(todo)} to go")
+    if not todo:
+        return
+
+    def answer_task(question):
+        started = time.perf_counter()
+        try:
+            result = answer_fn(question)
+            if isinstance(result, dict):
+                record = {"stage": "answered", "question": question, "answer": result["answer"],
+                          **{k: v for k, v in result.get("stats", {}).items() if k in RUN_STATS}}
+            else:
+                record = {"stage": "answered", "question": question, "answer": result}
+        except Exception as e:
+            record = {"stage": "answered", "question": question, "answer": "Error", "error": str(e)}
+        record["answer_seconds"] = round(time.perf_counter() - started, 3)
+        return record
+
+    def judge_task(batch):
+        started = time.perf_counter()
+        records = [{**{k: v for k, v in answered.items() if k != "error"}, "stage": "judged"} for answered in batch]
+        try:
+            if len(batch) > 1:
+                verdicts = judge_batch_fn([(r["question"], r["answer"]) for r in batch])
+            else:
+                verdicts = [judge_fn(batch[0]["question"], batch[0]["answer"])]
+            for record, verdict in zip(records, verdicts):
+                record.update(verdict)
+        except Exception as e:
+            for record in records:
+                record["error"] = str(e)
+        elapsed = round((time.perf_counter() - started) / len(batch), 3)
+        for record in records:
+            record["judge_seconds"] = elapsed
+        return records
+
+    done_count = 0
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="eval-answer") as answer_pool, \
+            ThreadPoolExecutor(max_workers=judge_concurrency, thread_name_prefix="eval-judge") as judge_pool:
+        pending = {}
+        ready = [checkpoint.answers[q] for q in todo if q in checkpoint.answers]
+        for question in todo:
+            if question not in checkpoint.answers:
+                pending[answer_pool.submit(answer_task, question)] = "answer"
+
+        def submit_ready():
+            # Partial batches only go out once no more answers are coming
+            answers_pending = "answer" in pending.values()
+            while len(ready) >= batch_size or (ready and not answers_pending):
+                batch, ready[:] = ready[:batch_size], ready[batch_size:]
+                pending[judge_pool.submit(judge_task, batch)] = "judge"
+
+        submit_ready()
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = pending.pop(future)
+                if stage == "answer":
+                    record = future.result()
+                    checkpoint.append(record)
+                    if record.get("error"):
+                        print(f"❌ Answer failed: {record['question'][:60]}: {record['error']}")
+                        continue
+                    ready.append(record)
+                else:
+                    for record in future.result():
+                        checkpoint.append(record)
+                        done_count += 1
+                        status = "❌" if record.get("error") else "✅"
+                        print(f"{status} [{done_count}/{len(todo)}] {record['question'][:70]}")
+            submit_ready()
+
+
+def write_results_csv(questions, checkpoint, output=RESULTS_CSV):
+    """Write judged results in question order, in the reference_free_llm_judge CSV format."""
+    with open(output, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for question in questions:
+            record = checkpoint.judged.get(question)
+            if record is None:
+                continue
+            writer.writerow({
+                "Input Question": question,
+                "Input Answer": record["answer"],
+                "Relevant Question to Duke university (yes/no)": record.get("relevant", "unclear"),
+                "Clarity of answer (1-5)": record.get("clarity", "0"),
+                "General Comments": record.get("comments", ""),
+            })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel, resumable reference-free evaluation of the advisor agent")
+    parser.add_argument("--questions", default=QUESTIONS_CSV, help="CSV with a 'questions' column")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="JSONL checkpoint; finished questions are skipped")
+    parser.add_argument("--output", default=RESULTS_CSV, help="Results CSV written at the end")
+    parser.add_argument("--concurrency", type=int, default=4, help="Questions answered in parallel")
+    parser.add_argument("--judge-concurrency", type=int, default=None,
+                        help="Parallel judge calls (defaults to --concurrency; Ollama also needs OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--judge-model", default=JUDGE_MODEL)
+    parser.add_argument("--judge-batch-size", type=int, default=1,
+                        help="Judge this many QA pairs per Ollama call (1 = one call per pair)")
+    parser.add_argument("--no-judge-cache", action="store_true", help="Re-judge pairs even if a cached verdict exists")
+    parser.add_argument("--max-iterations", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=None, help="Only evaluate the first N questions")
+    parser.add_argument("--fresh", action="store_true", help="Ignore and overwrite an existing checkpoint")
+    parser.add_argument("--no-store", action="store_true", help="Don't save the run to evaluation/runs")
+    parser.add_argument("--notes", default="", help="Free-text note stored with the run metadata")
+    args = parser.parse_args()
+
+    from evaluation.reference_free_llm_judge import evaluate_qa_pair, evaluate_qa_batch, judge_cache
+
+    if args.fresh and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    questions = load_questions(args.questions, args.limit)
+    checkpoint = Checkpoint(args.checkpoint)
+    agents = AgentPool(max_iterations=args.max_iterations)
+
+    started = time.perf_counter()
+    run_evaluation(
+        questions,
+        checkpoint,
+        answer_fn=agents.answer,
+        judge_fn=lambda question, answer: evaluate_qa_pair(question, answer, args.judge_model,
+                                                           use_cache=not args.no_judge_cache),
+        concurrency=args.concurrency,
+        judge_concurrency=args.judge_concurrency,
+        judge_batch_fn=lambda pairs: evaluate_qa_batch(pairs, args.judge_model, use_cache=not args.no_judge_cache),
+        judge_batch_size=args.judge_batch_size,
+    )
+    cache = judge_cache.stats()
+    print(f"🗂️ Judge cache: {cache['hits']} hits, {cache['misses']} misses (hit rate {cache['hit_rate']})")
+    write_results_csv(questions, checkpoint, args.output)
+
+    if not args.no_store:
+        from evaluation.run_store import save_run
+        records = [checkpoint.judged[q] for q in questions if q in checkpoint.judged]
+        path = save_run(records, {
+            "kind": "eval",
+            "judge_model": args.judge_model,
+            "judge_batch_size": args.judge_batch_size,
+            "concurrency": args.concurrency,
+            "max_iterations": args.max_iterations,
+            "questions_file": args.questions,
+            "notes": args.notes,
+        })
+        print(f"💾 Run stored at {path}")
+    print(f"Evaluation complete in {time.perf_counter() - started:.1f}s! Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,34 @@
 import json
-import csv
 import ollama
 import time
 import pandas as pd
 import os
 import sys
+import hashlib
 
 # Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
-from utils.function_calling import get_response
+from utils.disk_cache import DiskCache
+
+# Bump when the judge prompts or parsing change so cached verdicts are not reused
+JUDGE_PROMPT_VERSION = "1"
+JUDGE_CACHE_DIR = ".cache/judge"
+
+judge_cache = DiskCache(JUDGE_CACHE_DIR, compress=True)
 
 def load_qa_pairs(csv_path):
     """Load questions from a excel file."""
     df = pd.read_csv(csv_path, encoding='latin1')
     return df
 
-def evaluate_qa_pair(question, answer, model_name):
-    """Evaluate a single question-answer pair using Ollama."""
-    prompt = f"""
-You are evaluating a question-answer (QA) pair related to Duke University. Your task is to assess the answer based on relevance, clarity, and overall quality.
-
-Question: {question}
-Answer: {answer}
-
-Please assess the QA pair with the following:
+def judge_cache_key(question, answer, model_name, prompt_version=JUDGE_PROMPT_VERSION):
+    """Hash of everything that determines a verdict: the QA pair, judge model and prompt version."""
+    payload = json.dumps([question, answer, model_name, prompt_version], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
+CRITERIA = """
 1. **Relevance**: Is the question clearly about Duke University or something directly connected to it (e.g., its programs, student life, policies, history, etc.)? Respond with 'yes' or 'no'.
 
 2. **Clarity (1-5)**: Rate how clearly the answer communicates its message. Use the following scale:
@@ -37,7 +39,17 @@ Please assess the QA pair with the following:
    - 5 = Very clear and well-expressed
 
 3. **Comments**: Provide a short paragraph commenting on the **accuracy**, **completeness**, and **helpfulness** of the answer.
+"""
+
+def build_judge_prompt(question, answer):
+    return f"""
+You are evaluating a question-answer (QA) pair related to Duke University. Your task is to assess the answer based on relevance, clarity, and overall quality.
+
+Question: {question}
+Answer: {answer}
 
+Please assess the QA pair with the following:
+{CRITERIA}
 Please format your output as a JSON object using the structure below:
 
 {{
@@ -47,7 +59,89 @@ Please format your output as a JSON object using the structure below:
 }}
 """
 
-    
+def build_batch_prompt(pairs):
+    """One prompt that asks for a verdict per numbered QA pair."""
+    blocks = "\n".join(
+        f"### Pair {i}\nQuestion: {question}\nAnswer: {answer}\n" for i, (question, answer) in enumerate(pairs, 1)
+    )
+    return f"""
+You are evaluating {len(pairs)} question-answer (QA) pairs related to Duke University. Assess each pair independently based on relevance, clarity, and overall quality.
+
+{blocks}
+For each pair, assess the following:
+{CRITERIA}
+Please format your output as a JSON object with one entry per pair, using the structure below:
+
+{{
+    "results": [
+        {{"pair": 1, "relevant": "yes/no", "clarity": "1-5", "comments": "Your comments here"}}
+    ]
+}}
+"""
+
+def parse_judge_json(response_text):
+    """The verdict from a well-formed JSON reply with all three fields, else None."""
+    try:
+        # Try to find and parse JSON in the response
+        response_text = response_text.strip()
+        start_idx = response_text.find("{")
+        end_idx = response_text.rfind("}") + 1
+
+        if start_idx >= 0 and end_idx > start_idx:
+            result = json.loads(response_text[start_idx:end_idx])
+
+            # Validate the expected fields
+            if isinstance(result, dict) and all(field in result for field in ("relevant", "clarity", "comments")):
+                return result
+    except json.JSONDecodeError:
+        pass
+    return None
+
+def parse_judge_response(response_text):
+    """Parse a single verdict from the judge's reply, falling back to keyword extraction."""
+    result = parse_judge_json(response_text)
+    if result is not None:
+        return result
+
+    # If we couldn't parse JSON or it didn't have the expected structure, extract information manually
+    response_text = response_text.strip()
+    result = {}
+
+    # Extract relevance (yes/no)
+    if "relevant" in response_text.lower():
+        if "yes" in response_text.lower() and "no" not in response_text.lower():
+            result["relevant"] = "yes"
+        elif "no" in response_text.lower():
+            result["relevant"] = "no"
+        else:
+            result["relevant"] = "unclear"
+
+    # Extract clarity rating (1-5)
+    for i in range(1, 6):
+        if f"clarity: {i}" in response_text.lower() or f"clarity rating: {i}" in response_text.lower():
+            result["clarity"] = str(i)
+            break
+    if "clarity" not in result:
+        result["clarity"] = "3"  # Default
+
+    # Extract comments (take everything if we can't find specific comments)
+    result["comments"] = response_text[:1000]  # Limit comment size
+
+    return result
+
+def evaluate_qa_pair(question, answer, model_name, use_cache=True):
+    """
+    Evaluate a single question-answer pair using Ollama.
+    Verdicts are cached by judge_cache_key, so unchanged answers are not re-judged.
+    """
+    key = judge_cache_key(question, answer, model_name)
+    if use_cache:
+        cached = judge_cache.get(key)
+        if cached is not None:
+            return cached
+
+    prompt = build_judge_prompt(question, answer)
+
     # Implement retry logic for API calls
     max_retries = 3
     retry_delay = 2
@@ -60,48 +154,13 @@ Please format your output as a JSON object using the structure below:
                 stream=False
             )
             response_text = response["message"]["content"]
-            
-            # Extract JSON part
-            try:
-                # Try to find and parse JSON in the response
-                response_text = response_text.strip()
-                start_idx = response_text.find("{")
-                end_idx = response_text.rfind("}") + 1
-                
-                if start_idx >= 0 and end_idx > start_idx:
-                    json_str = response_text[start_idx:end_idx]
-                    result = json.loads(json_str)
-                    
-                    # Validate the expected fields
-                    if "relevant" in result and "clarity" in result and "comments" in result:
-                        return result
-            except json.JSONDecodeError:
-                pass
-            
-            # If we couldn't parse JSON or it didn't have the expected structure, extract information manually
-            result = {}
-            
-            # Extract relevance (yes/no)
-            if "relevant" in response_text.lower():
-                if "yes" in response_text.lower() and "no" not in response_text.lower():
-                    result["relevant"] = "yes"
-                elif "no" in response_text.lower():
-                    result["relevant"] = "no"
-                else:
-                    result["relevant"] = "unclear"
-            
-            # Extract clarity rating (1-5)
-            for i in range(1, 6):
-                if f"clarity: {i}" in response_text.lower() or f"clarity rating: {i}" in response_text.lower():
-                    result["clarity"] = str(i)
-                    break
-            if "clarity" not in result:
-                result["clarity"] = "3"  # Default
-            
-            # Extract comments (take everything if we can't find specific comments)
-            result["comments"] = response_text[:1000]  # Limit comment size
-            
-            return result
+            result = parse_judge_json(response_text)
+            if result is not None:
+                judge_cache.set(key, result)
+                return result
+            # Keyword-fallback verdicts are partly guessed (default clarity), so
+            # they are returned but not cached: the next run asks the judge again
+            return parse_judge_response(response_text)
             
         except Exception as e:
             if attempt < max_retries - 1:
@@ -116,84 +175,58 @@ Please format your output as a JSON object using the structure below:
                     "comments": f"Failed to evaluate: {str(e)}"
                 }
 
-def main():
-    csv_path = "evaluation/eval_Q_data.csv"
-
-    print(f"Loading Questions from {csv_path}...")
-    questions = load_qa_pairs(csv_path)['questions']
-    print(questions)
-    
-    model_name = "llama3:8b"
-    results = []
-    
-    total_pairs = len(questions)
-    for idx, question in enumerate(questions):
-        messages = [{"role": "user", "content": question}]
-        answer = "Error"  # Default value
-        
+def evaluate_qa_batch(pairs, model_name, use_cache=True):
+    """
+    Evaluate several (question, answer) pairs, sending all uncached pairs in one
+    structured Ollama call. Pairs the batch reply doesn't cover are judged
+    individually, so the result always has one verdict per input pair.
+    """
+    results = [None] * len(pairs)
+    keys = [judge_cache_key(q, a, model_name, f"{JUDGE_PROMPT_VERSION}-batch") for q, a in pairs]
+    if use_cache:
+        for i, key in enumerate(keys):
+            # A verdict from either the batch or the single-pair prompt is reused
+            results[i] = judge_cache.get(key) or judge_cache.get(judge_cache_key(*pairs[i], model_name))
+
+    todo = [i for i, result in enumerate(results) if result is None]
+    if len(todo) == 1:
+        i = todo[0]
+        results[i] = evaluate_qa_pair(*pairs[i], model_name, use_cache=use_cache)
+        return results
+
+    if todo:
+        prompt = build_batch_prompt([pairs[i] for i in todo])
         try:
-            # Set a timeout for the response
-            max_iterations = 5  # Maximum number of iterations to wait for response
-            current_iteration = 0
-            
-            for status in get_response(messages):
-                if isinstance(status, str):
-                    print(status)
-                else:
-                    response = status
-                    break
-                    
-                current_iteration += 1
-                if current_iteration >= max_iterations:
-                    print("Warning: Reached maximum iterations waiting for response")
-                    break
-            
-            if response and hasattr(response, 'content'):
-                answer = response.content
-            else:
-                print("Warning: No valid response received")
-                answer = "Error"
-
-            print(f"Evaluating pair {idx+1}/{total_pairs}...")
-            evaluation = evaluate_qa_pair(question, answer, model_name)
-            
-            results.append({
-                "Input Question": question,
-                "Input Answer": answer,
-                "Relevant Question to Duke university (yes/no)": evaluation.get("relevant", "unclear"),
-                "Clarity of answer (1-5)": evaluation.get("clarity", "0"),
-                "General Comments": evaluation.get("comments", "")
-            })
-
+            response = ollama.chat(
+                model=model_name,
+                messages=[{"role": "user", "content": prompt}],
+                format="json",
+                stream=False
+            )
+            verdicts = json.loads(response["message"]["content"]).get("results", [])
         except Exception as e:
-            print(f"Error evaluating pair {idx+1}/{total_pairs}: {e}")
-            results.append({
-                "Input Question": question,
-                "Input Answer": answer,
-                "Relevant Question to Duke university (yes/no)": "Error",
-                "Clarity of answer (1-5)": "Error",
-                "General Comments": f"Error: {str(e)}"
-            })
-
-        if idx == 49:
-            break
+            print(f"⚠️ Batch judge call failed, judging pairs individually: {e}")
+            verdicts = []
 
-    
-    # Write results to CSV
-    with open('evaluation_results.csv', 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = [
-            "Input Question", 
-            "Input Answer", 
-            "Relevant Question to Duke university (yes/no)", 
-            "Clarity of answer (1-5)", 
-            "General Comments"
-        ]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for result in results:
-            writer.writerow(result)
-    
-    print(f"Evaluation complete! Results written to evaluation_results.csv")
+        for verdict in verdicts:
+            try:
+                position = int(verdict.get("pair")) - 1
+            except (TypeError, ValueError, AttributeError):
+                continue
+            if 0 <= position < len(todo) and all(field in verdict for field in ("relevant", "clarity", "comments")):
+                i = todo[position]
+                results[i] = {field: str(verdict[field]) for field in ("relevant", "clarity", "comments")}
+                judge_cache.set(keys[i], results[i])
+
+    for i in todo:
+        if results[i] is None:
+            results[i] = evaluate_qa_pair(*pairs[i], model_name, use_cache=use_cache)
+    return results
+
+def main():
+    """Answer and judge every question; delegates to the parallel, resumable runner in eval_runner."""
+    from evaluation.eval_runner import main as run_evaluation
+    run_evaluation()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
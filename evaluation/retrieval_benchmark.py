@@ -0,0 +1,372 @@
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from utils.bm25 import BM25
+
+RETRIEVAL_DIR = "evaluation/retrieval"
+EMBEDDINGS_CACHE = os.path.join(RETRIEVAL_DIR, "embeddings_cache.npz")
+REPORT_DIR = "evaluation/benchmarks"
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Same source documents mem_search / pratt_search were indexed from
+CORPORA = {
+    "mem": "data/documents/MEM Student Handbook.pdf",
+    "pratt": "data/documents/FINAL 24-25 BULLETIN Pratt Revised.pdf",
+}
+
+DEFAULT_CHUNKINGS = ["page", "chunk-1000-100", "chunk-500-50"]
+DEFAULT_BACKENDS = ["exact", "exact-f16", "ivf", "bm25", "hybrid"]
+DEFAULT_KS = [1, 3, 5, 10]
+MIN_PAGE_CHARS = 300
+
+
+def pages_path(corpus):
+    return os.path.join(RETRIEVAL_DIR, f"pages_{corpus}.json")
+
+
+def labels_path(corpus):
+    return os.path.join(RETRIEVAL_DIR, f"labels_{corpus}.jsonl")
+
+
+def load_pages(corpus):
+    """
+    Page texts for a corpus (1-based page numbers, as stored in the Pinecone
+    metadata). Extracted from the PDF once and cached as JSON so benchmark runs
+    don't need the PDF or PyPDF2.
+    """
+    path = pages_path(corpus)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    import PyPDF2
+
+    with open(CORPORA[corpus], "rb") as f:
+        pages = [page.extract_text() or "" for page in PyPDF2.PdfReader(f).pages]
+    os.makedirs(RETRIEVAL_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(pages, f)
+    return pages
+
+
+def load_labels(corpus):
+    """Labeled queries: {"query", "relevant_pages": [page numbers]} per line."""
+    with open(labels_path(corpus), "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def build_labels(corpus, num_pages=40, questions_per_page=2, seed=0):
+    """
+    Generate a labeled query -> page set by asking the LLM for questions that a
+    sampled page answers. Existing labels (including hand-written ones) are kept
+    and their pages are not sampled again.
+    """
+    from langchain_core.messages import HumanMessage, SystemMessage
+    from utils.openai_client import get_chat_completion
+
+    pages = load_pages(corpus)
+    existing = load_labels(corpus) if os.path.exists(labels_path(corpus)) else []
+    labeled = {page for label in existing for page in label["relevant_pages"]}
+
+    candidates = [n for n, text in enumerate(pages, 1) if len(text.strip()) >= MIN_PAGE_CHARS and n not in labeled]
+    random.Random(seed).shuffle(candidates)
+
+    added = 0
+    with open(labels_path(corpus), "a", encoding="utf-8") as f:
+        for page_number in candidates[:num_pages]:
+            prompt = f"""Write {questions_per_page} distinct questions a Duke student might ask that are answered by the page below.
+Do not copy sentences verbatim and do not mention "the page". Return only a JSON list of strings.
+
+Page {page_number}:
+{pages[page_number - 1][:4000]}
+"""
+            response = get_chat_completion([SystemMessage("You write evaluation questions for a retrieval system."),
+                                            HumanMessage(prompt)])
+            if response is None:
+                continue
+            try:
+                text = response.content
+                questions = json.loads(text[text.find("["):text.rfind("]") + 1])
+            except (ValueError, AttributeError):
+                print(f"⚠️ Could not parse questions for page {page_number}")
+                continue
+            for question in questions[:questions_per_page]:
+                f.write(json.dumps({"query": str(question), "relevant_pages": [page_number], "source": "llm"}) + "\n")
+                added += 1
+    print(f"✅ Added {added} labeled queries to {labels_path(corpus)}")
+
+
+def chunk_pages(pages, chunking):
+    """Split pages per the chunking config; returns (texts, page number of each text)."""
+    if chunking == "page":
+        kept = [(n, text) for n, text in enumerate(pages, 1) if text.strip()]
+        return [text for _, text in kept], [n for n, _ in kept]
+
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    _, size, overlap = chunking.split("-")
+    splitter = RecursiveCharacterTextSplitter(chunk_size=int(size), chunk_overlap=int(overlap))
+    texts, page_numbers = [], []
+    for page_number, text in enumerate(pages, 1):
+        for chunk in splitter.split_text(text):
+            texts.append(chunk)
+            page_numbers.append(page_number)
+    return texts, page_numbers
+
+
+class EmbeddingCache:
+    """
+    Embeddings keyed by sha256(model, text), persisted in one .npz file.
+    With offline=True a missing embedding is an error instead of an API call.
+    """
+
+    def __init__(self, path=EMBEDDINGS_CACHE, model=EMBEDDING_MODEL, offline=False):
+        self.path = path
+        self.model = model
+        self.offline = offline
+        self.vectors = {}
+        self._dirty = False
+        if os.path.exists(path):
+            data = np.load(path)
+            self.vectors = dict(zip(data["keys"].tolist(), data["vectors"]))
+
+    def _key(self, text):
+        return hashlib.sha256(f"{self.model}\n{text}".encode("utf-8")).hexdigest()
+
+    def embed(self, texts, batch_size=100):
+        keys = [self._key(text) for text in texts]
+        missing = list(dict.fromkeys(k for k in keys if k not in self.vectors))
+        if missing:
+            if self.offline:
+                raise RuntimeError(f"{len(missing)} embeddings missing from {self.path}; run once without --offline")
+            from utils.openai_client import get_embeddings_model
+
+            model = get_embeddings_model()
+            texts_by_key = dict(zip(keys, texts))
+            for start in range(0, len(missing), batch_size):
+                batch = missing[start:start + batch_size]
+                for key, vector in zip(batch, model.embed_documents([texts_by_key[k] for k in batch])):
+                    self.vectors[key] = np.asarray(vector, dtype=np.float32)
+            self._dirty = True
+        return np.stack([self.vectors[k] for k in keys]) if keys else np.zeros((0, 0), dtype=np.float32)
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        keys = list(self.vectors)
+        np.savez_compressed(self.path, keys=np.asarray(keys), vectors=np.stack([self.vectors[k] for k in keys]))
+        self._dirty = False
+
+
+def _normalize(matrix):
+    return matrix / np.linalg.norm(matrix, axis=-1, keepdims=True).clip(min=1e-12)
+
+
+def _top(scores, k):
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class ExactBackend:
+    """Brute-force cosine similarity; the same ranking Pinecone's exact search returns."""
+
+    def __init__(self, texts, vectors, dtype=np.float32):
+        self.matrix = _normalize(vectors).astype(dtype)
+
+    def search(self, query, query_vector, k):
+        scores = (self.matrix @ _normalize(query_vector).astype(self.matrix.dtype)).astype(np.float32)
+        return _top(scores, k)
+
+
+class IVFBackend:
+    """
+    Inverted-file index: k-means clusters over the vectors, and only the
+    `nprobe` closest clusters are scanned per query. Trades recall for speed.
+    """
+
+    def __init__(self, texts, vectors, nlist=None, nprobe=4, iterations=10, seed=0):
+        self.matrix = _normalize(vectors)
+        nlist = nlist or max(int(np.sqrt(len(vectors))), 1)
+        rng = np.random.default_rng(seed)
+        centroids = self.matrix[rng.choice(len(vectors), size=min(nlist, len(vectors)), replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(self.matrix @ centroids.T, axis=1)
+            for c in range(len(centroids)):
+                members = self.matrix[assignment == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+        self.centroids = centroids
+        assignment = np.argmax(self.matrix @ centroids.T, axis=1)
+        self.lists = [np.flatnonzero(assignment == c) for c in range(len(centroids))]
+        self.nprobe = nprobe
+
+    def search(self, query, query_vector, k):
+        query_vector = _normalize(query_vector)
+        probes = _top(self.centroids @ query_vector, self.nprobe)
+        ids = np.concatenate([self.lists[c] for c in probes])
+        if not len(ids):
+            return ids
+        return ids[_top(self.matrix[ids] @ query_vector, k)]
+
+
+class BM25Backend:
+    """Lexical baseline using the repo's BM25 index; needs no embeddings."""
+
+    def __init__(self, texts, vectors=None):
+        self.index = BM25(texts)
+
+    def search(self, query, query_vector, k):
+        return np.asarray([doc_id for doc_id, _ in self.index.search(query, top_k=k)], dtype=int)
+
+
+class HybridBackend:
+    """Exact cosine blended with max-normalized BM25 (weight 0.5 each)."""
+
+    def __init__(self, texts, vectors, weight=0.5):
+        self.exact = ExactBackend(texts, vectors)
+        self.bm25 = BM25(texts)
+        self.weight = weight
+
+    def search(self, query, query_vector, k):
+        scores = self.exact.matrix @ _normalize(query_vector)
+        lexical = np.zeros(len(scores), dtype=np.float32)
+        for doc_id, score in self.bm25.scores(query).items():
+            lexical[doc_id] = score
+        if lexical.max() > 0:
+            lexical /= lexical.max()
+        return _top((1 - self.weight) * scores + self.weight * lexical, k)
+
+
+BACKENDS = {
+    "exact": ExactBackend,
+    "exact-f16": lambda texts, vectors: ExactBackend(texts, vectors, dtype=np.float16),
+    "ivf": IVFBackend,
+    "bm25": BM25Backend,
+    "hybrid": HybridBackend,
+}
+
+
+def rank_pages(chunk_ids, page_numbers):
+    """Collapse ranked chunks into ranked unique pages (what the tools pass to the LLM)."""
+    pages = []
+    for chunk_id in chunk_ids:
+        page = page_numbers[chunk_id]
+        if page not in pages:
+            pages.append(page)
+    return pages
+
+
+def evaluate(backend, labels, query_vectors, page_numbers, ks):
+    """recall@k and MRR over the labels, plus per-query search latency in ms."""
+    max_k = max(ks)
+    if query_vectors is None:  # lexical backends ignore the query vector
+        query_vectors = [None] * len(labels)
+    hits = {k: 0.0 for k in ks}
+    reciprocal_ranks, latencies = [], []
+    for label, query_vector in zip(labels, query_vectors):
+        started = time.perf_counter()
+        # Over-fetch chunks so that max_k distinct pages survive de-duplication
+        chunk_ids = backend.search(label["query"], query_vector, max_k * 5)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        ranked = rank_pages(chunk_ids, page_numbers)[:max_k]
+        relevant = set(label["relevant_pages"])
+        for k in ks:
+            hits[k] += len(relevant & set(ranked[:k])) / len(relevant)
+        rank = next((i for i, page in enumerate(ranked, 1) if page in relevant), None)
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+
+    n = len(labels) or 1
+    return {
+        **{f"recall@{k}": round(hits[k] / n, 4) for k in ks},
+        "mrr": round(sum(reciprocal_ranks) / n, 4),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)), 4) if latencies else None,
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)), 4) if latencies else None,
+    }
+
+
+def run(corpora, chunkings, backends, ks, offline=False):
+    cache = EmbeddingCache(offline=offline)
+    # A bm25-only run needs no embeddings at all (and works offline on an empty cache)
+    needs_vectors = any(name != "bm25" for name in backends)
+    results = []
+    try:
+        for corpus in corpora:
+            pages = load_pages(corpus)
+            labels = load_labels(corpus)
+            query_vectors = cache.embed([label["query"] for label in labels]) if needs_vectors else None
+            print(f"\n📚 {corpus}: {len(pages)} pages, {len(labels)} labeled queries")
+
+            for chunking in chunkings:
+                texts, page_numbers = chunk_pages(pages, chunking)
+                vectors = cache.embed(texts) if needs_vectors else None
+
+                for name in backends:
+                    started = time.perf_counter()
+                    backend = BACKENDS[name](texts, vectors)
+                    build_seconds = time.perf_counter() - started
+
+                    metrics = evaluate(backend, labels, query_vectors, page_numbers, ks)
+                    results.append({"corpus": corpus, "chunking": chunking, "backend": name,
+                                    "chunks": len(texts), "build_seconds": round(build_seconds, 4), **metrics})
+                    print(f"   {chunking:<16} {name:<10} " + "  ".join(
+                        f"R@{k} {metrics[f'recall@{k}']:.3f}" for k in ks)
+                        + f"  MRR {metrics['mrr']:.3f}  p50 {metrics['latency_ms_p50']}ms")
+    finally:
+        cache.save()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline retrieval quality/latency benchmark for mem_search and pratt_search")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    labels = sub.add_parser("build-labels", help="Generate labeled query -> page pairs with the LLM")
+    labels.add_argument("--corpus", choices=list(CORPORA), nargs="+", default=list(CORPORA))
+    labels.add_argument("--pages", type=int, default=40, help="Pages to sample per corpus")
+    labels.add_argument("--questions-per-page", type=int, default=2)
+    labels.add_argument("--seed", type=int, default=0)
+
+    bench = sub.add_parser("run", help="Benchmark backends and chunking configs")
+    bench.add_argument("--corpus", choices=list(CORPORA), nargs="+", default=list(CORPORA))
+    bench.add_argument("--chunking", nargs="+", default=DEFAULT_CHUNKINGS,
+                       help="'page' (current index) or 'chunk-<size>-<overlap>'")
+    bench.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=DEFAULT_BACKENDS)
+    bench.add_argument("--k", type=int, nargs="+", default=DEFAULT_KS)
+    bench.add_argument("--offline", action="store_true", help="Fail instead of calling the embeddings API")
+    bench.add_argument("--output", default=None)
+
+    args = parser.parse_args()
+
+    if args.command == "build-labels":
+        for corpus in args.corpus:
+            build_labels(corpus, args.pages, args.questions_per_page, args.seed)
+        return
+
+    results = run(args.corpus, args.chunking, args.backends, sorted(args.k), offline=args.offline)
+    timestamp = datetime.now(timezone.utc)
+    output = args.output or os.path.join(REPORT_DIR, f"retrieval_{timestamp.strftime('%Y%m%dT%H%M%SZ')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"meta": {"timestamp": timestamp.isoformat(), "embedding_model": EMBEDDING_MODEL},
+                   "results": results}, f, indent=2)
+    print(f"\n💾 Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+RUNS_DIR = "evaluation/runs"
+METADATA_KEY = b"run_metadata"
+
+COLUMNS = [
+    "question", "answer", "error",
+    "total_seconds", "llm_seconds", "tool_seconds", "iterations",
+    "prompt_tokens", "completion_tokens", "tools_used",
+    "relevant", "clarity", "judge_seconds",
+]
+
+# metric -> (column or derived series, True if higher is better)
+METRICS = {
+    "latency_seconds": ("total_seconds", False),
+    "llm_seconds": ("llm_seconds", False),
+    "tool_seconds": ("tool_seconds", False),
+    "total_tokens": ("total_tokens", False),
+    "iterations": ("iterations", False),
+    "clarity": ("clarity", True),
+    "relevant_rate": ("relevant_yes", True),
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=project_root, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_row(record):
+    """Flatten an eval/benchmark record into the run store columns."""
+    tool_calls = record.get("tool_calls") or {}
+    tool_seconds = record.get("tool_seconds")
+    clarity = _number(record.get("clarity"))
+    return {
+        "question": record["question"],
+        "answer": record.get("answer", ""),
+        "error": record.get("error"),
+        "total_seconds": record.get("total_seconds", record.get("answer_seconds")),
+        "llm_seconds": record.get("llm_seconds"),
+        "tool_seconds": sum(tool_seconds.values()) if isinstance(tool_seconds, dict) else tool_seconds,
+        "iterations": record.get("iterations"),
+        "prompt_tokens": record.get("prompt_tokens"),
+        "completion_tokens": record.get("completion_tokens"),
+        "tools_used": ",".join(sorted(tool_calls)),
+        "relevant": record.get("relevant"),
+        # The judge uses "0" for failed evaluations
+        "clarity": clarity if clarity and clarity > 0 else None,
+        "judge_seconds": record.get("judge_seconds"),
+    }
+
+
+def save_run(records, metadata=None, runs_dir=RUNS_DIR, run_id=None):
+    """
+    Store one run as a Parquet file with the run metadata (git commit, kind,
+    models, timestamp, ...) embedded in the schema. Returns the file path.
+    """
+    created = datetime.now(timezone.utc)
+    commit = git_commit()
+    run_id = run_id or f"{created.strftime('%Y%m%dT%H%M%SZ')}_{commit or 'nogit'}"
+    metadata = {"run_id": run_id, "created_at": created.isoformat(), "git_commit": commit, **(metadata or {})}
+
+    df = pd.DataFrame([_to_row(r) for r in records], columns=COLUMNS)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           METADATA_KEY: json.dumps(metadata).encode("utf-8")})
+
+    os.makedirs(runs_dir, exist_ok=True)
+    path = os.path.join(runs_dir, f"{run_id}.parquet")
+    pq.write_table(table, path)
+    return path
+
+
+def resolve_run(run, runs_dir=RUNS_DIR):
+    """Accept a path, a run id, or 'latest' / 'previous'."""
+    if os.path.exists(run):
+        return run
+    if run in ("latest", "previous"):
+        paths = sorted(os.path.join(runs_dir, name) for name in os.listdir(runs_dir) if name.endswith(".parquet"))
+        index = -1 if run == "latest" else -2
+        if len(paths) < -index:
+            raise FileNotFoundError(f"Not enough runs in {runs_dir} for '{run}'")
+        return paths[index]
+    path = os.path.join(runs_dir, f"{run}.parquet")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No run '{run}' in {runs_dir}")
+    return path
+
+
+def read_metadata(path):
+    metadata = pq.read_schema(path).metadata or {}
+    return json.loads(metadata.get(METADATA_KEY, b"{}"))
+
+
+def load_run(run, runs_dir=RUNS_DIR):
+    """Return (DataFrame, metadata) for a stored run."""
+    path = resolve_run(run, runs_dir)
+    return pq.read_table(path).to_pandas(), read_metadata(path)
+
+
+def list_runs(runs_dir=RUNS_DIR):
+    if not os.path.isdir(runs_dir):
+        return []
+    runs = []
+    for name in sorted(os.listdir(runs_dir)):
+        if name.endswith(".parquet"):
+            path = os.path.join(runs_dir, name)
+            runs.append({**read_metadata(path), "rows": pq.read_metadata(path).num_rows})
+    return runs
+
+
+def _metric_values(df):
+    df = df.copy()
+    for column in ("total_seconds", "llm_seconds", "tool_seconds", "iterations",
+                   "prompt_tokens", "completion_tokens", "clarity"):
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    df["total_tokens"] = df["prompt_tokens"] + df["completion_tokens"]
+    df["relevant_yes"] = df["relevant"].map(lambda v: None if pd.isna(v) else float(str(v).lower() == "yes"))
+    return df
+
+
+def paired_permutation_test(diffs, n_resamples=10000, rng=None):
+    """Two-sided sign-flip permutation p-value for a mean paired difference of zero."""
+    rng = rng or np.random.default_rng(0)
+    observed = abs(diffs.mean())
+    signs = rng.choice([-1.0, 1.0], size=(n_resamples, len(diffs)))
+    permuted = np.abs((signs * diffs).mean(axis=1))
+    return (np.sum(permuted >= observed - 1e-12) + 1) / (n_resamples + 1)
+
+
+def bootstrap_ci(diffs, n_resamples=10000, confidence=0.95, rng=None):
+    """Percentile bootstrap confidence interval for the mean paired difference."""
+    rng = rng or np.random.default_rng(0)
+    samples = rng.choice(diffs, size=(n_resamples, len(diffs)), replace=True).mean(axis=1)
+    tail = (1 - confidence) / 2
+    return float(np.quantile(samples, tail)), float(np.quantile(samples, 1 - tail))
+
+
+def compare_runs(base, candidate, alpha=0.05, min_effect=0.05, n_resamples=10000, runs_dir=RUNS_DIR):
+    """
+    Compare two runs question by question.
+
+    For each metric the per-question differences (candidate - base) are tested
+    with a paired sign-flip permutation test, and a bootstrap CI is reported.
+    A metric is flagged as a regression when it moved in the bad direction,
+    p < alpha, and the relative change of the mean is at least min_effect.
+    """
+    base_df, base_meta = load_run(base, runs_dir)
+    cand_df, cand_meta = load_run(candidate, runs_dir)
+    merged = _metric_values(base_df).merge(_metric_values(cand_df), on="question", suffixes=("_base", "_cand"))
+
+    rng = np.random.default_rng(0)
+    results = {}
+    for metric, (column, higher_is_better) in METRICS.items():
+        pair = merged[[f"{column}_base", f"{column}_cand"]].apply(pd.to_numeric, errors="coerce").dropna()
+        if len(pair) < 2:
+            continue
+        base_values = pair[f"{column}_base"].to_numpy(dtype=float)
+        cand_values = pair[f"{column}_cand"].to_numpy(dtype=float)
+        diffs = cand_values - base_values
+
+        base_mean, cand_mean = base_values.mean(), cand_values.mean()
+        relative = (cand_mean - base_mean) / abs(base_mean) if base_mean else 0.0
+        p_value = float(paired_permutation_test(diffs, n_resamples, rng)) if diffs.any() else 1.0
+        worse = (cand_mean < base_mean) if higher_is_better else (cand_mean > base_mean)
+        better = (cand_mean > base_mean) if higher_is_better else (cand_mean < base_mean)
+        significant = p_value < alpha and abs(relative) >= min_effect
+
+        results[metric] = {
+            "n": int(len(diffs)),
+            "base_mean": round(float(base_mean), 4),
+            "candidate_mean": round(float(cand_mean), 4),
+            "base_p95": round(float(np.percentile(base_values, 95)), 4),
+            "candidate_p95": round(float(np.percentile(cand_values, 95)), 4),
+            "relative_change": round(float(relative), 4),
+            "mean_diff_ci": [round(v, 4) for v in bootstrap_ci(diffs, n_resamples, rng=rng)],
+            "p_value": round(p_value, 4),
+            "regression": bool(significant and worse),
+            "improvement": bool(significant and better),
+        }
+
+    return {
+        "base": base_meta,
+        "candidate": cand_meta,
+        "paired_questions": int(len(merged)),
+        "metrics": results,
+        "regressions": [metric for metric, result in results.items() if result["regression"]],
+    }
+
+
+def print_comparison(report):
+    print(f"\n📊 {report['base'].get('run_id')} → {report['candidate'].get('run_id')} "
+          f"({report['paired_questions']} paired questions)")
+    for metric, r in report["metrics"].items():
+        flag = "❌ REGRESSION" if r["regression"] else ("✅ improved" if r["improvement"] else "")
+        print(f"   {metric:<16} {r['base_mean']:>10} → {r['candidate_mean']:<10} "
+              f"({r['relative_change']:+.1%}, p={r['p_value']}) {flag}")
+    if report["regressions"]:
+        print(f"\n❌ Regressions: {', '.join(report['regressions'])}")
+    else:
+        print("\n✅ No significant regressions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stored evaluation runs and cross-run regression comparison")
+    parser.add_argument("--runs-dir", default=RUNS_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="List stored runs")
+
+    compare = sub.add_parser("compare", help="Compare two runs (ids, paths, 'latest' or 'previous')")
+    compare.add_argument("base")
+    compare.add_argument("candidate", nargs="?", default="latest")
+    compare.add_argument("--alpha", type=float, default=0.05)
+    compare.add_argument("--min-effect", type=float, default=0.05, help="Minimum relative change of the mean to flag")
+    compare.add_argument("--resamples", type=int, default=10000)
+    compare.add_argument("--json", action="store_true", help="Print the full report as JSON")
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for run in list_runs(args.runs_dir):
+            print(f"{run.get('run_id')}  {run.get('kind', '?'):<10} {run['rows']:>4} rows  commit {run.get('git_commit')}"
+                  f"  {run.get('notes', '')}")
+        return
+
+    report = compare_runs(args.base, args.candidate, alpha=args.alpha, min_effect=args.min_effect,
+                          n_resamples=args.resamples, runs_dir=args.runs_dir)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_comparison(report)
+    sys.exit(1 if report["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
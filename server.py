@@ -0,0 +1,261 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agent_executor import CustomAgentExecutor, create_agent_executor
+from utils.admission import AdmissionController, Busy
+from utils.rate_limiter import RateLimitExceeded, limiter_status
+from utils.session_store import SessionStore
+from utils.warmup import WarmUp, default_steps, faq_questions, warmup_enabled
+
+AGENT_WORKERS = int(os.getenv("AGENT_WORKERS", "8"))
+AGENT_MAX_QUEUE = int(os.getenv("AGENT_MAX_QUEUE", str(AGENT_WORKERS * 4)))  # messages waiting for a worker
+AGENT_MAX_WAIT = float(os.getenv("AGENT_MAX_WAIT", "30"))  # answer "busy" rather than queue longer than this
+MAX_ITERATIONS = 10
+HISTORY_LIMIT = 20  # messages kept per session, as the Streamlit app did
+WARMUP_FAQ = int(os.getenv("WARMUP_FAQ", "0"))  # eval questions to precompute answers for at boot
+FAQ_TTL = 60 * 60  # serve a precomputed answer for an hour
+
+
+class ChatRequest(BaseModel):
+    message: str
+    session_id: Optional[str] = None
+
+
+def normalize_question(text):
+    return " ".join(text.lower().split()).rstrip("?!. ")
+
+
+def to_messages(history):
+    """Stored {"role", "content"} dicts -> LangChain messages for the prompt."""
+    return [HumanMessage(content=m["content"]) if m["role"] == "user" else AIMessage(content=m["content"])
+            for m in history]
+
+
+class AgentService:
+    """
+    Runs one shared, stateless CustomAgentExecutor on a bounded worker pool.
+    Conversation history lives in a SessionStore and is passed in per call, so
+    sessions never share mutable state; turns within a session are serialized
+    by the store's session lock while different sessions run in parallel.
+    Requests enter through an AdmissionController, which schedules sessions
+    fairly and turns overload into an immediate Busy.
+    """
+
+    def __init__(self, workers: int = AGENT_WORKERS, max_iterations: int = MAX_ITERATIONS,
+                 store: Optional[SessionStore] = None):
+        self.workers = workers
+        self.max_iterations = max_iterations
+        self.admission = AdmissionController(workers, max_queue=AGENT_MAX_QUEUE, max_wait=AGENT_MAX_WAIT)
+        self.store = store or SessionStore(max_messages=HISTORY_LIMIT)
+        self._executor: Optional[CustomAgentExecutor] = None
+        self._lock = threading.Lock()
+        self.faq: Dict[str, tuple] = {}  # normalized question -> (answer, tools_used, computed_at)
+
+    @property
+    def executor(self) -> CustomAgentExecutor:
+        # Built on first use; cheap now that tools load lazily and the prompt is vendored
+        with self._lock:
+            if self._executor is None:
+                self._executor = create_agent_executor(max_iterations=self.max_iterations)
+            return self._executor
+
+    def run(self, session_id: str, message: str, on_event=None) -> Dict[str, Any]:
+        """Answer one message in a session (blocking; call from the worker pool)."""
+        started = time.perf_counter()
+        with self.store.lock(session_id):
+            history = self.store.history(session_id)
+            # Precomputed FAQ answers only apply to a conversation's first message
+            cached = None if history else self.faq_answer(message)
+            if cached:
+                answer, tools_used = cached
+            else:
+                result = self.executor.run(message, to_messages(history), on_event=on_event)
+                answer, tools_used = result["answer"], list(result["stats"].get("tool_calls", {}))
+            self.store.append(session_id, message, answer)
+        return {
+            "session_id": session_id,
+            "answer": answer,
+            "tools_used": tools_used,
+            "seconds": round(time.perf_counter() - started, 3),
+            "cached": cached is not None,
+        }
+
+    def faq_answer(self, message: str) -> Optional[tuple]:
+        entry = self.faq.get(normalize_question(message))
+        if entry and time.time() - entry[2] < FAQ_TTL:
+            return entry[0], entry[1]
+        return None
+
+    def precompute_faq(self, questions) -> Dict[str, int]:
+        """Answer FAQ questions ahead of time (sequentially, off the request pool)."""
+        answered = 0
+        for question in questions:
+            try:
+                result = self.executor.run(question)
+            except Exception as e:
+                print(f"⚠️ FAQ precompute failed for {question[:60]}: {e}")
+                continue
+            self.faq[normalize_question(question)] = (
+                result["answer"], list(result["stats"].get("tool_calls", {})), time.time())
+            answered += 1
+        return {"questions": len(questions), "answered": answered}
+
+    def clear(self, session_id: str) -> bool:
+        # Not under the session lock: a DELETE shouldn't wait for a running turn
+        return self.store.clear(session_id)
+
+
+service = AgentService()
+
+
+def warm_agent():
+    """Build the shared executor (LLM client and bound tool schemas)."""
+    return {"tools": len(service.executor.tools)}
+
+
+# Stage 1 warms tool indexes, clients and the executor in parallel and gates
+# readiness; stage 2 optionally precomputes FAQ answers in the background with
+# everything already warm (until then FAQ questions just run the agent)
+warmup = WarmUp([
+    {**default_steps(), "agent": warm_agent},
+    {"faq": lambda: service.precompute_faq(faq_questions(WARMUP_FAQ))},
+], ready_after=1)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    service.store.start()
+    if warmup_enabled():
+        warmup.start()
+    yield
+    service.store.stop()
+
+
+app = FastAPI(title="Duke University Assistant API", lifespan=lifespan)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "sessions": service.store.stats(), "admission": service.admission.status(),
+            "rate_limits": limiter_status(), "warmup": warmup.status()}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until the first warm-up stage finished (always ready with WARMUP=0)."""
+    is_ready = warmup.ready or not warmup_enabled()
+    return JSONResponse({"ready": is_ready, **warmup.status()}, status_code=200 if is_ready else 503)
+
+
+def as_busy(error: Exception) -> Optional[Busy]:
+    """Busy for admission rejections and exhausted upstream rate limits, else None."""
+    if isinstance(error, Busy):
+        return error
+    if isinstance(error, RateLimitExceeded):
+        return Busy(f"The assistant is busy ({error.upstream} rate limit)", error.wait)
+    return None
+
+
+def busy_response(session_id: str, busy: Busy) -> JSONResponse:
+    return JSONResponse({"session_id": session_id, "error": "busy", "message": busy.reason,
+                         "retry_after": busy.retry_after},
+                        status_code=503, headers={"Retry-After": str(busy.retry_after)})
+
+
+@app.post("/chat")
+async def chat(request: ChatRequest):
+    """Answer a message and return the full result as JSON (503 with Retry-After when busy)."""
+    session_id = request.session_id or uuid.uuid4().hex
+    try:
+        future = service.admission.submit(session_id, service.run, session_id, request.message)
+        return await asyncio.wrap_future(future)
+    except Exception as e:
+        busy = as_busy(e)
+        if busy:
+            return busy_response(session_id, busy)
+        return {"session_id": session_id, "error": str(e)}
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Answer a message as newline-delimited JSON events: "session", then
+    "thinking" / "tool_start" / "tool_end" progress, then "answer", "busy" or
+    "error". A request rejected at admission gets a plain 503 JSON response.
+    """
+    session_id = request.session_id or uuid.uuid4().hex
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def publish(event):
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def done(future):
+        # Also runs for jobs that expired in the queue without ever starting
+        error = future.exception()
+        busy = as_busy(error) if error else None
+        if error is None:
+            publish({"type": "answer", **future.result()})
+        elif busy:
+            publish({"type": "busy", "session_id": session_id, "message": busy.reason,
+                     "retry_after": busy.retry_after})
+        else:
+            publish({"type": "error", "session_id": session_id, "error": str(error)})
+        publish(None)
+
+    try:
+        future = service.admission.submit(session_id, service.run, session_id, request.message, publish)
+    except Busy as busy:
+        return busy_response(session_id, busy)
+    future.add_done_callback(done)
+
+    async def events():
+        yield json.dumps({"type": "session", "session_id": session_id}) + "\n"
+        while True:
+            event = await queue.get()
+            if event is None:
+                break
+            yield json.dumps(event, default=str) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.delete("/sessions/{session_id}")
+def clear_session(session_id: str):
+    # Plain def: FastAPI runs it in its threadpool, so SQLite I/O doesn't block the event loop
+    return {"session_id": session_id, "cleared": service.clear(session_id)}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the Duke advisor agent over HTTP")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Server processes; history is persisted in SQLite, but each process caches sessions, "
+                             "so use session-affine routing for >1")
+    parser.add_argument("--no-warmup", action="store_true", help="Skip the background warm-up at boot")
+    parser.add_argument("--warm-faq", type=int, default=WARMUP_FAQ,
+                        help="Precompute answers for the first N eval questions during warm-up")
+    args = parser.parse_args()
+
+    # uvicorn imports the app afresh (in each worker), so settings travel via the environment
+    os.environ["WARMUP_FAQ"] = str(args.warm_faq)
+    if args.no_warmup:
+        os.environ["WARMUP"] = "0"
+
+    uvicorn.run("server:app", host=args.host, port=args.port, workers=args.workers)
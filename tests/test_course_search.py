@@ -0,0 +1,69 @@
+import os
+import sys
+
+import pytest
+
+for module in ("requests", "dotenv", "langchain_core"):
+    pytest.importorskip(module)
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tools import courseSearchTool  # noqa: E402
+from tools.courseSearchTool import CourseSearchIndex, resolve_career  # noqa: E402
+from utils.course_catalog import CourseCatalog  # noqa: E402
+
+COURSES = [
+    # (subject, catalog_nbr, crse_id, title, career)
+    ("AIPI", "531", "100001", "Reinforcement Learning for Product Innovation", "Graduate"),
+    ("COMPSCI", "372", "100002", "Introduction to Reinforcement Learning", "Undergraduate"),
+    ("ECE", "590", "100003", "Reinforcement Learning in Control", "Dual-Degree Undergraduate"),
+]
+
+
+def add_courses(catalog, courses):
+    for subject, catalog_nbr, crse_id, title, career in courses:
+        catalog.replace_subject(subject, subject, [
+            {"catalog_nbr": catalog_nbr, "title": title, "term": "Fall", "crse_id": crse_id, "crse_offer_nbr": "1"}])
+        catalog.put_details(crse_id, "1", {"title": title, "description": f"{title}.", "career": career})
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = CourseCatalog(str(tmp_path / "catalog.db"))
+    add_courses(catalog, COURSES)
+    return catalog
+
+
+def titles(results):
+    return [result["title"] for result in results]
+
+
+def test_resolve_career():
+    assert resolve_career("Graduate") == "graduate"
+    assert resolve_career("GRAD") == "graduate"
+    assert resolve_career("undergrad") == "undergraduate"
+    assert resolve_career("Spaceflight") is None
+
+
+def test_graduate_filter_excludes_undergraduate_courses(catalog):
+    index = CourseSearchIndex(catalog, embeddings_file="")
+    assert titles(index.search("reinforcement learning", career="Graduate")) == [
+        "Reinforcement Learning for Product Innovation"]
+    assert titles(index.search("reinforcement learning", career="UGRD")) == [
+        "Introduction to Reinforcement Learning"]
+    assert len(index.search("reinforcement learning")) == 3
+
+
+def test_search_index_rebuilds_after_sync(tmp_path, monkeypatch):
+    catalog = CourseCatalog(str(tmp_path / "catalog.db"))
+    monkeypatch.setattr(courseSearchTool, "course_catalog", catalog)
+    monkeypatch.setattr(courseSearchTool, "INDEX_CHECK_INTERVAL", 0)
+    monkeypatch.setattr(courseSearchTool, "_search_index", None)
+
+    # Started before the catalog was synced: empty, but not stuck that way
+    assert courseSearchTool.get_search_index().courses == []
+    add_courses(catalog, COURSES)
+    assert len(courseSearchTool.get_search_index().courses) == 3
+
+    index = courseSearchTool.get_search_index()
+    assert courseSearchTool.get_search_index() is index  # no sync since, no rebuild
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("bs4")
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'professorsData')))
+
+from rmp_parser import (  # noqa: E402
+    SnapshotElement, extract_professor_data, load_checkpoint, parse_snapshot, write_snapshot,
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "rmp_card.html")
+EXPECTED = {
+    "name": "Jane Doe",
+    "department": "Computer Science",
+    "rating": "4.6",
+    "would_take_again": "92%",
+    "num_ratings": "87",
+}
+
+
+def read_card():
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def test_extract_professor_data_from_saved_card():
+    from bs4 import BeautifulSoup
+
+    card = SnapshotElement(BeautifulSoup(read_card(), "html.parser"))
+    assert extract_professor_data(card) == EXPECTED
+
+
+def test_parse_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "batch_00000.html")
+    # A card without a name is dropped rather than logged as "Unknown"
+    write_snapshot([read_card(), '<a class="TeacherCard"><div>no name here</div></a>', read_card()], path)
+    assert parse_snapshot(path) == [EXPECTED, EXPECTED]
+    assert not os.path.exists(f"{path}.tmp")
+
+
+def test_default_checkpoint(tmp_path):
+    assert load_checkpoint(str(tmp_path / "missing.json")) == {
+        "cards_saved": 0, "next_snapshot": 0, "parsed_snapshots": []}
@@ -0,0 +1,109 @@
+import os
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+for module in ("requests", "dotenv", "bs4", "readability", "langchain_core"):
+    pytest.importorskip(module)
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import site_indexer  # noqa: E402
+
+# path -> (ETag, paragraphs); each sentence becomes one chunk (see fake_chunks)
+PAGES = {}
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Serves PAGES and answers a matching If-None-Match with 304, like the AIPI/MEng sites."""
+
+    def do_GET(self):
+        etag, paragraphs = PAGES[self.path]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = "<html><head><title>{}</title></head><body><article>{}</article></body></html>".format(
+            self.path, "".join(f"<p>{p}</p>" for p in paragraphs)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeIndex:
+    def __init__(self):
+        self.upserted, self.deleted = [], []
+
+    def upsert(self, vectors, namespace=None):
+        self.upserted.extend(v["id"] for v in vectors)
+
+    def delete(self, ids, namespace=None):
+        self.deleted.extend(ids)
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[float(len(text))] for text in texts]
+
+
+def fake_chunks(text, chunk_size=1000, chunk_overlap=100):
+    return [sentence for sentence in re.split(r"(?<=\.)\s*", text) if sentence]
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_etag_skip_and_changed_page_reindex(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(site_indexer, "chunk_text", fake_chunks)
+    state_path = str(tmp_path / "state.json")
+    urls = [f"{server}/overview", f"{server}/courses"]
+    PAGES.clear()
+    PAGES["/overview"] = ('"o1"', ["Program overview and goals of the degree."])
+    PAGES["/courses"] = ('"c1"', ["First course description.", "Second course description.",
+                                  "Third course description."])
+
+    def run():
+        index = FakeIndex()
+        stats = site_indexer.index_sites(urls, index, FakeEmbeddings(), state_path=state_path, max_workers=2)
+        return stats, index
+
+    stats, index = run()
+    assert stats == {"not_modified": 0, "unchanged": 0, "indexed": 2, "error": 0}
+    courses_chunks = site_indexer.load_state(state_path)[urls[1]]["num_chunks"]
+    assert courses_chunks >= 2
+
+    # Nothing changed: both pages answer 304 and nothing is embedded or written
+    stats, index = run()
+    assert stats == {"not_modified": 2, "unchanged": 0, "indexed": 0, "error": 0}
+    assert index.upserted == [] and index.deleted == []
+
+    # A new ETag with the same text is fetched but not re-indexed
+    PAGES["/overview"] = ('"o2"', PAGES["/overview"][1])
+    stats, index = run()
+    assert stats == {"not_modified": 1, "unchanged": 1, "indexed": 0, "error": 0}
+    assert index.upserted == []
+
+    # Shorter new content: re-upserted, and the chunks past its end are deleted
+    PAGES["/courses"] = ('"c2"', ["Only one course this term."])
+    stats, index = run()
+    assert stats == {"not_modified": 1, "unchanged": 0, "indexed": 1, "error": 0}
+    assert index.upserted == [site_indexer._vector_id(urls[1], 0)]
+    assert index.deleted == [site_indexer._vector_id(urls[1], i) for i in range(1, courses_chunks)]
+    assert site_indexer.load_state(state_path)[urls[1]]["num_chunks"] == 1
@@ -1,10 +1,13 @@
 import os
 import json
+import threading
 from typing import Dict, List, Any
 from pinecone import Pinecone
 from openai import OpenAI
 from dotenv import load_dotenv
 from langchain_core.tools import tool
+from utils.pinecone_utils import RateLimitedIndex
+from utils.rate_limiter import get_limiter, estimate_tokens
 
 load_dotenv()
 
@@ -31,7 +34,7 @@ class PineconeRetriever:
         
         # Initialize Pinecone with new API
         self.pc = Pinecone(api_key=self.api_key)
-        self.index = self.pc.Index(self.index_name)
+        self.index = RateLimitedIndex(self.pc.Index(self.index_name))
         
         # Initialize OpenAI client
         self.client = OpenAI(api_key=self.openai_api_key)
@@ -46,10 +49,12 @@ class PineconeRetriever:
         Returns:
             List[float]: Vector embedding
         """
-        response = self.client.embeddings.create(
-            input=text,
-            model=self.embedding_model
-        )
+        with get_limiter("openai_embeddings").limit(estimate_tokens(text)) as settle:
+            response = self.client.embeddings.create(
+                input=text,
+                model=self.embedding_model
+            )
+            settle(response.usage.total_tokens)
         return response.data[0].embedding
     
     def query_and_reconstruct(self, query: str, top_k: int = 3) -> Dict[str, Any]:
@@ -128,6 +133,20 @@ class PineconeRetriever:
             "reconstructed_files": reconstructed_files
         }
 
+_retriever = None
+_retriever_lock = threading.Lock()
+
+
+def get_retriever() -> PineconeRetriever:
+    """One PineconeRetriever (Pinecone and OpenAI clients) reused across calls."""
+    global _retriever
+    if _retriever is None:
+        with _retriever_lock:
+            if _retriever is None:
+                _retriever = PineconeRetriever()
+    return _retriever
+
+
 @tool
 def get_AIPI_details(query: str, api_key=None) -> Dict[str, Any]:
     """
@@ -147,7 +166,7 @@ def get_AIPI_details(query: str, api_key=None) -> Dict[str, Any]:
     Example: "Tell me about the AIPI program curriculum"
     """
     try:
-        retriever = PineconeRetriever()
+        retriever = get_retriever()
         result = retriever.query_and_reconstruct(query)
         return result
     except Exception as e:
@@ -0,0 +1,266 @@
+import os
+import sys
+import json
+import time
+import threading
+from typing import Dict, List, Optional
+from langchain_core.tools import tool
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.bm25 import BM25
+from utils.fuzzy_index import normalize
+from tools.curriculumTool import course_catalog, resolve_subject
+
+EMBEDDINGS_FILE = "data/curriculumData/course_embeddings.npz"
+CAREERS_FILE = "data/curriculumData/duke_acad_careers.json"
+INDEX_CHECK_INTERVAL = 60  # seconds between checks for a newer catalog sync
+
+# Informal career names -> codes in duke_acad_careers.json
+CAREER_ALIASES = {"grad": "GRAD", "masters": "GRAD", "phd": "GRAD", "undergrad": "UGRD"}
+
+
+def load_careers():
+    """Load the academic career code -> name map (e.g. GRAD -> Graduate)."""
+    try:
+        with open(CAREERS_FILE, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading academic careers: {e}")
+        return {}
+
+
+CAREERS = load_careers()
+
+
+def resolve_career(career: str) -> Optional[str]:
+    """
+    Normalized career name for a code, alias or name ("GRAD", "grad",
+    "Graduate" -> "graduate"), or None if it isn't a known career.
+    """
+    key = normalize(career)
+    code = CAREER_ALIASES.get(key, key.upper())
+    if code in CAREERS:
+        return normalize(CAREERS[code])
+    if not CAREERS or key in {normalize(name) for name in CAREERS.values()}:
+        return key
+    return None
+
+
+class CourseSearchIndex:
+    """
+    Search index over course titles and long descriptions from the local catalog.
+
+    Cross-listed courses are stored once per (crse_id, crse_offer_nbr) with all
+    of their subject codes. BM25 is always available; if a precomputed embedding
+    matrix exists, semantic queries blend cosine similarity into the ranking.
+    """
+
+    def __init__(self, catalog, embeddings_file: str = EMBEDDINGS_FILE):
+        self.courses: List[Dict] = []
+        by_offering: Dict[tuple, Dict] = {}
+
+        for subject_code, summary, details in catalog.iter_details():
+            key = (summary["crse_id"], summary["crse_offer_nbr"])
+            course = by_offering.get(key)
+            if course is None:
+                course = {
+                    "crse_id": summary["crse_id"],
+                    "crse_offer_nbr": summary["crse_offer_nbr"],
+                    "title": details.get("title") or summary["title"],
+                    "description": details.get("description", ""),
+                    "career": details.get("career", "N/A"),
+                    "term": summary["term"],
+                    "listings": [],
+                }
+                by_offering[key] = course
+                self.courses.append(course)
+            course["listings"].append(f"{subject_code} {summary['catalog_nbr']}")
+
+        self.bm25 = BM25(self.document_text(course) for course in self.courses)
+        self.embeddings = self._load_embeddings(embeddings_file)
+
+    @staticmethod
+    def document_text(course: Dict) -> str:
+        # Titles are short, so repeat them to weigh title hits above description hits
+        return f"{course['title']} {course['title']} {' '.join(course['listings'])} {course['description']}"
+
+    @staticmethod
+    def offering_id(course: Dict) -> str:
+        return f"{course['crse_id']}-{course['crse_offer_nbr']}"
+
+    def _load_embeddings(self, path: str):
+        """Load the precomputed embedding matrix, aligned to self.courses, if present."""
+        if not os.path.exists(path):
+            return None
+        try:
+            import numpy as np
+
+            data = np.load(path)
+            row_of = {offering_id: row for row, offering_id in enumerate(data["ids"].tolist())}
+            rows = [row_of.get(self.offering_id(course), -1) for course in self.courses]
+            matrix = np.zeros((len(self.courses), data["vectors"].shape[1]), dtype=np.float32)
+            present = np.array([row >= 0 for row in rows])
+            if present.any():
+                matrix[present] = data["vectors"][[row for row in rows if row >= 0]]
+            return matrix
+        except Exception as e:
+            print(f"⚠️ Could not load course embeddings: {e}")
+            return None
+
+    def _allowed(self, subject_code: Optional[str], career: Optional[str]) -> Optional[set]:
+        if not subject_code and not career:
+            return None
+        # Exact match: "graduate" is a substring of "undergraduate"
+        career = (resolve_career(career) or normalize(career)) if career else None
+        allowed = set()
+        for doc_id, course in enumerate(self.courses):
+            if subject_code and not any(listing.split(" ")[0] == subject_code for listing in course["listings"]):
+                continue
+            if career and normalize(course["career"]) != career:
+                continue
+            allowed.add(doc_id)
+        return allowed
+
+    def search(self, query: str, top_k: int = 10, subject_code: Optional[str] = None,
+               career: Optional[str] = None, query_embedding=None, semantic_weight: float = 0.5) -> List[Dict]:
+        """Rank courses for a query, blending BM25 with cosine similarity when an embedding is given."""
+        allowed = self._allowed(subject_code, career)
+        candidates = max(top_k * 5, 50)
+        lexical = dict(self.bm25.search(query, top_k=candidates, allowed=allowed))
+
+        if query_embedding is not None and self.embeddings is not None:
+            import numpy as np
+
+            vector = np.asarray(query_embedding, dtype=np.float32)
+            vector /= np.linalg.norm(vector) or 1.0
+            cosine = self.embeddings @ vector
+            if allowed is not None:
+                mask = np.full(len(self.courses), -np.inf, dtype=np.float32)
+                mask[list(allowed)] = 0.0
+                cosine = cosine + mask
+            semantic_ids = np.argsort(-cosine)[:candidates]
+
+            top_lexical = max(lexical.values(), default=0.0) or 1.0
+            combined = {}
+            for doc_id in set(lexical) | {int(i) for i in semantic_ids if np.isfinite(cosine[i])}:
+                combined[doc_id] = ((1 - semantic_weight) * lexical.get(doc_id, 0.0) / top_lexical
+                                    + semantic_weight * float(cosine[doc_id]))
+            ranked = sorted(combined.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        else:
+            ranked = sorted(lexical.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+        results = []
+        for doc_id, score in ranked:
+            course = self.courses[doc_id]
+            description = course["description"] or ""
+            results.append({
+                "courses": course["listings"],
+                "title": course["title"],
+                "career": course["career"],
+                "term": course["term"],
+                "description": description[:300] + ("..." if len(description) > 300 else ""),
+                "crse_id": course["crse_id"],
+                "crse_offer_nbr": course["crse_offer_nbr"],
+                "score": round(score, 4),
+            })
+        return results
+
+
+_search_index = None
+_search_index_synced_at = None
+_search_index_checked_at = 0.0
+_search_index_lock = threading.Lock()
+
+
+def get_search_index() -> CourseSearchIndex:
+    """
+    Build the course search index on first use and rebuild it when the catalog
+    has been synced since (checked at most every INDEX_CHECK_INTERVAL seconds),
+    so a server started before `python utils/course_catalog.py` picks it up.
+    """
+    global _search_index, _search_index_synced_at, _search_index_checked_at
+    if _search_index is None or time.time() - _search_index_checked_at > INDEX_CHECK_INTERVAL:
+        with _search_index_lock:
+            if _search_index is None or time.time() - _search_index_checked_at > INDEX_CHECK_INTERVAL:
+                synced_at = course_catalog.last_synced()
+                if _search_index is None or synced_at != _search_index_synced_at:
+                    _search_index = CourseSearchIndex(course_catalog)
+                    _search_index_synced_at = synced_at
+                _search_index_checked_at = time.time()
+    return _search_index
+
+
+def build_course_embeddings(path: str = EMBEDDINGS_FILE, batch_size: int = 256) -> int:
+    """Embed every catalog course and save the normalized matrix for semantic search."""
+    import numpy as np
+    from utils.openai_client import get_embeddings_model
+
+    index = CourseSearchIndex(course_catalog, embeddings_file="")
+    embeddings = get_embeddings_model()
+    texts = [f"{course['title']}. {course['description']}" for course in index.courses]
+
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        vectors.extend(embeddings.embed_documents(texts[start:start + batch_size]))
+        print(f"Embedded {min(start + batch_size, len(texts))}/{len(texts)} courses")
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True).clip(min=1e-12)
+    ids = np.array([CourseSearchIndex.offering_id(course) for course in index.courses])
+    np.savez_compressed(path, ids=ids, vectors=matrix)
+    return len(ids)
+
+
+@tool
+def search_courses(query: str, subject: Optional[str] = None, career: Optional[str] = None,
+                   top_k: int = 10, semantic: bool = False):
+    """
+    **COURSE SEARCH TOOL**: Find courses by topic across ALL subjects using titles and descriptions.
+
+    **Use when:**
+    - "Which courses cover reinforcement learning?"
+    - "Are there any classes on product management or design thinking?"
+    - The user describes a topic rather than a specific course number or department
+
+    Parameters:
+    - query: Topic or keywords to search for
+    - subject: Optional department code to restrict results (e.g., "AIPI", "ECE")
+    - career: Optional career filter, matched exactly (e.g., "Graduate", "Undergraduate", "GRAD", "UGRD")
+    - top_k: Number of results to return (default 10)
+    - semantic: Also rank by embedding similarity (slower, better for paraphrased topics)
+
+    **Use get_course_details afterwards** for full details of a specific result.
+
+    Example: search_courses("reinforcement learning", career="Graduate")
+    """
+    index = get_search_index()
+    if len(index.courses) == 0:
+        return {"error": "Course search index is empty. Run `python utils/course_catalog.py` to sync the catalog."}
+
+    subject_code = None
+    if subject:
+        match = resolve_subject(subject)
+        if isinstance(match, dict):
+            return match
+        subject_code = match[0]
+    if career and resolve_career(career) is None:
+        return {"error": f"Unknown career '{career}'.", "options": sorted(CAREERS.values())}
+
+    query_embedding = None
+    if semantic and index.embeddings is not None:
+        from utils.openai_client import get_embeddings_model
+        query_embedding = get_embeddings_model().embed_query(query)
+
+    results = index.search(query, top_k=int(top_k), subject_code=subject_code,
+                           career=career, query_embedding=query_embedding)
+    if not results:
+        return {"error": f"No courses found matching '{query}'."}
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--build-embeddings":
+        print(f"Saved embeddings for {build_course_embeddings()} courses to {EMBEDDINGS_FILE}")
+    else:
+        print(json.dumps(search_courses.func("reinforcement learning"), indent=2))
@@ -3,13 +3,34 @@ from dotenv import load_dotenv
 import os
 from urllib.parse import quote
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor
 from difflib import SequenceMatcher
 from langchain_core.tools import tool
+from utils.fuzzy_index import TrigramIndex, normalize, similarity
+from utils.http_cache import CachedHTTPClient
+from utils.course_catalog import CourseCatalog
 
 load_dotenv()
 
 DUKE_API_KEY = os.getenv("DUKE_API_KEY")
 BASE_URL = "https://streamer.oit.duke.edu"
+MAX_DETAIL_WORKERS = 6
+COURSE_NUMBER_RE = re.compile(r"^(?:[A-Za-z&]+\s*)?(\d{2,3}[A-Za-z]{0,2}(?:\.\d+)?)$")
+
+# Course catalogs change a few times per term, so responses are cached on disk
+# (keyed without the access token) and refreshed in the background once stale.
+streamer_client = CachedHTTPClient(
+    cache_dir=".cache/streamer",
+    ttl=6 * 3600,
+    stale_while_revalidate=7 * 24 * 3600,
+    timeout=10,
+    upstream="duke",
+)
+
+# Local mirror filled by `python utils/course_catalog.py`; lookups fall back to
+# the live API for anything that has not been synced.
+course_catalog = CourseCatalog()
 
 def load_subjects():
     """Load and parse the Duke subjects JSON file"""
@@ -22,6 +43,68 @@ def load_subjects():
         print(f"Error loading subjects: {e}")
         return {}
 
+class SubjectIndex:
+    """
+    In-memory lookup structure over the Duke subjects.
+
+    Exact subject codes and names resolve through dictionaries; everything else
+    goes through a trigram index that produces a shortlist, and only the
+    shortlist is scored with SequenceMatcher.
+    """
+
+    def __init__(self, subjects, shortlist_size=20):
+        self.subjects = dict(subjects)
+        self.shortlist_size = shortlist_size
+        self._by_code = {normalize(code): code for code in self.subjects}
+        self._by_name = {normalize(name): code for code, name in self.subjects.items()}
+        self._trigrams = TrigramIndex()
+        for code, name in self.subjects.items():
+            self._trigrams.add(code, [code, name, f"{code} - {name}"])
+
+    def _score(self, query, code):
+        name = self.subjects[code]
+        return max(
+            similarity(query, code),
+            similarity(query, name),
+            similarity(query, f"{code} - {name}"),
+        )
+
+    def search(self, query, top_k=5):
+        """
+        Return up to top_k subjects ranked by similarity to the query, as a list
+        of {"code", "name", "score"} dicts (best first).
+        """
+        key = normalize(query)
+        exact = self._by_code.get(key) or self._by_name.get(key)
+        if exact:
+            matches = [{"code": exact, "name": self.subjects[exact], "score": 1.0}]
+            if top_k == 1:
+                return matches
+        else:
+            matches = []
+
+        candidates = [code for code, _ in self._trigrams.candidates(key, self.shortlist_size)]
+        if not candidates:
+            candidates = list(self.subjects)
+
+        scored = [
+            {"code": code, "name": self.subjects[code], "score": round(self._score(key, code), 4)}
+            for code in candidates
+            if code != exact
+        ]
+        scored.sort(key=lambda m: m["score"], reverse=True)
+        return (matches + scored)[:top_k]
+
+
+SUBJECTS = load_subjects()
+SUBJECT_INDEX = SubjectIndex(SUBJECTS)
+
+
+def match_subjects(query, top_k=5, min_score=0.0):
+    """Ranked top-k subject matches with scores for a free-text subject query."""
+    return [m for m in SUBJECT_INDEX.search(query, top_k=top_k) if m["score"] >= min_score]
+
+
 def find_best_match(query, subjects):
     """
     Find the best matching subject code and name for a given query.
@@ -32,21 +115,11 @@ def find_best_match(query, subjects):
     best_match = None
     
     if isinstance(subjects, dict):
-        for code, name in subjects.items():
-            # Create the full subject string in the format "CODE - NAME"
-            full_subject = code + " - " + name
-                
-            # Calculate similarity scores for different parts
-            code_score = SequenceMatcher(None, query, code.lower()).ratio()
-            name_score = SequenceMatcher(None, query, name.lower()).ratio()
-            full_score = SequenceMatcher(None, query, full_subject.lower()).ratio()
-            
-            # Use the best score among the three
-            score = max(code_score, name_score, full_score)
-            
-            if score > best_score:
-                best_score = score
-                best_match = (code, name)
+        index = SUBJECT_INDEX if subjects is SUBJECTS else SubjectIndex(subjects)
+        matches = index.search(query, top_k=1)
+        if matches:
+            best_score = matches[0]["score"]
+            best_match = (matches[0]["code"], matches[0]["name"])
 
     elif isinstance(subjects, list):
         for subject in subjects:
@@ -68,44 +141,37 @@ def find_best_match(query, subjects):
         return best_match
     return None
 
-@tool
-def get_courses(subject):
-    """
-    **COURSE LISTING TOOL**: Get all available courses for a specific subject/department.
+def resolve_subject(subject):
+    """Resolve a free-text subject to (code, name), or an error dict with suggestions."""
+    matches = match_subjects(subject, top_k=5)
     
-    **Required for AIPI queries**: Always use this when asked about AIPI courses or curriculum.
-    
-    Common subjects: AIPI, ECE, ME, CEE, BME, CS, MATH, STA
-    
-    **Use when:** 
-    - "What courses are in [subject]?"
-    - "Show me AIPI curriculum"
-    - Exploring course options for a department
-    
-    **Use before get_course_details**: Get the list first, then get specific course details
-    
-    Example: get_courses("AIPI") for AIPI program courses
-    """
-    
-    # Load subjects and find the best match
-    subjects = load_subjects()
-    match = find_best_match(subject, subjects)
-    
-    if not match:
-        return {"error": f"No matching subject found for '{subject}'. Please provide a more specific subject name or code."}
+    if not matches or matches[0]["score"] <= 0.5:
+        return {
+            "error": f"No matching subject found for '{subject}'. Please provide a more specific subject name or code.",
+            "suggestions": [f"{m['code']} - {m['name']}" for m in matches],
+        }
     
-    code, name = match
+    return matches[0]["code"], matches[0]["name"]
+
+
+def fetch_subject_courses(code, name):
+    """Fetch the course summaries for one subject from the Duke curriculum API."""
     formatted_subject = f"{code} - {name}"
     
     encoded_subject = quote(formatted_subject)
     url = f"{BASE_URL}/curriculum/courses/subject/{encoded_subject}?access_token={DUKE_API_KEY}"
-    response = requests.get(url)
+    try:
+        response = streamer_client.get(url)
+    except requests.exceptions.RequestException as e:
+        return {"error": "Duke curriculum API unavailable", "message": str(e)}
 
     if response.status_code != 200:
         return {"error": response.status_code, "message": response.text}
 
     try:
         courses_raw = response.json()['ssr_get_courses_resp']['course_search_result']['subjects']['subject']['course_summaries']['course_summary']
+        if isinstance(courses_raw, dict):
+            courses_raw = [courses_raw]
         summaries = [
             {
                 "catalog_nbr": c.get("catalog_nbr", "").strip(),
@@ -117,15 +183,52 @@ def get_courses(subject):
             for c in courses_raw
         ]
         return summaries
-    except KeyError:
+    except (KeyError, TypeError):
         return {"error": "No courses found or unexpected response structure."}
 
 
+def list_subject_courses(subject):
+    """Course summaries for a subject, read from the local catalog when it has been synced."""
+    match = resolve_subject(subject)
+    if isinstance(match, dict):
+        return match
+
+    code, name = match
+    summaries = course_catalog.get_courses(code)
+    if summaries is not None:
+        return summaries
+    return fetch_subject_courses(code, name)
+
+
+@tool
+def get_courses(subject):
+    """
+    **COURSE LISTING TOOL**: Get all available courses for a specific subject/department.
+    
+    **Required for AIPI queries**: Always use this when asked about AIPI courses or curriculum.
+    
+    Common subjects: AIPI, ECE, ME, CEE, BME, CS, MATH, STA
+    
+    **Use when:** 
+    - "What courses are in [subject]?"
+    - "Show me AIPI curriculum"
+    - Exploring course options for a department
+    
+    **Use before get_course_details**: Get the list first, then get specific course details
+    
+    Example: get_courses("AIPI") for AIPI program courses
+    """
+    return list_subject_courses(subject)
+
+
 def get_course_details_helper(crse_id, crse_offer_nbr):
     """Get detailed information for a specific course at Duke University by subject and either course number or course title. Best used when a user mentions a specific course code or name."""
 
     url = f"{BASE_URL}/curriculum/courses/crse_id/{crse_id}/crse_offer_nbr/{crse_offer_nbr}?access_token={DUKE_API_KEY}"
-    response = requests.get(url)
+    try:
+        response = streamer_client.get(url)
+    except requests.exceptions.RequestException as e:
+        return {"error": "Duke curriculum API unavailable", "message": str(e)}
 
     if response.status_code != 200:
         return {"error": response.status_code, "message": response.text}
@@ -149,6 +252,30 @@ def get_course_details_helper(crse_id, crse_offer_nbr):
     except KeyError:
         return {"error": "Unexpected structure in course detail response."}
 
+
+def lookup_course_details(crse_id, crse_offer_nbr):
+    """Offering details from the local catalog, falling back to the live API."""
+    details = course_catalog.get_details(crse_id, crse_offer_nbr)
+    if details is not None:
+        return details
+    return get_course_details_helper(crse_id, crse_offer_nbr)
+
+
+def find_course(course_list, course_title=None, course_number=None):
+    """Pick the course summary that best matches a title or catalog number."""
+    if course_title:
+        field, query = 'title', course_title
+    elif course_number:
+        field, query = 'catalog_nbr', str(course_number)
+    else:
+        return None
+
+    match = find_best_match(query, [course[field] for course in course_list])
+    for course in course_list:
+        if course[field] == match:
+            return course
+    return None
+
 @tool
 def get_course_details(subject, course_title=None, course_number=None, api_key = None):
     """
@@ -166,39 +293,67 @@ def get_course_details(subject, course_title=None, course_number=None, api_key =
     Example: get_course_details("ECE", "590") or get_course_details("AIPI", "Machine Learning")
     """
 
-    course_list = get_courses(subject)
+    if not course_title and not course_number:
+        return {"error": "No course title or number provided."}
+
+    course_list = list_subject_courses(subject)
     if isinstance(course_list, dict) and "error" in course_list:
         return course_list
 
-    if course_title:
-        query = course_title
-        match = find_best_match(query, [course['title'] for course in course_list])
+    course = find_course(course_list, course_title=course_title, course_number=course_number)
+    if course is None:
+        return {"error": f"No matching course found in {subject} for '{course_title or course_number}'."}
 
-        for course in course_list:
-            if course['title'] == match:
-                course_details = course
-                break
+    return lookup_course_details(course['crse_id'], course['crse_offer_nbr'])
 
-        course_details = get_course_details_helper(course_details['crse_id'], course_details['crse_offer_nbr'])
-     
-        return course_details
-    
-    elif course_number:
-        query = course_number
-        match = find_best_match(query, [course['catalog_nbr'] for course in course_list])
 
-        # based on the catalog number match, get the course details
-        for course in course_list:
-            if course['catalog_nbr'] == match:
-                course_details = course
-                break
+def parse_course_identifier(identifier):
+    """Split a free-form identifier into (course_title, course_number); "AIPI 520" and "520" are numbers."""
+    identifier = str(identifier).strip()
+    match = COURSE_NUMBER_RE.match(identifier)
+    if match:
+        return None, match.group(1).upper()
+    return identifier, None
 
-        course_details = get_course_details_helper(course_details['crse_id'], course_details['crse_offer_nbr'])
+@tool
+def get_multiple_course_details(subject, courses: list[str]):
+    """
+    **BATCH COURSE TOOL**: Get detailed information about SEVERAL courses in one subject at once.
+    
+    Parameters:
+    - subject: Department code (e.g., "ECE", "AIPI", "CS")
+    - courses: List of course numbers and/or titles (e.g., ["510", "520", "Sourcing Data"])
+    
+    Returns: One entry per requested course, in the same order, each with the
+    course details or an "error" for that course only.
+    
+    **Use when:** User asks about two or more specific courses in the same department
+    (prefer this over calling get_course_details repeatedly)
+    
+    Example: get_multiple_course_details("AIPI", ["510", "520", "540", "590"])
+    """
+    if not courses:
+        return {"error": "No courses provided."}
+    if isinstance(courses, str):
+        courses = [courses]
+
+    course_list = list_subject_courses(subject)
+    if isinstance(course_list, dict) and "error" in course_list:
+        return course_list
 
-        return course_details
+    def resolve_and_fetch(identifier):
+        course_title, course_number = parse_course_identifier(identifier)
+        course = find_course(course_list, course_title=course_title, course_number=course_number)
+        if course is None:
+            return {"query": identifier, "error": f"No matching course found in {subject}."}
+        try:
+            details = lookup_course_details(course['crse_id'], course['crse_offer_nbr'])
+        except Exception as e:
+            details = {"error": str(e)}
+        return {"query": identifier, "catalog_nbr": course['catalog_nbr'], **details}
 
-    else:
-        return {"error": "No course title or number provided."}
+    with ThreadPoolExecutor(max_workers=min(MAX_DETAIL_WORKERS, len(courses))) as executor:
+        return list(executor.map(resolve_and_fetch, courses))
 
 
 if __name__ == "__main__":
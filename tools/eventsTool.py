@@ -5,26 +5,101 @@ import json
 import re
 import sys
 import os
+import threading
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from utils.openai_client import get_chat_completion
+from utils.fuzzy_index import TrigramIndex, normalize, similarity
+from utils.event_query_parser import parse_event_query, today_in
+from utils.events_cache import EventsCache
+from utils.rate_limiter import get_limiter
 from langchain_core.tools import tool
 from langchain_core.messages import HumanMessage, SystemMessage
 
-# Load groups and categories from the correct relative paths
+# Groups and categories are read on first use (see get_filter_options)
 GROUPS_FILE = "data/eventsData/groups.txt"
 CATEGORIES_FILE = "data/eventsData/categories.txt"
 OUTPUT_FILE = "data/eventsData/events_output.txt"
 
-with open(GROUPS_FILE, "r") as f:
-    groups_list = [line.strip() for line in f if line.strip()]
+MAX_GROUP_CANDIDATES = 40
+MAX_CATEGORY_CANDIDATES = 20
 
-with open(CATEGORIES_FILE, "r") as f:
-    categories_list = [line.strip() for line in f if line.strip()]
+
+class FilterOptions:
+    """
+    A list of valid filter values (groups or categories) with a trigram index,
+    used to shortlist candidates for the LLM and to validate what it returns.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self._by_normalized = {normalize(option): option for option in options}
+        self._index = TrigramIndex()
+        for option in options:
+            if option.lower() != "all":
+                self._index.add(option, [option])
+
+    def preselect(self, query, limit):
+        """The options most likely referenced by the query, always including 'All'."""
+        ranked = [option for option, _ in self._index.candidates(query, limit, containment=True)]
+        return ["All"] + ranked[:limit - 1]
+
+    def mentioned_in(self, text, limit=20):
+        """Options whose exact name appears as a whole phrase in the text."""
+        text = normalize(text)
+        found = []
+        for option, score in self._index.candidates(text, limit, containment=True):
+            if score < 1.0 or len(option) < 3:
+                continue
+            if re.search(rf"(?<![\w]){re.escape(option.lower())}(?![\w])", text):
+                found.append(option)
+        return found
+
+    def validate(self, chosen, min_similarity=0.85):
+        """Map LLM-chosen values onto exact entries of the full list, dropping unknown ones."""
+        if isinstance(chosen, str):
+            chosen = [chosen]
+        valid = []
+        for value in chosen or []:
+            key = normalize(value)
+            match = self._by_normalized.get(key)
+            if match is None:
+                shortlist = [option for option, _ in self._index.candidates(key, 5)]
+                scored = [(similarity(key, option), option) for option in shortlist]
+                if scored and max(scored)[0] >= min_similarity:
+                    match = max(scored)[1]
+            if match and match not in valid:
+                valid.append(match)
+        return valid
+
+
+def load_options(path):
+    with open(path, "r") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+_filter_options = None
+_filter_options_lock = threading.Lock()
+
+
+def get_filter_options():
+    """(group_options, category_options), loaded and indexed on first use."""
+    global _filter_options
+    if _filter_options is None:
+        with _filter_options_lock:
+            if _filter_options is None:
+                _filter_options = (FilterOptions(load_options(GROUPS_FILE)),
+                                   FilterOptions(load_options(CATEGORIES_FILE)))
+    return _filter_options
+
+
+# Full 60-day feed kept in memory and refreshed in the background
+events_cache = EventsCache(window_days=60, refresh_interval=15 * 60, timeout=10)
 
 def get_event_filters_with_gpt(user_query, groups=['All'], categories=['All']):
 
-    system_prompt = """The year is 2025. You are an assistant that extracts event filters for an event calendar API. Given a user query and lists of valid 'groups' and 'categories', extract:
+    today = today_in()
+    system_prompt = f"""Today is {today.strftime('%A, %B %d, %Y')}. You are an assistant that extracts event filters for an event calendar API. Given a user query and lists of valid 'groups' and 'categories', extract:
 
 1. The number of future days (default to 15 if not mentioned)
 2. Matching group names from the list
@@ -33,13 +108,13 @@ def get_event_filters_with_gpt(user_query, groups=['All'], categories=['All']):
 5. Location keywords (e.g. 'zoom', 'downtown', 'west campus', 'chapel')
 
 Respond in JSON format as:
-{
+{{
 "future_days": <int>,
 "groups": [<list of strings>],
 "categories": [<list of strings>],
 "target_date": "<optional date in YYYY-MM-DD>",
 "location_keywords": [<list of location strings>]
-}"""
+}}"""
 
     user_prompt = f"""User query: {user_query}
 
@@ -72,7 +147,7 @@ Available categories:
         }
 
 
-def fetch_filtered_events_data(categories=None, future_days=1, groups=None, location_keywords=None, target_date=None):
+def fetch_filtered_events_data(categories=None, future_days=1, groups=None, location_keywords=None, target_date=None, end_date=None):
     base_url = "https://calendar.duke.edu/events/index.json"
 
     fixed_params = {
@@ -98,7 +173,8 @@ def fetch_filtered_events_data(categories=None, future_days=1, groups=None, loca
     print(f"\n🔍 Constructed URL: {full_url}\n")
 
     try:
-        response = requests.get(full_url)
+        get_limiter("duke").acquire()
+        response = requests.get(full_url, timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -118,14 +194,16 @@ def fetch_filtered_events_data(categories=None, future_days=1, groups=None, loca
                 start_dt = datetime.strptime(start_ts, "%Y-%m-%dT%H:%M:%SZ")
                 formatted_start = start_dt.strftime("%b %d, %Y %I:%M %p")
             except:
+                start_dt = None
                 formatted_start = start_ts
 
-            # Filter by exact date (if provided)
+            # Filter by exact date, or by an inclusive date range when end_date is given
             if target_date:
                 try:
                     filter_date = datetime.strptime(target_date, "%Y-%m-%d").date()
-                    if not start_dt or start_dt.date() != filter_date:
-                        continue  # Skip if not the target date
+                    last_date = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else filter_date
+                    if not start_dt or not (filter_date <= start_dt.date() <= last_date):
+                        continue  # Skip if outside the requested dates
                 except:
                     pass
 
@@ -148,8 +226,59 @@ def fetch_filtered_events_data(categories=None, future_days=1, groups=None, loca
     except Exception as e:
         return f"❌ Error fetching events: {e}"
 
+def extract_event_filters(query):
+    """
+    Extract event filters, using the rule-based parser when it fully explains
+    the query and falling back to the LLM otherwise.
+    """
+    group_options, category_options = get_filter_options()
+    parsed = parse_event_query(query, group_options, category_options)
+    if parsed["confident"]:
+        print(f"⚡ Rule-based event filters: {parsed}")
+        return parsed
+
+    # Only a shortlist of likely groups/categories goes into the prompt
+    group_candidates = group_options.preselect(query, MAX_GROUP_CANDIDATES)
+    category_candidates = category_options.preselect(query, MAX_CATEGORY_CANDIDATES)
+    filters = get_event_filters_with_gpt(query, group_candidates, category_candidates)
+
+    filters = {
+        "future_days": filters.get("future_days", 30),
+        "groups": group_options.validate(filters.get("groups", [])),
+        "categories": category_options.validate(filters.get("categories", [])),
+        "target_date": filters.get("target_date", None),
+        "end_date": None,
+        "location_keywords": filters.get("location_keywords", []),
+    }
+
+    # Dates resolved deterministically are more reliable than the model's guess
+    if parsed["target_date"]:
+        filters.update(target_date=parsed["target_date"], end_date=parsed["end_date"],
+                       future_days=parsed["future_days"])
+    return filters
+
+def search_events(query, top_k=10, semantic=False):
+    """Rank cached upcoming events by relevance to a free-text query."""
+    parsed = parse_event_query(query)
+    embeddings_model = None
+    if semantic:
+        from utils.openai_client import get_embeddings_model
+        embeddings_model = get_embeddings_model()
+
+    results = events_cache.search(
+        parsed["search_text"] or query,
+        top_k=top_k,
+        future_days=parsed["future_days"] if parsed["target_date"] else events_cache.window_days,
+        target_date=parsed["target_date"],
+        end_date=parsed["end_date"],
+        embeddings_model=embeddings_model,
+    )
+    if results is None:
+        return f"❌ Error fetching events: {events_cache.last_error}"
+    return results if results else "⚠️ No matching upcoming events found."
+
 @tool
-def get_events(query, api_key=None):
+def get_events(query, mode: str = "filter", api_key=None):
     """
     **EVENTS TOOL**: Find current and upcoming Duke campus events.
     
@@ -158,45 +287,68 @@ def get_events(query, api_key=None):
     - "this week/weekend", "upcoming", "happening now"
     - "what's going on at Duke"
     
+    Modes:
+    - mode="filter" (default): filter by date, group, category and location
+    - mode="search": free-text topic search over event titles, descriptions
+      and locations, ranked by relevance (e.g. "any robotics talks?")
+    - mode="semantic": like "search", blended with embedding similarity, for
+      vague or paraphrased topics (e.g. "something relaxing after exams")
+    
     Returns: Event name, date, time, location, description
     
     Example: "What events are happening this weekend at Duke?"
+    Example: get_events("robotics talks this week", mode="search")
+    Example: get_events("events about staying healthy", mode="semantic")
     """
-    filters = get_event_filters_with_gpt(query, groups_list, categories_list)
-
-    groups = filters.get("groups", [])
-    categories = filters.get("categories", [])
-    future_days = filters.get("future_days", 30)
+    if mode in ("search", "semantic"):
+        return search_events(query, semantic=mode == "semantic")
+
+    filters = extract_event_filters(query)
+
+    events = events_cache.query(
+        groups=filters["groups"],
+        categories=filters["categories"],
+        future_days=filters["future_days"],
+        target_date=filters["target_date"],
+        end_date=filters.get("end_date"),
+        location_keywords=filters["location_keywords"]
+    )
+    if events is not None:
+        return events if events else "⚠️ No events found for the selected filters."
 
-    target_date = filters.get("target_date", None)
-    location_keywords = filters.get("location_keywords", [])
+    # The cache cannot answer this one (cold cache during an outage, range
+    # beyond the cached window, or group filters without sponsor data)
+    if not events_cache.has_data and events_cache.last_error:
+        return f"❌ Error fetching events: {events_cache.last_error}"
 
     return fetch_filtered_events_data(
-        groups=groups,
-        categories=categories,
-        future_days=future_days,
-        target_date=target_date,
-        location_keywords=location_keywords
+        groups=filters["groups"],
+        categories=filters["categories"],
+        future_days=filters["future_days"],
+        target_date=filters["target_date"],
+        end_date=filters.get("end_date"),
+        location_keywords=filters["location_keywords"]
     )
   
 if __name__ == "__main__":
     api_key = input("Please enter your OpenAI API Key: ")
     user_query = input("What kind of events are you looking for?\n> ")
-    filters = get_event_filters_with_gpt(user_query, groups_list, categories_list)
+    filters = extract_event_filters(user_query)
 
-    print("\n🧠 GPT-Extracted Filters:")
+    print("\n🧠 Extracted Filters:")
     print(json.dumps(filters, indent=2))
 
-    groups = filters.get("groups", [])
-    categories = filters.get("categories", [])
-    future_days = filters.get("future_days", 30)
-    target_date = filters.get("target_date")
-    location_keywords = filters.get("location_keywords", [])
+    groups = filters["groups"]
+    categories = filters["categories"]
+    future_days = filters["future_days"]
+    target_date = filters["target_date"]
+    location_keywords = filters["location_keywords"]
 
     fetch_filtered_events_data(
         groups=groups,
         categories=categories,
         future_days=future_days,
         target_date=target_date,
+        end_date=filters.get("end_date"),
         location_keywords=location_keywords
     )
\ No newline at end of file
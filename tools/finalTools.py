@@ -1,15 +1,8 @@
 import pytz
 from datetime import datetime
+from functools import lru_cache
 from langchain_core.tools import tool
-from tools.memDatabaseTool import mem_search
-from tools.prattDatabaseTool import pratt_search
-from tools.curriculumTool import get_courses, get_course_details
-from tools.eventsTool import get_events
-from tools.professorsTool import rate_my_professor_info
-from tools.aipiDatabaseTool import get_AIPI_details
-from tools.webSearchTool import web_search
-from langchain.utilities import GoogleSerperAPIWrapper
-from langchain.agents import Tool
+from tools.toolRegistry import lazy_tools
 from dotenv import load_dotenv
 import os
 
@@ -88,23 +81,21 @@ def final_answer(answer: str, tools_used: list[str]) -> str:
     """
     return {"answer": answer, "tools_used": tools_used}
 
-google_search = GoogleSerperAPIWrapper(serper_api_key=GOOGLE_API_KEY)
+@lru_cache(maxsize=1)
+def get_google_search():
+    """Serper-backed Google Search tool (not in the default tool set), built on first use."""
+    from langchain.utilities import GoogleSerperAPIWrapper
+    from langchain.agents import Tool
 
-google_search = [
-    Tool(
-        name="Google Search",
-        func=google_search.run,
-        description="useful for when you need to ask with search",
-        verbose=True
-    )
-]
+    search = GoogleSerperAPIWrapper(serper_api_key=GOOGLE_API_KEY)
+    return [
+        Tool(
+            name="Google Search",
+            func=search.run,
+            description="useful for when you need to ask with search",
+            verbose=True
+        )
+    ]
 
-tools = [get_current_date,
-         rate_my_professor_info,
-         mem_search, 
-         pratt_search,
-         get_courses,
-         get_course_details,
-         get_events,
-         get_AIPI_details,
-         web_search]
+# Schemas are available immediately; each tool module is imported on its first call
+tools = [get_current_date] + lazy_tools()
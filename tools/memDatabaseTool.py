@@ -1,10 +1,20 @@
 from utils.pinecone_utils import process_pdf
 from utils.openai_client import get_chat_completion
-from utils.pinecone_utils import initialize_pinecone_index, get_embeddings_model
+from utils.pinecone_utils import get_index as get_pinecone_index, get_embeddings_model
 from typing import List, Dict
 from langchain_core.tools import tool
 from langchain_core.messages import HumanMessage, SystemMessage
 
+INDEX_NAME = "mem-database"
+DIMENSION = 1536
+METRIC = "cosine"
+
+
+def get_index():
+    """The MEM handbook index (host resolved once per process)."""
+    return get_pinecone_index(INDEX_NAME, DIMENSION, METRIC, "MEM")
+
+
 @tool
 def mem_search(query: str) -> List[Dict]:
     """
@@ -25,9 +35,6 @@ def mem_search(query: str) -> List[Dict]:
     """
     top_k = 3
     namespace = "mem-handbook"
-    index_name = "mem-database"
-    dimension = 1536
-    metric = "cosine"
     
     embeddings = get_embeddings_model()
     if not embeddings:
@@ -37,7 +44,7 @@ def mem_search(query: str) -> List[Dict]:
     query_embedding = embeddings.embed_query(query)
     
     # Initialize index
-    index = initialize_pinecone_index(index_name, dimension, metric, "MEM")
+    index = get_index()
     
     # Search in Pinecone
     results = index.query(
@@ -1,10 +1,20 @@
-from utils.pinecone_utils import initialize_pinecone_index, get_embeddings_model
+from utils.pinecone_utils import get_index as get_pinecone_index, get_embeddings_model
 from utils.openai_client import get_chat_completion
 from typing import List, Dict
 from utils.pinecone_utils import process_pdf
 from langchain_core.tools import tool
 from langchain_core.messages import HumanMessage, SystemMessage
 
+INDEX_NAME = "pratt-database"
+DIMENSION = 1536
+METRIC = "cosine"
+
+
+def get_index():
+    """The Pratt handbook index (host resolved once per process)."""
+    return get_pinecone_index(INDEX_NAME, DIMENSION, METRIC, "PRATT")
+
+
 @tool
 def pratt_search(query: str) -> List[Dict]:
     """
@@ -23,9 +33,6 @@ def pratt_search(query: str) -> List[Dict]:
     """
     top_k = 3
     namespace = "pratt-handbook"
-    index_name = "pratt-database"
-    dimension = 1536
-    metric = "cosine"
     
     embeddings = get_embeddings_model()
     if not embeddings:
@@ -34,7 +41,7 @@ def pratt_search(query: str) -> List[Dict]:
     query_embedding = embeddings.embed_query(query)
     
     # Initialize index
-    index = initialize_pinecone_index(index_name, dimension, metric, "PRATT")
+    index = get_index()
     
     # Search in Pinecone
     results = index.query(
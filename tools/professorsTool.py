@@ -1,6 +1,13 @@
+import re
 import json
+import threading
+from typing import Optional
 from difflib import SequenceMatcher
+import numpy as np
 from langchain_core.tools import tool
+from utils.fuzzy_index import TrigramIndex, normalize, similarity
+
+TITLE_RE = re.compile(r"\b(dr|prof|professor|mr|mrs|ms)\b\.?")
 
 def load_professors():
     """Load and parse the professors JSON file"""
@@ -48,6 +55,240 @@ def find_best_match(query, professors):
         return best_match
     return None
 
+def normalize_name(name):
+    """Lowercase a name and drop titles, parentheticals and punctuation."""
+    name = re.sub(r"\(.*?\)", " ", str(name).lower())
+    name = TITLE_RE.sub(" ", name)
+    return normalize(re.sub(r"[^a-z0-9\s'-]", " ", name))
+
+
+def name_keys(name):
+    """Alternate lookup keys for a name: last name and first-initial + last name."""
+    parts = normalize_name(name).split()
+    if not parts:
+        return None, None
+    last = parts[-1]
+    initial_key = f"{parts[0][0]} {last}" if len(parts) > 1 else None
+    return last, initial_key
+
+
+class ProfessorIndex:
+    """
+    In-memory lookup structure over the RateMyProfessors records.
+
+    Exact normalized names, last names and "first-initial last-name" keys
+    resolve through dictionaries. Everything else goes through a trigram index
+    whose shortlist is scored with SequenceMatcher on name, department and
+    "name - department", the same signals find_best_match used.
+    """
+
+    EXACT_SCORE = 1.0
+    INITIALS_SCORE = 0.95
+    LAST_NAME_SCORE = 0.9
+
+    def __init__(self, professors, shortlist_size=30):
+        self.professors = list(professors)
+        self.shortlist_size = shortlist_size
+        self._by_name = {}
+        self._by_last_name = {}
+        self._by_initials = {}
+        self._trigrams = TrigramIndex()
+
+        for i, professor in enumerate(self.professors):
+            name = professor.get('name', '')
+            department = professor.get('department', '')
+            last, initials = name_keys(name)
+            self._by_name.setdefault(normalize_name(name), []).append(i)
+            # Preferred names in parentheses, e.g. "Huanqian (Hazel) Loh"
+            for nickname in re.findall(r"\((.*?)\)", name):
+                if last:
+                    self._by_name.setdefault(normalize_name(f"{nickname} {last}"), []).append(i)
+            if last:
+                self._by_last_name.setdefault(last, []).append(i)
+            if initials:
+                self._by_initials.setdefault(initials, []).append(i)
+            self._trigrams.add(i, [name, f"{name} - {department}"])
+
+    def _num_ratings(self, i):
+        try:
+            return int(self.professors[i].get('num_ratings', 0))
+        except (TypeError, ValueError):
+            return 0
+
+    def _fuzzy_score(self, query, i):
+        name = self.professors[i].get('name', '')
+        department = self.professors[i].get('department', '')
+        return max(
+            similarity(query, name),
+            similarity(query, department),
+            similarity(query, f"{name} - {department}"),
+        )
+
+    def search(self, query, top_k=5):
+        """
+        Return up to top_k candidates as {"professor", "score"} dicts, best first.
+        Ties are broken by number of ratings.
+        """
+        key = normalize_name(query)
+        scores = {}
+
+        def offer(i, score):
+            if score > scores.get(i, 0.0):
+                scores[i] = score
+
+        for i in self._by_name.get(key, []):
+            offer(i, self.EXACT_SCORE)
+
+        parts = key.split()
+        if len(parts) == 1:
+            for i in self._by_last_name.get(parts[0], []):
+                offer(i, self.LAST_NAME_SCORE)
+        elif len(parts) > 1:
+            # "J Reifschneider" or a shortened first name such as "Jon" for "Jonathan"
+            first = parts[0]
+            for i in self._by_initials.get(f"{first[0]} {parts[-1]}", []):
+                indexed_first = normalize_name(self.professors[i].get('name', '')).split()[0]
+                if len(first) == 1:
+                    offer(i, self.INITIALS_SCORE)
+                elif indexed_first.startswith(first) or first.startswith(indexed_first):
+                    offer(i, self.LAST_NAME_SCORE)
+
+        for i, _ in self._trigrams.candidates(key, self.shortlist_size):
+            offer(i, self._fuzzy_score(key, i))
+
+        ranked = sorted(scores.items(), key=lambda item: (item[1], self._num_ratings(item[0])), reverse=True)
+        return [{"professor": self.professors[i], "score": round(score, 4)} for i, score in ranked[:top_k]]
+
+
+_professor_index = None
+_professor_index_lock = threading.Lock()
+
+
+def get_professor_index():
+    """Build the professor index on first use and keep it in memory."""
+    global _professor_index
+    if _professor_index is None:
+        with _professor_index_lock:
+            if _professor_index is None:
+                _professor_index = ProfessorIndex(load_professors())
+    return _professor_index
+
+
+def professor_summary(professor):
+    return {
+        "name": professor.get('name', 'N/A'),
+        "department": professor.get('department', 'N/A'),
+        "rating": professor.get('rating', 'N/A'),
+        "would_take_again": professor.get('would_take_again', 'N/A'),
+        "num_ratings": professor.get('num_ratings', 'N/A')
+    }
+
+def _parse_number(value, dtype=float):
+    """Parse "4.5", "77%" or "24" into a number; N/A and blanks become None."""
+    try:
+        return dtype(str(value).strip().rstrip('%'))
+    except (TypeError, ValueError):
+        return None
+
+
+class ProfessorTable:
+    """
+    Typed columnar view of the professor records for vectorized filtering.
+
+    Ratings and percentages are parsed once into float32 arrays (NaN for N/A),
+    rating counts into an int32 array, and departments are dictionary-encoded
+    as int16 codes into self.departments.
+    """
+
+    SORT_COLUMNS = ("rating", "would_take_again", "num_ratings")
+
+    # Common abbreviations the fuzzy match can't recover from (too short or
+    # not initials of the department's name)
+    DEPARTMENT_ALIASES = {
+        "cs": "Computer Science", "compsci": "Computer Science", "comp sci": "Computer Science",
+        "ece": "Electrical & Computer Engineering", "ee": "Electrical Engineering",
+        "bme": "Biomedical Engineering", "me": "Mechanical Engineering", "mech e": "Mechanical Engineering",
+        "cee": "Civil Engineering", "econ": "Economics", "math": "Mathematics", "stats": "Statistics",
+        "stat": "Statistics", "bio": "Biology", "chem": "Chemistry", "phys": "Physics",
+        "psych": "Psychology", "poli sci": "Political Science", "polisci": "Political Science",
+        "pubpol": "Public Policy", "neuro": "Neuroscience",
+        "phil": "Philosophy", "pe": "Physical Education",
+    }
+    INITIALS_STOPWORDS = {"&", "and", "of", "amp"}
+
+    def __init__(self, professors):
+        self.professors = list(professors)
+        self.departments = sorted({p.get('department', 'Unknown') for p in self.professors})
+        department_code = {name: code for code, name in enumerate(self.departments)}
+
+        self.department = np.array([department_code[p.get('department', 'Unknown')] for p in self.professors], dtype=np.int16)
+        self.rating = np.array([_parse_number(p.get('rating')) for p in self.professors], dtype=np.float32)
+        self.would_take_again = np.array([_parse_number(p.get('would_take_again')) for p in self.professors], dtype=np.float32)
+        self.num_ratings = np.array([_parse_number(p.get('num_ratings'), int) or 0 for p in self.professors], dtype=np.int32)
+
+    def resolve_department(self, department):
+        """Map a department query to its code: exact, alias, initials, substring, then fuzzy match."""
+        key = normalize(department)
+        lowered = [normalize(name) for name in self.departments]
+        if key in lowered:
+            return lowered.index(key)
+        alias = normalize(self.DEPARTMENT_ALIASES.get(re.sub(r"[.]", "", key), ""))
+        if alias in lowered:
+            return lowered.index(alias)
+        letters = re.sub(r"[^a-z]", "", key)
+        if " " not in key and 2 <= len(letters) <= 5:
+            initials = [code for code, name in enumerate(lowered)
+                        if "".join(w[0] for w in name.split() if w not in self.INITIALS_STOPWORDS) == letters]
+            if len(initials) == 1:
+                return initials[0]
+        contains = [code for code, name in enumerate(lowered) if key in name]
+        if len(contains) == 1:
+            return contains[0]
+        scored = [(similarity(key, name), code) for code, name in enumerate(lowered)]
+        best_score, best_code = max(scored)
+        return best_code if best_score > 0.6 else None
+
+    def query(self, department=None, min_rating=None, max_rating=None, min_num_ratings=0,
+              min_would_take_again=None, sort_by="rating", ascending=False, top_k=10):
+        """Filter, sort and take the top-k rows; returns a list of professor summaries."""
+        if sort_by not in self.SORT_COLUMNS:
+            return {"error": f"sort_by must be one of {list(self.SORT_COLUMNS)}."}
+
+        mask = self.num_ratings >= int(min_num_ratings or 0)
+        if department:
+            code = self.resolve_department(department)
+            if code is None:
+                return {"error": f"No matching department found for '{department}'."}
+            mask &= self.department == code
+        if min_rating is not None:
+            mask &= self.rating >= float(min_rating)
+        if max_rating is not None:
+            mask &= self.rating <= float(max_rating)
+        if min_would_take_again is not None:
+            mask &= self.would_take_again >= float(min_would_take_again)
+
+        column = getattr(self, sort_by).astype(np.float64)
+        mask &= ~np.isnan(column)
+        rows = np.flatnonzero(mask)
+
+        primary = column[rows] if ascending else -column[rows]
+        order = rows[np.lexsort((-self.num_ratings[rows], primary))][:int(top_k)]
+        return [professor_summary(self.professors[i]) for i in order]
+
+
+_professor_table = None
+_professor_table_lock = threading.Lock()
+
+
+def get_professor_table():
+    """Build the columnar professor table on first use and keep it in memory."""
+    global _professor_table
+    if _professor_table is None:
+        with _professor_table_lock:
+            if _professor_table is None:
+                _professor_table = ProfessorTable(get_professor_index().professors)
+    return _professor_table
+
 @tool
 def rate_my_professor_info(professor_query):
     """
@@ -66,23 +307,81 @@ def rate_my_professor_info(professor_query):
     
     Example: rate_my_professor_info("Brinnae Bent")
     """
-    professors = load_professors()
+    index = get_professor_index()
     
-    if not professors:
+    if not index.professors:
         return {"error": "Could not load professor data."}
     
-    match = find_best_match(professor_query, professors)
+    candidates = [c for c in index.search(professor_query, top_k=5) if c["score"] > 0.5]
     
-    if not match:
+    if not candidates:
         return {"error": f"No matching professor found for '{professor_query}'. Please provide a more specific name or department."}
     
-    return {
-        "name": match.get('name', 'N/A'),
-        "department": match.get('department', 'N/A'),
-        "rating": match.get('rating', 'N/A'),
-        "would_take_again": match.get('would_take_again', 'N/A'),
-        "num_ratings": match.get('num_ratings', 'N/A')
-    }
+    result = professor_summary(candidates[0]["professor"])
+    result["match_score"] = candidates[0]["score"]
+
+    # Surface close alternatives so an ambiguous name is not silently resolved
+    alternatives = [c for c in candidates[1:] if candidates[0]["score"] - c["score"] <= 0.05]
+    if alternatives or candidates[0]["score"] < ProfessorIndex.LAST_NAME_SCORE:
+        result["ambiguous"] = bool(alternatives)
+        result["other_candidates"] = [
+            {**professor_summary(c["professor"]), "match_score": c["score"]}
+            for c in candidates[1:]
+        ]
+    
+    return result
+
+
+@tool
+def query_professors(names: Optional[list[str]] = None, department: Optional[str] = None,
+                     min_rating: Optional[float] = None, max_rating: Optional[float] = None,
+                     min_num_ratings: int = 0, min_would_take_again: Optional[float] = None,
+                     sort_by: str = "rating", ascending: bool = False, top_k: int = 10):
+    """
+    **PROFESSOR RANKING / BATCH TOOL**: Look up several professors at once, or rank
+    professors by their RateMyProfessors ratings.
+
+    **Use when:**
+    - Comparing multiple professors: names=["Eric Fouh", "Brinnae Bent"]
+    - "Highest-rated CS professors with at least 20 ratings"
+    - "Which Economics professors would students take again?"
+
+    Parameters:
+    - names: List of professor names to look up (returns one entry per name, in order)
+    - department: Department to filter by (e.g., "Computer Science")
+    - min_rating / max_rating: Rating bounds on the 1-5 scale
+    - min_num_ratings: Minimum number of student ratings
+    - min_would_take_again: Minimum "would take again" percentage (0-100)
+    - sort_by: "rating", "would_take_again" or "num_ratings"
+    - ascending: Sort lowest first (default highest first)
+    - top_k: Number of professors to return (default 10)
+
+    Example: query_professors(department="Computer Science", min_num_ratings=20, top_k=5)
+    """
+    if names:
+        if isinstance(names, str):
+            names = [names]
+        index = get_professor_index()
+        results = []
+        for name in names:
+            candidates = index.search(name, top_k=1)
+            if candidates and candidates[0]["score"] > 0.5:
+                results.append({"query": name, **professor_summary(candidates[0]["professor"]),
+                                "match_score": candidates[0]["score"]})
+            else:
+                results.append({"query": name, "error": "No matching professor found."})
+        return results
+
+    return get_professor_table().query(
+        department=department,
+        min_rating=min_rating,
+        max_rating=max_rating,
+        min_num_ratings=min_num_ratings,
+        min_would_take_again=min_would_take_again,
+        sort_by=sort_by,
+        ascending=ascending,
+        top_k=top_k,
+    )
 
 
 if __name__ == "__main__":
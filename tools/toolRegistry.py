@@ -0,0 +1,146 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+import importlib
+import threading
+from typing import Any, Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMAS_FILE = os.path.join(TOOLS_DIR, "tool_schemas.json")
+
+# Tool name -> module defining it (as an attribute of the same name), in the
+# order the tools are offered to the model
+TOOL_MODULES = {
+    "rate_my_professor_info": "tools.professorsTool",
+    "query_professors": "tools.professorsTool",
+    "mem_search": "tools.memDatabaseTool",
+    "pratt_search": "tools.prattDatabaseTool",
+    "get_courses": "tools.curriculumTool",
+    "get_course_details": "tools.curriculumTool",
+    "get_multiple_course_details": "tools.curriculumTool",
+    "search_courses": "tools.courseSearchTool",
+    "get_events": "tools.eventsTool",
+    "get_AIPI_details": "tools.aipiDatabaseTool",
+    "web_search": "tools.webSearchTool",
+}
+
+
+def module_hash(module: str) -> str:
+    """sha256 of a tool module's source, used to detect stale schemas."""
+    path = os.path.join(TOOLS_DIR, module.rsplit(".", 1)[-1] + ".py")
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def openai_schema(tool) -> Dict[str, Any]:
+    """A LangChain tool in the OpenAI tool format that bind_tools sends."""
+    from langchain_core.utils.function_calling import convert_to_openai_tool
+    return convert_to_openai_tool(tool)
+
+
+class LazyTool:
+    """
+    Stands in for a LangChain tool until it is first called.
+
+    `name` and `openai_schema` come from tool_schemas.json, so the agent can
+    bind its tools without importing them; the module implementing the tool
+    (and whatever clients or data it sets up at import) is only loaded when
+    the model actually calls it.
+    """
+
+    def __init__(self, name: str, module: str, schema: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.module = module
+        self._tool = None
+        self._lock = threading.Lock()
+        if schema is None:
+            schema = openai_schema(self.load())
+        self.openai_schema = schema
+        self.description = schema["function"].get("description", "")
+
+    @property
+    def loaded(self) -> bool:
+        return self._tool is not None
+
+    def load(self):
+        """Import the real tool (once)."""
+        if self._tool is None:
+            with self._lock:
+                if self._tool is None:
+                    self._tool = getattr(importlib.import_module(self.module), self.name)
+        return self._tool
+
+    def func(self, *args, **kwargs):
+        return self.load().func(*args, **kwargs)
+
+    def invoke(self, tool_input, **kwargs):
+        return self.load().invoke(tool_input, **kwargs)
+
+    def __repr__(self):
+        return f"LazyTool({self.name!r}, loaded={self.loaded})"
+
+
+def load_schemas(path: str = SCHEMAS_FILE) -> Dict[str, Dict[str, Any]]:
+    """The stored schema entries, or {} if the file is missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("tools", {})
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Could not read tool schemas from {path}: {e}")
+        return {}
+
+
+def lazy_tools(names: Optional[List[str]] = None, path: str = SCHEMAS_FILE) -> List[LazyTool]:
+    """
+    LazyTools for `names` (default: all of TOOL_MODULES).
+
+    A tool whose module changed since the schemas were generated is imported
+    immediately so the model never sees an outdated signature; run
+    `python tools/toolRegistry.py` to refresh the file.
+    """
+    stored = load_schemas(path)
+    hashes = {}
+    tools = []
+    for name in names or TOOL_MODULES:
+        module = TOOL_MODULES[name]
+        if module not in hashes:
+            hashes[module] = module_hash(module)
+        entry = stored.get(name)
+        schema = entry["schema"] if entry and entry.get("source_sha256") == hashes[module] else None
+        if schema is None:
+            print(f"⚠️ Tool schema for {name} is missing or stale; importing {module}")
+        tools.append(LazyTool(name, module, schema))
+    return tools
+
+
+def write_schemas(path: str = SCHEMAS_FILE) -> Dict[str, Dict[str, Any]]:
+    """Import every tool and store its OpenAI schema with its module's source hash."""
+    entries = {}
+    for name, module in TOOL_MODULES.items():
+        tool = getattr(importlib.import_module(module), name)
+        entries[name] = {"module": module, "source_sha256": module_hash(module), "schema": openai_schema(tool)}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"tools": entries}, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    return entries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate tools/tool_schemas.json from the tool modules")
+    parser.add_argument("--output", default=SCHEMAS_FILE)
+    parser.add_argument("--check", action="store_true", help="Only report stale or missing schemas (exit 1 if any)")
+    args = parser.parse_args()
+
+    if args.check:
+        stored = load_schemas(args.output)
+        stale = [name for name, module in TOOL_MODULES.items()
+                 if stored.get(name, {}).get("source_sha256") != module_hash(module)]
+        print(f"❌ Stale tool schemas: {', '.join(stale)}" if stale else "✅ Tool schemas are up to date")
+        sys.exit(1 if stale else 0)
+
+    entries = write_schemas(args.output)
+    print(f"✅ Wrote {len(entries)} tool schemas to {args.output}")
@@ -1,29 +1,200 @@
 import requests
 import os
+import time
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urldefrag
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from readability import Document
 from langchain_core.tools import tool
+from utils.disk_cache import DiskCache
 
-def fetch_page_content(url):
-    """Scrapes the given URL and extracts clean text content along with metadata."""
-    headers = {"User-Agent": "Mozilla/5.0"} 
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
+SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+NUM_RESULTS = 3
+SEARCH_DEADLINE = 12          # seconds for the whole tool call
+PAGE_TIMEOUT = 8              # connect/read timeout per page request
+MAX_PAGE_BYTES = 2_000_000    # stop downloading a page after this many bytes
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+SEARCH_CACHE_TTL = 60 * 60    # reuse a query's result URLs for an hour
+PAGE_FRESH_SECONDS = 60 * 60  # serve extracted pages without revalidating for an hour
+
+# Two-level cache: query -> result URLs, URL -> extracted content (+ ETag/Last-Modified)
+search_cache = DiskCache(".cache/web_search/results", compress=True, max_bytes=5_000_000)
+page_cache = DiskCache(".cache/web_search/pages", compress=True, max_bytes=200_000_000)
+cache_counts = Counter()
+_counts_lock = threading.Lock()
+
+session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+session.mount("http://", _adapter)
+session.mount("https://", _adapter)
+session.headers.update({"User-Agent": "Mozilla/5.0"})
+
+# Long-lived pool so a deadline can return without waiting for slow downloads
+_fetch_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix="web-search")
+
+def extract_readable_content(html):
+    """Runs the readability pipeline on raw HTML and returns (title, clean text)."""
+    doc = Document(html)
+    soup = BeautifulSoup(doc.summary(), "html.parser")
+    extracted = soup.get_text()
+    return doc.title(), extracted.strip()
+
+def _count(event):
+    with _counts_lock:
+        cache_counts[event] += 1
+
+def cache_stats():
+    """Hit rates for the search-result and page-content caches since startup."""
+    def rate(hits, total):
+        return round(hits / total, 3) if total else None
+
+    with _counts_lock:
+        counts = dict(cache_counts)
+    searches = counts.get("search_hit", 0) + counts.get("search_miss", 0)
+    pages = counts.get("page_hit", 0) + counts.get("page_revalidated", 0) + counts.get("page_miss", 0)
+    return {
+        "search": {"hit_rate": rate(counts.get("search_hit", 0), searches), "lookups": searches,
+                   **{k: v for k, v in search_cache.stats().items() if k in ("entries", "bytes")}},
+        "pages": {"hit_rate": rate(counts.get("page_hit", 0) + counts.get("page_revalidated", 0), pages),
+                  "lookups": pages, "revalidated": counts.get("page_revalidated", 0),
+                  **{k: v for k, v in page_cache.stats().items() if k in ("entries", "bytes")}},
+    }
+
+def normalize_query(query):
+    return " ".join(str(query).lower().split())
+
+def download_page(url, timeout=PAGE_TIMEOUT, max_bytes=MAX_PAGE_BYTES, deadline=None, headers=None):
+    """
+    Stream a page body, stopping at max_bytes or the deadline.
+    Returns (text, validators, complete); text is None when the server answers
+    304 Not Modified. Raises for non-HTML content such as PDFs.
+    """
+    with session.get(url, timeout=timeout, stream=True, headers=headers) as response:
+        if response.status_code == 304:
+            return None, {}, True
         response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "text/html").split(";")[0].strip().lower()
+        if content_type not in HTML_CONTENT_TYPES:
+            raise requests.exceptions.ContentDecodingError(f"Skipped non-HTML content ({content_type})")
+
+        chunks, size, complete = [], 0, True
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                break
+            if deadline and time.monotonic() >= deadline:
+                complete = False
+                break
+
+        validators = {name: response.headers[name] for name in ("ETag", "Last-Modified") if name in response.headers}
+        text = b"".join(chunks)[:max_bytes].decode(response.encoding or "utf-8", errors="replace")
+        return text, validators, complete
 
-        doc = Document(response.text)
-        soup = BeautifulSoup(doc.summary(), "html.parser")
-        extracted = soup.get_text()
+def _cached_page(entry, url):
+    return {"title": entry["title"], "content": entry["content"], "restricted": "NO", "url": url}
+
+def fetch_page_content(url, deadline=None):
+    """
+    Scrapes the given URL and extracts clean text content along with metadata.
+    Extracted pages are cached by URL; after PAGE_FRESH_SECONDS the cached copy
+    is revalidated with If-None-Match / If-Modified-Since, and a 304 reuses it
+    without downloading or re-parsing the page.
+    """
+    key = urldefrag(url)[0]
+    entry = page_cache.get(key)
+    if entry is not None and time.time() - entry["fetched_at"] < PAGE_FRESH_SECONDS:
+        _count("page_hit")
+        return _cached_page(entry, url)
+
+    headers = {}
+    if entry is not None:
+        if entry["validators"].get("ETag"):
+            headers["If-None-Match"] = entry["validators"]["ETag"]
+        if entry["validators"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["validators"]["Last-Modified"]
+
+    try:
+        html, validators, complete = download_page(url, deadline=deadline, headers=headers)
+        if html is None and entry is not None:
+            _count("page_revalidated")
+            entry["fetched_at"] = time.time()
+            page_cache.set(key, entry)
+            return _cached_page(entry, url)
+
+        _count("page_miss")
+        title, extracted = extract_readable_content(html)
+        if complete:
+            page_cache.set(key, {"fetched_at": time.time(), "validators": validators,
+                                 "title": title, "content": extracted})
 
         return {
-            "title": Document(response.text).title(),
-            "content": extracted.strip(),
+            "title": title,
+            "content": extracted,
             "restricted": "NO",
             "url": url
         }
 
     except requests.exceptions.RequestException as e:
+        if entry is not None:
+            print(f"⚠️ Serving cached copy of {url}: {e}")
+            _count("page_hit")
+            return _cached_page(entry, url)
+        _count("page_miss")
         return {"title" : "", "content": str(e), "restricted" : "YES", "url": url}
+    except Exception as e:
+        _count("page_miss")
+        return {"title" : "", "content": f"Could not extract content: {e}", "restricted" : "YES", "url": url}
+
+def search_urls(query):
+    """Result URLs for a query from the Custom Search API, cached by normalized query for SEARCH_CACHE_TTL."""
+    key = normalize_query(query)
+    entry = search_cache.get(key)
+    if entry is not None and time.time() - entry["fetched_at"] < SEARCH_CACHE_TTL:
+        _count("search_hit")
+        return entry["urls"]
+
+    _count("search_miss")
+    API_KEY = os.getenv("GOOGLE_API_KEY")
+    SEARCH_ENGINE_ID = os.getenv("GOOGLE_SEARCH_ENGINE_ID")
+
+    urls = []
+    try:
+        response = session.get(SEARCH_URL, params={"q": query, "key": API_KEY, "cx": SEARCH_ENGINE_ID},
+                               timeout=PAGE_TIMEOUT)
+        if response.status_code == 200:
+            results = response.json()
+            for item in results.get("items", [])[:NUM_RESULTS]:
+                url = item["link"]
+                urls.append(url)
+            search_cache.set(key, {"fetched_at": time.time(), "urls": urls})
+        else:
+            print("Failed to fetch search results.")
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to fetch search results: {e}")
+    return urls
+
+def fetch_pages(urls, deadline_seconds=SEARCH_DEADLINE):
+    """
+    Fetch pages concurrently under one shared deadline. Pages that have not
+    arrived when time runs out are reported as timed out, in input order.
+    """
+    deadline = time.monotonic() + deadline_seconds
+    futures = [_fetch_pool.submit(fetch_page_content, url, deadline) for url in urls]
+    wait(futures, timeout=deadline_seconds)
+
+    results = []
+    for url, future in zip(urls, futures):
+        if future.done():
+            results.append(future.result())
+        else:
+            future.cancel()
+            results.append({"title": "", "content": "Timed out fetching page.", "restricted": "YES", "url": url})
+    return results
 
 @tool
 def web_search(query):
@@ -42,29 +213,17 @@ def web_search(query):
     Example: "What AI student clubs exist at Duke?" (after other tools don't provide this)
     """
 
-    num_results = 3
-    API_KEY = os.getenv("GOOGLE_API_KEY")
-    SEARCH_ENGINE_ID = os.getenv("GOOGLE_SEARCH_ENGINE_ID")
-    
-    search_url = f"https://www.googleapis.com/customsearch/v1?q={query}&key={API_KEY}&cx={SEARCH_ENGINE_ID}"
-
-    response = requests.get(search_url)
-    urls = []
-    if response.status_code == 200:
-        results = response.json()
-        for item in results.get("items", [])[:num_results]:
-            url = item["link"]
-            urls.append(url)
-    else:
-        print("Failed to fetch search results.")
+    started = time.monotonic()
+    urls = search_urls(query)
 
-    all_content = []
-    for url in urls:
-        content = fetch_page_content(url)
-        all_content.append(content)
+    remaining = max(SEARCH_DEADLINE - (time.monotonic() - started), 1)
+    results = fetch_pages(urls, deadline_seconds=remaining)
 
-    return all_content
+    stats = cache_stats()
+    print(f"🗂️ web_search cache hit rate: search {stats['search']['hit_rate']}, pages {stats['pages']['hit_rate']}")
+    return results
 
 
 if __name__ == "__main__":
     print(web_search("What is the best way to learn about the AIPI program at Duke University?"))
+    print(cache_stats())
@@ -0,0 +1,150 @@
+import time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Iterable, Optional
+
+from utils.rate_limiter import get_limiter
+
+
+class Busy(Exception):
+    """The request was not admitted; the client should retry after `retry_after` seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, round(retry_after))
+
+
+class _Job:
+    __slots__ = ("session_id", "fn", "args", "future", "enqueued_at")
+
+    def __init__(self, session_id, fn, args):
+        self.session_id = session_id
+        self.fn = fn
+        self.args = args
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    """
+    Bounded request queue in front of the agent worker pool.
+
+    - Admission: a request is rejected immediately with Busy when the queue
+      is full, when its session already has `max_per_session` messages
+      pending, or when its expected wait (queue position x average service
+      time, plus any wait on the watched upstream rate limiters) exceeds
+      `max_wait`. Jobs that still end up waiting longer than that are
+      failed with Busy when they reach the front instead of being run late.
+    - Fair scheduling: each session has its own FIFO and free workers take
+      jobs round-robin across sessions, skipping sessions that already have a
+      job running, so one chatty session can't starve the others (and no
+      worker sits blocked on a session lock).
+    """
+
+    def __init__(self, workers: int, max_queue: Optional[int] = None, max_per_session: int = 2,
+                 max_wait: float = 30.0, upstreams: Iterable[str] = ("openai",), thread_name_prefix: str = "agent"):
+        self.workers = workers
+        self.max_queue = max_queue if max_queue is not None else workers * 4
+        self.max_per_session = max_per_session
+        self.max_wait = max_wait
+        self.upstreams = tuple(upstreams)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=thread_name_prefix)
+
+        self._queues: "OrderedDict[str, Deque[_Job]]" = OrderedDict()
+        self._running: Dict[str, int] = {}
+        self._queued = 0
+        self._active = 0
+        self._avg_seconds = 10.0  # EWMA of job duration, seeded with a typical agent turn
+        self._lock = threading.Lock()
+        self.stats = {"admitted": 0, "rejected": 0, "expired": 0, "completed": 0}
+
+    def expected_wait(self) -> float:
+        """Seconds a newly admitted job would wait before starting."""
+        with self._lock:
+            return self._expected_wait_locked()
+
+    def _expected_wait_locked(self) -> float:
+        ahead = self._queued + max(self._active - self.workers + 1, 0)
+        queue_wait = ahead / self.workers * self._avg_seconds
+        limiter_wait = max((get_limiter(name).expected_wait() for name in self.upstreams), default=0.0)
+        return queue_wait + limiter_wait
+
+    def submit(self, session_id: str, fn: Callable, *args) -> Future:
+        """Queue fn(*args) for a session, or raise Busy without queueing."""
+        with self._lock:
+            pending = self._queues.get(session_id)
+            pending_count = (len(pending) if pending else 0) + self._running.get(session_id, 0)
+            reason = None
+            if self._queued >= self.max_queue:
+                reason = "The assistant is at capacity"
+            elif pending_count >= self.max_per_session:
+                reason = "Still working on your previous message"
+            else:
+                wait = self._expected_wait_locked()
+                if wait > self.max_wait:
+                    reason = f"The assistant is busy (expected wait {wait:.0f}s)"
+            if reason:
+                self.stats["rejected"] += 1
+                raise Busy(reason, retry_after=min(self._expected_wait_locked(), self.max_wait) or 1)
+
+            job = _Job(session_id, fn, args)
+            self._queues.setdefault(session_id, deque()).append(job)
+            self._queued += 1
+            self.stats["admitted"] += 1
+            self._dispatch_locked()
+        return job.future
+
+    def _dispatch_locked(self) -> None:
+        now = time.monotonic()
+        while self._active < self.workers:
+            # Round robin: the first session in order with nothing running goes next
+            session_id = next((sid for sid in self._queues if not self._running.get(sid)), None)
+            if session_id is None:
+                return
+            queue = self._queues.pop(session_id)
+            job = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._queues[session_id] = queue  # back of the line
+
+            if now - job.enqueued_at > self.max_wait:
+                self.stats["expired"] += 1
+                job.future.set_exception(Busy("The assistant is busy; your message waited too long", self.max_wait))
+                continue
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            self._active += 1
+            self._running[session_id] = self._running.get(session_id, 0) + 1
+            self.pool.submit(self._run, job)
+
+    def _run(self, job: _Job) -> None:
+        started = time.monotonic()
+        try:
+            job.future.set_result(job.fn(*job.args))
+        except BaseException as e:
+            job.future.set_exception(e)
+        finally:
+            with self._lock:
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (time.monotonic() - started)
+                self._active -= 1
+                self._running[job.session_id] -= 1
+                if not self._running[job.session_id]:
+                    del self._running[job.session_id]
+                if job.session_id in self._queues:
+                    self._queues.move_to_end(job.session_id)  # it just had a turn
+                self.stats["completed"] += 1
+                self._dispatch_locked()
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "active": self._active,
+                "queued": self._queued,
+                "sessions_waiting": len(self._queues),
+                "avg_seconds": round(self._avg_seconds, 3),
+                "expected_wait": round(self._expected_wait_locked(), 3),
+                **self.stats,
+            }
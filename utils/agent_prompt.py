@@ -0,0 +1,15 @@
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+# Vendored copy of the hub prompt "hwchase17/openai-functions-agent", so
+# building the agent doesn't need a network round trip to the LangChain hub.
+SYSTEM_MESSAGE = "You are a helpful assistant"
+
+
+def get_agent_prompt(system_message: str = SYSTEM_MESSAGE) -> ChatPromptTemplate:
+    """The openai-functions-agent prompt: system, optional chat_history, input, agent_scratchpad."""
+    return ChatPromptTemplate.from_messages([
+        ("system", system_message),
+        MessagesPlaceholder("chat_history", optional=True),
+        ("human", "{input}"),
+        MessagesPlaceholder("agent_scratchpad"),
+    ])
@@ -0,0 +1,75 @@
+import re
+import math
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "was", "what", "which", "who", "will", "with",
+    "any", "about", "cover", "covers", "course", "courses", "there", "do", "does", "event", "events",
+}
+
+
+def _stem(token: str) -> str:
+    # Light plural folding so "talks" matches "talk"; "class" and "analysis" are left alone
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens with common stopwords removed and plurals folded."""
+    return [_stem(t) for t in TOKEN_RE.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+class BM25:
+    """
+    Okapi BM25 over an in-memory inverted index.
+
+    Documents are identified by their position in the list passed to the
+    constructor. Only postings for the query terms are visited, so a search
+    costs time proportional to the matching documents, not the corpus.
+    """
+
+    def __init__(self, documents: Iterable[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_len: List[int] = []
+
+        for doc_id, text in enumerate(documents):
+            counts = Counter(tokenize(text))
+            self.doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((doc_id, tf))
+
+        self.num_docs = len(self.doc_len)
+        self.avg_doc_len = (sum(self.doc_len) / self.num_docs) if self.num_docs else 0.0
+        self.idf = {
+            term: math.log(1 + (self.num_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def __len__(self):
+        return self.num_docs
+
+    def scores(self, query: str) -> Dict[int, float]:
+        """BM25 score for every document that contains at least one query term."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[doc_id] / self.avg_doc_len)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: str, top_k: int = 10, allowed: Optional[set] = None) -> List[Tuple[int, float]]:
+        """Top-k (doc_id, score) pairs, optionally restricted to an allowed set of doc ids."""
+        scores = self.scores(query)
+        if allowed is not None:
+            scores = {doc_id: score for doc_id, score in scores.items() if doc_id in allowed}
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
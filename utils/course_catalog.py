@@ -0,0 +1,235 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+CATALOG_DB = "data/curriculumData/course_catalog.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subjects (
+    code TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS courses (
+    subject_code TEXT NOT NULL,
+    catalog_nbr TEXT NOT NULL,
+    title TEXT,
+    term TEXT,
+    crse_id TEXT NOT NULL,
+    crse_offer_nbr TEXT NOT NULL,
+    PRIMARY KEY (subject_code, crse_id, crse_offer_nbr)
+);
+CREATE TABLE IF NOT EXISTS course_details (
+    crse_id TEXT NOT NULL,
+    crse_offer_nbr TEXT NOT NULL,
+    details TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (crse_id, crse_offer_nbr)
+);
+"""
+
+
+class CourseCatalog:
+    """
+    Local SQLite mirror of the Duke curriculum API.
+
+    Reads return None when the requested subject or course has not been synced,
+    so callers can fall back to the live API. Each thread gets its own
+    connection; the database file is only created on the first write.
+    """
+
+    def __init__(self, path: str = CATALOG_DB):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self, create: bool = False) -> Optional[sqlite3.Connection]:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        if not create and not os.path.exists(self.path):
+            return None
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        self._local.conn = conn
+        return conn
+
+    def is_available(self) -> bool:
+        """True when a synced catalog exists on disk."""
+        return self._connect() is not None
+
+    def last_synced(self) -> Optional[float]:
+        """Time of the most recent write to the catalog, or None if nothing was synced."""
+        conn = self._connect()
+        if conn is None:
+            return None
+        row = conn.execute(
+            "SELECT MAX(t) FROM (SELECT MAX(synced_at) AS t FROM subjects "
+            "UNION ALL SELECT MAX(synced_at) FROM course_details)"
+        ).fetchone()
+        return row[0]
+
+    def get_courses(self, subject_code: str) -> Optional[List[Dict]]:
+        """Course summaries for a subject, or None if the subject was never synced."""
+        conn = self._connect()
+        if conn is None:
+            return None
+        if conn.execute("SELECT 1 FROM subjects WHERE code = ?", (subject_code,)).fetchone() is None:
+            return None
+        rows = conn.execute(
+            "SELECT catalog_nbr, title, term, crse_id, crse_offer_nbr FROM courses "
+            "WHERE subject_code = ? ORDER BY catalog_nbr",
+            (subject_code,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_details(self, crse_id: str, crse_offer_nbr: str) -> Optional[Dict]:
+        """Offering details for a course, or None if they were never synced."""
+        conn = self._connect()
+        if conn is None:
+            return None
+        row = conn.execute(
+            "SELECT details FROM course_details WHERE crse_id = ? AND crse_offer_nbr = ?",
+            (str(crse_id), str(crse_offer_nbr)),
+        ).fetchone()
+        return json.loads(row["details"]) if row else None
+
+    def iter_details(self):
+        """Yield (subject_code, summary, details) for every synced course with details."""
+        conn = self._connect()
+        if conn is None:
+            return
+        rows = conn.execute(
+            "SELECT c.subject_code, c.catalog_nbr, c.title, c.term, c.crse_id, c.crse_offer_nbr, d.details "
+            "FROM courses c JOIN course_details d "
+            "ON c.crse_id = d.crse_id AND c.crse_offer_nbr = d.crse_offer_nbr"
+        )
+        for row in rows:
+            row = dict(row)
+            details = json.loads(row.pop("details"))
+            yield row.pop("subject_code"), row, details
+
+    def replace_subject(self, code: str, name: str, summaries: List[Dict]) -> None:
+        """Replace every course summary stored for a subject."""
+        conn = self._connect(create=True)
+        with conn:
+            conn.execute("DELETE FROM courses WHERE subject_code = ?", (code,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO courses (subject_code, catalog_nbr, title, term, crse_id, crse_offer_nbr) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (code, c["catalog_nbr"], c["title"], c["term"], str(c["crse_id"]), str(c["crse_offer_nbr"]))
+                    for c in summaries
+                ],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO subjects (code, name, synced_at) VALUES (?, ?, ?)",
+                (code, name, time.time()),
+            )
+
+    def put_details(self, crse_id: str, crse_offer_nbr: str, details: Dict) -> None:
+        """Store the offering details for a single course."""
+        conn = self._connect(create=True)
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO course_details (crse_id, crse_offer_nbr, details, synced_at) VALUES (?, ?, ?, ?)",
+                (str(crse_id), str(crse_offer_nbr), json.dumps(details), time.time()),
+            )
+
+
+def sync_catalog(subjects: Dict[str, str], catalog: CourseCatalog,
+                 fetch_courses: Callable[[str, str], object],
+                 fetch_details: Callable[[str, str], Dict],
+                 max_workers: int = 8, with_details: bool = True) -> Dict[str, int]:
+    """
+    Pull course summaries (and optionally offering details) for every subject
+    into the local catalog.
+
+    Network calls run on a bounded thread pool; all writes happen on the
+    calling thread as results arrive.
+
+    Args:
+        subjects (Dict[str, str]): Subject code -> name, as in duke_subjects.json
+        catalog (CourseCatalog): Store to write into
+        fetch_courses: (code, name) -> list of summaries or an error dict
+        fetch_details: (crse_id, crse_offer_nbr) -> details dict or an error dict
+        max_workers (int): Maximum concurrent API requests
+        with_details (bool): Also sync the per-course offering details
+
+    Returns:
+        Dict[str, int]: Counts of synced subjects/courses and failures
+    """
+    stats = {"subjects": 0, "subject_errors": 0, "details": 0, "detail_errors": 0}
+    offerings = set()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_courses, code, name): (code, name) for code, name in subjects.items()}
+        for future in as_completed(futures):
+            code, name = futures[future]
+            try:
+                summaries = future.result()
+            except Exception as e:
+                summaries = {"error": str(e)}
+
+            if isinstance(summaries, dict) and "error" in summaries:
+                print(f"❌ {code}: {summaries['error']}")
+                stats["subject_errors"] += 1
+                continue
+
+            catalog.replace_subject(code, name, summaries)
+            offerings.update((str(c["crse_id"]), str(c["crse_offer_nbr"])) for c in summaries)
+            stats["subjects"] += 1
+            print(f"✅ {code}: {len(summaries)} courses")
+
+        if with_details:
+            futures = {executor.submit(fetch_details, *offering): offering for offering in offerings}
+            for future in as_completed(futures):
+                crse_id, crse_offer_nbr = futures[future]
+                try:
+                    details = future.result()
+                except Exception as e:
+                    details = {"error": str(e)}
+
+                if "error" in details:
+                    stats["detail_errors"] += 1
+                    continue
+
+                catalog.put_details(crse_id, crse_offer_nbr, details)
+                stats["details"] += 1
+                if stats["details"] % 500 == 0:
+                    print(f"Synced {stats['details']}/{len(offerings)} course details")
+
+    return stats
+
+
+if __name__ == "__main__":
+    from tools.curriculumTool import SUBJECTS, fetch_subject_courses, get_course_details_helper
+
+    parser = argparse.ArgumentParser(description="Mirror the Duke course catalog into a local SQLite store.")
+    parser.add_argument("--db", default=CATALOG_DB, help="SQLite file to write")
+    parser.add_argument("--workers", type=int, default=8, help="Maximum concurrent API requests")
+    parser.add_argument("--subjects", nargs="*", help="Only sync these subject codes")
+    parser.add_argument("--skip-details", action="store_true", help="Only sync course summaries")
+    args = parser.parse_args()
+
+    subjects = {code: name for code, name in SUBJECTS.items() if not args.subjects or code in args.subjects}
+    start = time.time()
+    stats = sync_catalog(
+        subjects,
+        CourseCatalog(args.db),
+        fetch_courses=fetch_subject_courses,
+        fetch_details=get_course_details_helper,
+        max_workers=args.workers,
+        with_details=not args.skip_details,
+    )
+    stats["seconds"] = round(time.time() - start, 1)
+    print(json.dumps(stats, indent=2))
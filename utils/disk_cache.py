@@ -0,0 +1,133 @@
+import os
+import json
+import zlib
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class DiskCache:
+    """
+    Minimal key/value store that keeps one JSON file per key under a directory.
+
+    Keys are hashed into file names, so any string can be used as a key.
+    Writes go through a temp file and os.replace, so readers never see a
+    half-written entry.
+
+    With compress=True entries are zlib-compressed on disk. With max_bytes set
+    the directory is kept under that size by evicting the least recently used
+    entries (access order is tracked in memory and seeded from file mtimes).
+    Hits and misses are counted and reported by stats().
+    """
+
+    def __init__(self, directory: str, compress: bool = False, max_bytes: Optional[int] = None):
+        self.directory = directory
+        self.compress = compress
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json.z" if self.compress else f"{digest}.json")
+
+    def _scan(self) -> None:
+        """Load existing entry sizes, oldest access first, so LRU order survives restarts."""
+        suffix = ".json.z" if self.compress else ".json"
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(suffix):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(entries):
+            self._sizes[path] = size
+            self._total_bytes += size
+
+    def _record(self, path: str, hit: bool) -> None:
+        with self._lock:
+            if not hit:
+                self.misses += 1
+                return
+            self.hits += 1
+            if path in self._sizes:
+                self._sizes.move_to_end(path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the stored value for key, or None if missing or unreadable."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            value = json.loads(zlib.decompress(data) if self.compress else data)
+        except FileNotFoundError:
+            self._record(path, hit=False)
+            return None
+        except Exception as e:
+            print(f"⚠️ Could not read cache entry {path}: {e}")
+            self._record(path, hit=False)
+            return None
+        self._record(path, hit=True)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value under key."""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        data = json.dumps(value).encode("utf-8")
+        if self.compress:
+            data = zlib.compress(data, 6)
+        with self._lock:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._total_bytes += len(data) - self._sizes.pop(path, 0)
+            self._sizes[path] = len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes (caller holds the lock)."""
+        if self.max_bytes is None:
+            return
+        while self._total_bytes > self.max_bytes and len(self._sizes) > 1:
+            path, size = self._sizes.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def delete(self, key: str) -> None:
+        """Remove key from the cache if present."""
+        path = self._path(key)
+        with self._lock:
+            self._total_bytes -= self._sizes.pop(path, 0)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts since startup plus the current entry count and size on disk."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "entries": len(self._sizes),
+            "bytes": self._total_bytes,
+        }
@@ -0,0 +1,285 @@
+import re
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+
+TIMEZONE = "US/Eastern"
+DEFAULT_FUTURE_DAYS = 15
+
+WEEKDAYS = {name.lower(): i for i, name in enumerate(calendar.day_name)}
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+MONTHS["sept"] = 9
+
+MONTH_PATTERN = "|".join(sorted(MONTHS, key=len, reverse=True))
+MONTH_DAY_RE = re.compile(rf"\b(?:on\s+)?({MONTH_PATTERN})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s*(\d{{4}}))?\b")
+DAY_MONTH_RE = re.compile(rf"\b(?:on\s+)?(?:the\s+)?(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({MONTH_PATTERN})\b(?:,?\s*(\d{{4}}))?")
+ISO_DATE_RE = re.compile(r"\b(?:on\s+)?(\d{4})-(\d{2})-(\d{2})\b")
+SLASH_DATE_RE = re.compile(r"\b(?:on\s+)?(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?\b")
+NEXT_N_RE = re.compile(r"\b(?:in\s+the\s+|over\s+the\s+)?(?:next|coming)\s+(\d{1,3})\s+(day|week)s?\b")
+WEEKDAY_RE = re.compile(r"\b(?:(this|next|on|coming)\s+)?(" + "|".join(WEEKDAYS) + r")\b")
+
+# Lowercase phrase -> category; only entries present in categories.txt are used
+KEYWORD_CATEGORIES = {
+    "seminar": "Panel/Seminar/Colloquium",
+    "seminars": "Panel/Seminar/Colloquium",
+    "colloquium": "Panel/Seminar/Colloquium",
+    "panel": "Panel/Seminar/Colloquium",
+    "panels": "Panel/Seminar/Colloquium",
+    "lecture": "Lecture/Talk",
+    "lectures": "Lecture/Talk",
+    "talk": "Lecture/Talk",
+    "talks": "Lecture/Talk",
+    "workshop": "Workshop/Short Course",
+    "workshops": "Workshop/Short Course",
+    "conference": "Conference/Symposium",
+    "conferences": "Conference/Symposium",
+    "symposium": "Conference/Symposium",
+    "concert": "Concert/Music",
+    "concerts": "Concert/Music",
+    "music": "Concert/Music",
+    "movie": "Movie/Film",
+    "movies": "Movie/Film",
+    "film": "Movie/Film",
+    "films": "Movie/Film",
+    "ai": "Artificial Intelligence",
+    "artificial intelligence": "Artificial Intelligence",
+    "free food": "Free Food and Beverages",
+    "exhibit": "Exhibit",
+    "exhibits": "Exhibit",
+    "exhibition": "Exhibit",
+    "festival": "Festival/Fair",
+    "fair": "Festival/Fair",
+    "dance": "Dance Performance",
+    "theater": "Theater",
+    "theatre": "Theater",
+    "comedy": "Comedy",
+    "tour": "Tour",
+    "tours": "Tour",
+    "volunteer": "Volunteer/Community Service",
+    "volunteering": "Volunteer/Community Service",
+    "info session": "Information Session",
+    "information session": "Information Session",
+    "sports": "Athletics/Varsity Sports/Combined",
+    "athletics": "Athletics/Varsity Sports/Combined",
+    "entrepreneurship": "Entrepreneurship",
+    "sustainability": "Sustainability",
+    "climate": "Climate",
+    "research": "Research",
+    "technology": "Technology",
+    "tech": "Technology",
+}
+
+# A group whose name is also a topic keyword ("Music", "Dance") only counts as
+# a sponsor filter when the query names it as one ("hosted by the music
+# department"); otherwise "music concerts" is just a topic.
+SPONSOR_BEFORE = r"(?:(?:hosted|sponsored|organized|presented|put on)\s+)?(?:by|from)\s+(?:the\s+)?"
+SPONSOR_AFTER = r"(?:\s+(?:department|dept|program|club|society|group))"
+
+LOCATION_KEYWORDS = [
+    "zoom", "online", "virtual", "downtown", "west campus", "east campus", "central campus",
+    "chapel", "duke gardens", "sarah p. duke gardens", "perkins", "rubenstein", "bryan center",
+    "wilson", "cameron", "fuqua", "wallace wade", "nasher", "rubenstein arts center",
+    "gross hall", "fitzpatrick", "french family science center", "penn pavilion", "page auditorium",
+]
+
+# Words that carry no filter information once dates/locations/topics are removed
+FILLER_WORDS = {
+    "a", "about", "activities", "activity", "all", "am", "an", "and", "any", "anything", "are", "at",
+    "attend", "can", "campus", "coming", "could", "do", "does", "duke", "duke's", "during", "event", "events",
+    "find", "for", "from", "get", "go", "going", "happening", "happen", "have", "here", "i", "in", "is",
+    "it", "list", "me", "of", "on", "or", "over", "planned", "please", "scheduled", "show", "some",
+    "tell", "that", "the", "there", "things", "this", "to", "university", "up", "upcoming", "we",
+    "what", "what's", "whats", "when", "where", "which", "will", "with", "you", "happenings", "s",
+}
+
+
+def today_in(timezone: str = TIMEZONE, now: Optional[datetime] = None) -> date:
+    """Today's date in the given timezone (or the date of `now` if provided)."""
+    if now is not None:
+        return now.date()
+    return datetime.now(pytz.timezone(timezone)).date()
+
+
+def _resolve_year(month: int, day: int, year: Optional[str], today: date) -> Optional[date]:
+    try:
+        if year:
+            return date(int(year) if len(year) == 4 else 2000 + int(year), month, day)
+        candidate = date(today.year, month, day)
+        # A month/day already well in the past refers to next year
+        if candidate < today - timedelta(days=7):
+            candidate = date(today.year + 1, month, day)
+        return candidate
+    except ValueError:
+        return None
+
+
+def _find_date_range(text: str, today: date) -> Tuple[Optional[Tuple[date, date]], str]:
+    """Find the first date expression, returning ((start, end), text with it removed)."""
+    def cut(match):
+        return text[:match.start()] + " " + text[match.end():]
+
+    for phrase, start, end in (
+        ("today", today, today),
+        ("tonight", today, today),
+        ("tomorrow", today + timedelta(days=1), today + timedelta(days=1)),
+    ):
+        match = re.search(rf"\b{phrase}(?:'s)?\b", text)
+        if match:
+            return (start, end), cut(match)
+
+    match = re.search(r"\b(this|next|coming|the)?\s*weekend\b", text)
+    if match:
+        saturday = today + timedelta(days=(5 - today.weekday()) % 7)
+        if today.weekday() == 6:
+            saturday = today - timedelta(days=1)
+        if match.group(1) == "next":
+            saturday += timedelta(days=7)
+        start = max(saturday, today)
+        return (start, saturday + timedelta(days=1)), cut(match)
+
+    match = re.search(r"\b(this|next|coming)\s+week\b", text)
+    if match:
+        monday = today - timedelta(days=today.weekday())
+        if match.group(1) == "next":
+            monday += timedelta(days=7)
+            return (monday, monday + timedelta(days=6)), cut(match)
+        return (today, monday + timedelta(days=6)), cut(match)
+
+    match = re.search(r"\b(this|next)\s+month\b", text)
+    if match:
+        if match.group(1) == "this":
+            last_day = calendar.monthrange(today.year, today.month)[1]
+            return (today, date(today.year, today.month, last_day)), cut(match)
+        year, month = (today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1)
+        return (date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])), cut(match)
+
+    match = NEXT_N_RE.search(text)
+    if match:
+        days = int(match.group(1)) * (7 if match.group(2) == "week" else 1)
+        return (today, today + timedelta(days=max(days - 1, 0))), cut(match)
+
+    match = ISO_DATE_RE.search(text)
+    if match:
+        try:
+            day = date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+            return (day, day), cut(match)
+        except ValueError:
+            pass
+
+    for regex, month_group, day_group in ((MONTH_DAY_RE, 1, 2), (DAY_MONTH_RE, 2, 1)):
+        match = regex.search(text)
+        if match:
+            day = _resolve_year(MONTHS[match.group(month_group)], int(match.group(day_group)), match.group(3), today)
+            if day:
+                return (day, day), cut(match)
+
+    match = SLASH_DATE_RE.search(text)
+    if match:
+        day = _resolve_year(int(match.group(1)), int(match.group(2)), match.group(3), today)
+        if day:
+            return (day, day), cut(match)
+
+    match = WEEKDAY_RE.search(text)
+    if match:
+        offset = (WEEKDAYS[match.group(2)] - today.weekday()) % 7
+        if match.group(1) == "next" and offset == 0:
+            offset = 7
+        day = today + timedelta(days=offset)
+        return (day, day), cut(match)
+
+    return None, text
+
+
+def _remove_phrases(text: str, phrases: List[str]) -> Tuple[List[str], str]:
+    """Find whole-word occurrences of phrases (longest first), returning the matches and remaining text."""
+    found = []
+    for phrase in sorted(phrases, key=len, reverse=True):
+        pattern = re.compile(rf"(?<![\w]){re.escape(phrase)}(?![\w])")
+        if pattern.search(text):
+            found.append(phrase)
+            text = pattern.sub(" ", text)
+    return found, text
+
+
+def _sponsor_pattern(name: str) -> re.Pattern:
+    """A group name introduced as the sponsor ("by the X", "X department")."""
+    phrase = re.escape(name.lower())
+    return re.compile(rf"(?<![\w])(?:{SPONSOR_BEFORE}{phrase}{SPONSOR_AFTER}?|{phrase}{SPONSOR_AFTER})(?![\w])")
+
+
+def _sponsor_groups(text: str, groups: List[str]) -> Tuple[List[str], str]:
+    """Keep groups whose name isn't a topic keyword, or is named as the sponsor; remove them from text."""
+    kept = []
+    for group in groups:
+        pattern = _sponsor_pattern(group)
+        if pattern.search(text):
+            kept.append(group)
+            text = pattern.sub(" ", text)
+        elif group.lower() not in KEYWORD_CATEGORIES:
+            kept.append(group)
+            _, text = _remove_phrases(text, [group.lower()])
+    return kept, text
+
+
+def parse_event_query(query: str, group_options=None, category_options=None,
+                      now: Optional[datetime] = None, timezone: str = TIMEZONE) -> Dict:
+    """
+    Deterministically extract event filters from a query.
+
+    Resolves relative and explicit dates against today's date, and matches
+    known location keywords plus exact group/category names (a group named
+    like a topic keyword, e.g. "Music", only when introduced as the sponsor).
+    The result has the same keys as the LLM extraction plus "end_date",
+    "search_text" (the query without its date expression) and "confident",
+    which is True only when nothing in the query was left unexplained.
+
+    group_options/category_options are the FilterOptions from eventsTool (any
+    object with a `mentioned_in(text)` method and an `options` list).
+    """
+    today = today_in(timezone, now)
+    text = " ".join(query.lower().replace("?", " ").replace("!", " ").split())
+
+    date_range, text = _find_date_range(text, today)
+    search_text = text.strip()
+
+    locations, text = _remove_phrases(text, LOCATION_KEYWORDS)
+
+    groups, categories = [], []
+    if group_options is not None:
+        groups, text = _sponsor_groups(text, group_options.mentioned_in(text))
+    if category_options is not None:
+        categories = category_options.mentioned_in(text)
+        _, text = _remove_phrases(text, [c.lower() for c in categories])
+        known = set(category_options.options)
+        keyword_hits, text = _remove_phrases(
+            text, [k for k, category in KEYWORD_CATEGORIES.items() if category in known])
+        for keyword in keyword_hits:
+            if KEYWORD_CATEGORIES[keyword] not in categories:
+                categories.append(KEYWORD_CATEGORIES[keyword])
+
+    residual = [token for token in re.findall(r"[\w'&+-]+", text) if token not in FILLER_WORDS]
+
+    if date_range:
+        start, end = date_range
+        future_days = max((end - today).days + 1, 1)
+        target_date = start.isoformat()
+        end_date = end.isoformat() if end != start else None
+    else:
+        future_days = DEFAULT_FUTURE_DAYS
+        target_date = None
+        end_date = None
+
+    return {
+        "future_days": future_days,
+        "groups": groups,
+        "categories": categories,
+        "target_date": target_date,
+        "end_date": end_date,
+        "location_keywords": locations,
+        "search_text": search_text,
+        "confident": not residual,
+        "unparsed": residual,
+    }
@@ -0,0 +1,322 @@
+import time
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import pytz
+import requests
+
+from utils.bm25 import BM25
+from utils.rate_limiter import get_limiter
+
+FEED_URL = "https://calendar.duke.edu/events/index.json"
+TIMEZONE = pytz.timezone("US/Eastern")
+
+
+def _names(value) -> List[str]:
+    """Normalize sponsor/co_sponsor/category fields (str, list of str or list of dicts) to names."""
+    if not value:
+        return []
+    if isinstance(value, (str, dict)):
+        value = [value]
+    names = []
+    for item in value:
+        if isinstance(item, dict):
+            item = item.get("name") or item.get("value") or ""
+        if item:
+            names.append(str(item).strip())
+    return names
+
+
+def parse_event(raw: Dict) -> Optional[Dict]:
+    """Convert one feed entry into a cached event with a timezone-aware start time."""
+    try:
+        start = datetime.strptime(raw.get("start_timestamp", ""), "%Y-%m-%dT%H:%M:%SZ")
+        start = pytz.utc.localize(start).astimezone(TIMEZONE)
+    except ValueError:
+        return None
+
+    location = raw.get("location") or {}
+    return {
+        "id": raw.get("id"),
+        "title": raw.get("summary", "No Title"),
+        "description": (raw.get("description") or "").strip(),
+        "start": start,
+        "location": (location.get("address") if isinstance(location, dict) else str(location)) or "TBD",
+        "link": raw.get("link", ""),
+        "groups": _names(raw.get("sponsor")) + _names(raw.get("co_sponsors")),
+        "categories": _names(raw.get("categories")),
+    }
+
+
+def format_event(event: Dict) -> Dict:
+    """The event shape returned by get_events."""
+    description = event["description"]
+    return {
+        "title": event["title"],
+        "start_time": event["start"].strftime("%b %d, %Y %I:%M %p"),
+        "location": event["location"],
+        "link": event["link"],
+        "description": description[:150] if description else "",
+    }
+
+
+class EventsCache:
+    """
+    In-memory copy of the next `window_days` of the Duke events feed.
+
+    The whole feed is fetched in one request and indexed by local date, group
+    and category; a daemon thread refreshes it every `refresh_interval`
+    seconds. Failed refreshes keep serving the previous snapshot, and every
+    request has a timeout, so an upstream outage never blocks a query for long;
+    with no snapshot yet, queries only retry the fetch once `failure_backoff`
+    seconds have passed since the last failure.
+    """
+
+    def __init__(self, feed_url: str = FEED_URL, window_days: int = 60,
+                 refresh_interval: float = 15 * 60, timeout: float = 10, failure_backoff: float = 30):
+        self.feed_url = feed_url
+        self.window_days = window_days
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.failure_backoff = failure_backoff
+
+        self.events: List[Dict] = []
+        self.by_date: Dict[date, List[int]] = {}
+        self.by_group: Dict[str, set] = {}
+        self.by_category: Dict[str, set] = {}
+        self.search_index: Optional[BM25] = None
+        self.refreshed_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_failure_at: Optional[float] = None
+
+        self._session = requests.Session()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._embeddings: Dict[str, List[float]] = {}
+
+    @property
+    def has_data(self) -> bool:
+        return self.refreshed_at is not None
+
+    @property
+    def has_group_info(self) -> bool:
+        """Whether the feed carries sponsor data, which group filtering relies on."""
+        return bool(self.by_group)
+
+    @property
+    def has_category_info(self) -> bool:
+        """Whether the feed carries categories, which category filtering relies on."""
+        return bool(self.by_category)
+
+    def refresh(self) -> bool:
+        """Fetch and index the full feed. Returns False (keeping old data) on failure."""
+        requested = time.time()
+        with self._refresh_lock:
+            # Another thread finished a fetch while we waited for the lock: use its outcome
+            if self.refreshed_at is not None and self.refreshed_at >= requested:
+                return True
+            if self.last_failure_at is not None and self.last_failure_at >= requested:
+                return False
+
+            params = {"future_days": self.window_days, "local": "true", "feed_type": "simple"}
+            try:
+                get_limiter("duke").acquire()
+                response = self._session.get(self.feed_url, params=params, timeout=self.timeout)
+                response.raise_for_status()
+                raw_events = response.json().get("events", [])
+            except Exception as e:
+                self.last_error = str(e)
+                self.last_failure_at = time.time()
+                print(f"⚠️ Events feed refresh failed: {e}")
+                return False
+
+            events = [event for event in map(parse_event, raw_events) if event]
+            events.sort(key=lambda event: event["start"])
+
+            by_date, by_group, by_category = defaultdict(list), defaultdict(set), defaultdict(set)
+            for i, event in enumerate(events):
+                by_date[event["start"].date()].append(i)
+                for group in event["groups"]:
+                    by_group[group.lower()].add(i)
+                for category in event["categories"]:
+                    by_category[category.lower()].add(i)
+
+            search_index = BM25(f"{e['title']} {e['title']} {e['location']} {e['description']}" for e in events)
+
+            with self._lock:
+                self.events = events
+                self.by_date = dict(by_date)
+                self.by_group = dict(by_group)
+                self.by_category = dict(by_category)
+                self.search_index = search_index
+                current = {self._event_key(event) for event in events}
+                self._embeddings = {k: v for k, v in self._embeddings.items() if k in current}
+                self.refreshed_at = time.time()
+                self.last_error = None
+            return True
+
+    def start(self) -> None:
+        """Start the background refresh thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="events-cache-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if not self.has_data or time.time() - self.refreshed_at >= self.refresh_interval:
+                self.refresh()
+            self._stop.wait(min(self.refresh_interval, 60))
+
+    def ensure_loaded(self) -> bool:
+        """Make sure a snapshot exists, fetching synchronously on first use."""
+        self.start()
+        if not self.has_data:
+            if self.last_failure_at is not None and time.time() - self.last_failure_at < self.failure_backoff:
+                return False
+            self.refresh()
+        return self.has_data
+
+    def snapshot(self):
+        """A consistent view of (events, by_date, by_group, by_category)."""
+        with self._lock:
+            return self.events, self.by_date, self.by_group, self.by_category
+
+    def query(self, groups=None, categories=None, future_days=15, target_date=None, end_date=None,
+              location_keywords=None) -> Optional[List[Dict]]:
+        """
+        Answer an events query from memory. Returns None when the cache cannot
+        answer it (no data yet, range beyond the cached window, or group filters
+        the feed has no sponsor or category data for), so the caller can hit
+        the API instead.
+        """
+        groups = [g for g in ([groups] if isinstance(groups, str) else groups or []) if g.lower() != "all"]
+        categories = [c for c in ([categories] if isinstance(categories, str) else categories or []) if c.lower() != "all"]
+
+        if int(future_days or 0) > self.window_days or not self.ensure_loaded():
+            return None
+        if groups and not self.has_group_info:
+            return None
+        if categories and not self.has_category_info:
+            return None
+
+        events, by_date, by_group, by_category = self.snapshot()
+        today = datetime.now(TIMEZONE).date()
+
+        if target_date:
+            try:
+                first = datetime.strptime(target_date, "%Y-%m-%d").date()
+                last = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else first
+            except ValueError:
+                first, last = today, today + timedelta(days=max(int(future_days or 1), 1) - 1)
+        else:
+            first, last = today, today + timedelta(days=max(int(future_days or 1), 1) - 1)
+
+        candidates = set()
+        day = first
+        while day <= last:
+            candidates.update(by_date.get(day, ()))
+            day += timedelta(days=1)
+
+        if groups:
+            candidates &= set().union(*(by_group.get(g.lower(), set()) for g in groups))
+        if categories:
+            candidates &= set().union(*(by_category.get(c.lower(), set()) for c in categories))
+
+        results = []
+        for i in sorted(candidates):
+            event = events[i]
+            if location_keywords:
+                location = event["location"].lower()
+                if not any(keyword.lower() in location for keyword in location_keywords):
+                    continue
+            results.append(format_event(event))
+        return results
+
+    def _event_key(self, event: Dict) -> str:
+        return f"{event['id']}|{event['title']}|{event['start'].isoformat()}"
+
+    def _semantic_scores(self, query: str, candidates: List[int], events: List[Dict], embeddings_model) -> Dict[int, float]:
+        """Cosine similarity for candidates, embedding any events not seen before."""
+        import numpy as np
+
+        # A refresh may swap in a pruned _embeddings at any time, so the shared
+        # dict is only touched under the lock and scoring uses local references
+        keys = {i: self._event_key(events[i]) for i in candidates}
+        with self._lock:
+            vectors = {i: self._embeddings.get(key) for i, key in keys.items()}
+        missing = [i for i in candidates if vectors[i] is None]
+        if missing:
+            texts = [f"{events[i]['title']}. {events[i]['description'][:1000]}" for i in missing]
+            for i, vector in zip(missing, embeddings_model.embed_documents(texts)):
+                vectors[i] = vector
+            with self._lock:
+                self._embeddings.update((keys[i], vectors[i]) for i in missing)
+
+        matrix = np.asarray([vectors[i] for i in candidates], dtype=np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True).clip(min=1e-12)
+        vector = np.asarray(embeddings_model.embed_query(query), dtype=np.float32)
+        vector /= np.linalg.norm(vector) or 1.0
+        return dict(zip(candidates, (matrix @ vector).tolist()))
+
+    def search(self, text: str, top_k: int = 10, future_days: int = 30, target_date=None, end_date=None,
+               embeddings_model=None, semantic_weight: float = 0.5) -> Optional[List[Dict]]:
+        """
+        Rank upcoming events by BM25 over title, location and description,
+        optionally blended with embedding similarity. Returns None if the cache
+        has no data.
+        """
+        if not self.ensure_loaded():
+            return None
+
+        with self._lock:
+            events, by_date, search_index = self.events, self.by_date, self.search_index
+
+        today = datetime.now(TIMEZONE).date()
+        try:
+            first = datetime.strptime(target_date, "%Y-%m-%d").date() if target_date else today
+            last = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else (
+                first if target_date else today + timedelta(days=max(int(future_days or 1), 1) - 1))
+        except ValueError:
+            first, last = today, today + timedelta(days=max(int(future_days or 1), 1) - 1)
+
+        allowed = set()
+        day = first
+        while day <= last:
+            allowed.update(by_date.get(day, ()))
+            day += timedelta(days=1)
+
+        shortlist = max(top_k * 5, 50)
+        scores = dict(search_index.search(text, top_k=shortlist, allowed=allowed))
+
+        if embeddings_model is not None and allowed:
+            # Only the BM25 shortlist is re-ranked, so a query embeds at most
+            # `shortlist` new events instead of the whole window; vague queries
+            # with few lexical hits are topped up with the soonest events
+            candidates = sorted(scores)
+            if len(candidates) < shortlist:
+                candidates += sorted(allowed - scores.keys())[:shortlist - len(candidates)]
+            top_lexical = max(scores.values(), default=0.0) or 1.0
+            semantic = self._semantic_scores(text, sorted(candidates), events, embeddings_model)
+            scores = {
+                i: (1 - semantic_weight) * scores.get(i, 0.0) / top_lexical + semantic_weight * semantic[i]
+                for i in candidates
+            }
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [{**format_event(events[i]), "score": round(score, 4)} for i, score in ranked]
+
+    def status(self) -> Dict:
+        return {
+            "events": len(self.events),
+            "refreshed_at": self.refreshed_at,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,71 @@
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace so lookups are case and spacing insensitive."""
+    return " ".join(str(text).lower().split())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of the normalized text, padded so short strings still produce grams."""
+    padded = f"  {normalize(text)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    """SequenceMatcher ratio between two normalized strings."""
+    return SequenceMatcher(None, normalize(a), normalize(b)).ratio()
+
+
+class TrigramIndex:
+    """
+    Inverted index from character trigrams to the keys whose texts contain them.
+
+    A key can be registered under several texts (e.g. a subject code and its
+    name); candidate generation scores each text by trigram Jaccard overlap with
+    the query and keeps the best text per key. Expensive scoring is then only run
+    on the returned shortlist.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._entries: List[Tuple[Hashable, int]] = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, key: Hashable, texts: Iterable[str]) -> None:
+        """Register one or more texts for a key."""
+        for text in texts:
+            grams = trigrams(text)
+            if not grams:
+                continue
+            entry_id = len(self._entries)
+            self._entries.append((key, len(grams)))
+            for gram in grams:
+                self._postings[gram].append(entry_id)
+
+    def candidates(self, query: str, limit: int = 20, containment: bool = False) -> List[Tuple[Hashable, float]]:
+        """
+        Return up to `limit` keys ranked by trigram overlap with the query.
+
+        By default overlap is Jaccard similarity. With containment=True it is the
+        fraction of the indexed text's trigrams found in the query, which suits
+        short labels searched with a long free-text query.
+        """
+        query_grams = trigrams(query)
+        hits: Dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for entry_id in self._postings.get(gram, ()):
+                hits[entry_id] += 1
+
+        best: Dict[Hashable, float] = {}
+        for entry_id, shared in hits.items():
+            key, size = self._entries[entry_id]
+            score = shared / size if containment else shared / (len(query_grams) + size - shared)
+            if score > best.get(key, 0.0):
+                best[key] = score
+
+        return sorted(best.items(), key=lambda item: item[1], reverse=True)[:limit]
@@ -0,0 +1,135 @@
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.disk_cache import DiskCache
+from utils.rate_limiter import RateLimitExceeded, get_limiter
+
+
+class CachedResponse:
+    """The subset of requests.Response the tools use, backed by a cache entry."""
+
+    def __init__(self, status_code: int, text: str, headers: Optional[Dict[str, str]] = None, from_cache: bool = False):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.from_cache = from_cache
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def cache_key(url: str, ignored_params: Iterable[str] = ("access_token",)) -> str:
+    """Normalize a URL into a cache key, dropping credentials and sorting the query string."""
+    ignored = set(ignored_params)
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in ignored)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+class CachedHTTPClient:
+    """
+    Pooled HTTP client with a disk-backed response cache.
+
+    - Fresh entries (younger than ttl) are served without touching the network.
+    - Stale entries within stale_while_revalidate are served immediately while a
+      background conditional GET refreshes them.
+    - Older entries are revalidated synchronously with If-None-Match /
+      If-Modified-Since; if the upstream is unreachable the stale copy is served.
+    Only 200 responses are cached. With `upstream`, requests draw on that
+    shared rate limit; background refreshes never wait for it (they are
+    skipped instead) and a stale copy is served if the limit is exhausted.
+    """
+
+    def __init__(self, cache_dir: str, ttl: float = 6 * 3600, stale_while_revalidate: float = 7 * 24 * 3600,
+                 timeout: float = 10, pool_size: int = 10, ignored_params: Iterable[str] = ("access_token",),
+                 upstream: Optional[str] = None):
+        self.cache = DiskCache(cache_dir)
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.timeout = timeout
+        self.ignored_params = tuple(ignored_params)
+        self.upstream = upstream
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="http-cache-refresh")
+
+    def get(self, url: str) -> CachedResponse:
+        """GET a URL, answering from cache whenever the cache policy allows."""
+        key = cache_key(url, self.ignored_params)
+        entry = self.cache.get(key)
+
+        if entry is not None:
+            age = time.time() - entry["fetched_at"]
+            if age < self.ttl:
+                return self._from_entry(entry)
+            if age < self.ttl + self.stale_while_revalidate:
+                self._schedule_refresh(url, key, entry)
+                return self._from_entry(entry)
+
+        try:
+            return self._fetch(url, key, entry)
+        except (requests.exceptions.RequestException, RateLimitExceeded) as e:
+            if entry is not None:
+                print(f"⚠️ Serving stale cache for {key}: {e}")
+                return self._from_entry(entry)
+            raise
+
+    def _from_entry(self, entry: Dict) -> CachedResponse:
+        return CachedResponse(200, entry["body"], entry.get("headers"), from_cache=True)
+
+    def _fetch(self, url: str, key: str, entry: Optional[Dict], max_wait: Optional[float] = None) -> CachedResponse:
+        if self.upstream:
+            get_limiter(self.upstream).acquire(max_wait=max_wait)
+
+        headers = {}
+        if entry is not None:
+            if entry["headers"].get("ETag"):
+                headers["If-None-Match"] = entry["headers"]["ETag"]
+            if entry["headers"].get("Last-Modified"):
+                headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+
+        if response.status_code == 304 and entry is not None:
+            entry["fetched_at"] = time.time()
+            self.cache.set(key, entry)
+            return self._from_entry(entry)
+
+        if response.status_code == 200:
+            validators = {name: response.headers[name] for name in ("ETag", "Last-Modified") if name in response.headers}
+            self.cache.set(key, {
+                "fetched_at": time.time(),
+                "headers": validators,
+                "body": response.text,
+            })
+
+        return CachedResponse(response.status_code, response.text, dict(response.headers))
+
+    def _schedule_refresh(self, url: str, key: str, entry: Dict) -> None:
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._refresher.submit(self._refresh, url, key, entry)
+
+    def _refresh(self, url: str, key: str, entry: Dict) -> None:
+        try:
+            self._fetch(url, key, entry, max_wait=0)
+        except Exception as e:
+            print(f"⚠️ Background refresh failed for {key}: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
@@ -1,5 +1,6 @@
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 import streamlit as st
 from langchain_core.messages import BaseMessage
@@ -7,16 +8,25 @@ from typing import List, Optional
 import json 
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
 from langchain_core.runnables import RunnableSerializable
+from utils.rate_limiter import RateLimitExceeded, get_limiter, estimate_tokens
 
 load_dotenv()
 
+@lru_cache(maxsize=1)
+def get_chat_model():
+    """
+    The shared gpt-4o-mini client used by the tools, so its HTTP connection
+    pool is reused across calls
+    """
+    return ChatOpenAI(model='gpt-4o-mini')
+
 def get_chat_completion(messages: List[BaseMessage],
                          tools: Optional[list] = None,
                          tool_choice: str = "auto"):
     """
     Invoke the ChatOpenAI model with LangChain message format and optional tools.
     """
-    model = ChatOpenAI(model='gpt-4o-mini')
+    model = get_chat_model()
 
     try:
         # Bind tools if needed
@@ -25,21 +35,38 @@ def get_chat_completion(messages: List[BaseMessage],
         else:
             runnable = model
 
-        # Call invoke() on the message list
-        response = runnable.invoke(messages)
+        # Call invoke() on the message list, within the shared OpenAI rate limit
+        estimate = estimate_tokens(*(message.content for message in messages))
+        with get_limiter("openai").limit(estimate) as settle:
+            response = runnable.invoke(messages)
+            usage = getattr(response, "usage_metadata", None) or {}
+            settle(usage.get("total_tokens", estimate))
         return response
 
+    except RateLimitExceeded:
+        # Propagate so the API answers "busy" instead of the tool failing on None
+        raise
     except Exception as e:
         print(f"❌ LangChain ChatOpenAI call failed: {e}")
         return None
     
+class RateLimitedEmbeddings(OpenAIEmbeddings):
+    """OpenAIEmbeddings that draws on the process-wide "openai_embeddings" rate limit"""
+
+    def embed_documents(self, texts, *args, **kwargs):
+        # embed_query goes through here as well
+        with get_limiter("openai_embeddings").limit(estimate_tokens(*texts)):
+            return super().embed_documents(texts, *args, **kwargs)
+
+@lru_cache(maxsize=1)
 def get_embeddings_model():
     """
     Creates and returns an OpenAIEmbeddings object using the provided API key
+    (once; the client and its connection pool are shared)
     """
     api_key = os.getenv("OPENAI_API_KEY")
 
-    return OpenAIEmbeddings(
+    return RateLimitedEmbeddings(
         model="text-embedding-3-small",
         openai_api_key=api_key
     )
@@ -2,21 +2,35 @@ import os
 from dotenv import load_dotenv
 from pinecone import Pinecone, ServerlessSpec
 import math
+import threading
 from typing import List
 import PyPDF2
 from utils.openai_client import get_embeddings_model
+from utils.rate_limiter import get_limiter
 
 # Load API Key
 load_dotenv()
 pinecone_api_key = os.getenv("PINECONE_API_KEY")
-# Initialize Pinecone client
-pc = Pinecone(api_key=pinecone_api_key)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_pinecone_client():
+    """The shared Pinecone client, created on first use rather than at import."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = Pinecone(api_key=pinecone_api_key)
+    return _client
 
 
 def initialize_pinecone_index(index_name, dimension, metric, db_name):
     """
     Creates or retrieves an existing Pinecone index and returns the index object.
     """
+    pc = get_pinecone_client()
     existing_indexes = [index["name"] for index in pc.list_indexes()]
     
     if index_name not in existing_indexes:
@@ -42,6 +56,40 @@ def initialize_pinecone_index(index_name, dimension, metric, db_name):
     return pc.Index(index_name, host=host_url)
 
 
+class RateLimitedIndex:
+    """
+    A Pinecone index whose queries draw on the process-wide "pinecone" rate
+    limit; everything else is passed through to the wrapped index.
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    def query(self, *args, **kwargs):
+        get_limiter("pinecone").acquire()
+        return self.index.query(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.index, name)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(index_name, dimension, metric, db_name):
+    """
+    initialize_pinecone_index, resolved once per process: the host lookup
+    costs two control-plane round trips, so queries reuse the handle.
+    """
+    if index_name not in _indexes:
+        with _indexes_lock:
+            if index_name not in _indexes:
+                _indexes[index_name] = RateLimitedIndex(
+                    initialize_pinecone_index(index_name, dimension, metric, db_name))
+    return _indexes[index_name]
+
+
 def upsert_vectors(index, vectors, batch_size, namespace=None):
     """
     Upserts vectors into the Pinecone index in batches, skipping if namespace already exists.
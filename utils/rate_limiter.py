@@ -0,0 +1,174 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Per-minute request (rpm) and token (tpm) budgets for each upstream, shared by
+# every thread in the process. Override with RATE_LIMIT_<UPSTREAM>_RPM / _TPM.
+DEFAULT_LIMITS = {
+    "openai": {"rpm": 500, "tpm": 200_000},                  # gpt-4o-mini chat completions
+    "openai_embeddings": {"rpm": 3000, "tpm": 1_000_000},    # text-embedding-3-small
+    "pinecone": {"rpm": 600, "tpm": None},
+    "duke": {"rpm": 120, "tpm": None},                       # streamer.oit.duke.edu, calendar.duke.edu
+}
+MAX_WAIT = 30.0  # seconds a caller may wait for budget before giving up
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when an upstream's budget won't free up within the caller's max wait."""
+
+    def __init__(self, upstream: str, wait: float):
+        super().__init__(f"{upstream} is rate limited; budget frees up in {wait:.1f}s")
+        self.upstream = upstream
+        self.wait = wait
+
+
+def estimate_tokens(*texts) -> int:
+    """Rough token count (~4 characters per token) used before the real usage is known."""
+    return sum(len(str(text)) for text in texts if text) // 4
+
+
+class TokenBucket:
+    """
+    Continuously refilling bucket holding up to one minute of budget. The level
+    may go negative when a caller reports more usage than it reserved; later
+    callers then wait for the debt to refill.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        # A request bigger than the whole bucket waits for a full bucket instead of forever
+        needed = min(amount, self.capacity) - self.level
+        return max(needed, 0.0) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+
+class UpstreamLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets for one upstream.
+
+    `acquire(tokens)` blocks until both buckets have room (or raises
+    RateLimitExceeded if that would take longer than max_wait), and
+    `report(extra)` settles the difference once the real token usage is
+    known. `limit()` wraps both as a context manager.
+    """
+
+    def __init__(self, name: str, rpm: float, tpm: Optional[float] = None, max_wait: float = MAX_WAIT):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "tokens": 0, "waits": 0, "wait_seconds": 0.0, "rejected": 0}
+
+    def _wait_time(self, tokens: int) -> float:
+        now = time.monotonic()
+        self.requests.refill(now)
+        wait = self.requests.wait_time(1)
+        if self.tokens is not None:
+            self.tokens.refill(now)
+            wait = max(wait, self.tokens.wait_time(tokens))
+        return wait
+
+    def expected_wait(self, tokens: int = 0) -> float:
+        """Seconds until a request of `tokens` could start, without reserving anything."""
+        with self._lock:
+            return self._wait_time(tokens)
+
+    def acquire(self, tokens: int = 0, max_wait: Optional[float] = None) -> float:
+        """Reserve one request and `tokens` tokens; returns the seconds spent waiting."""
+        max_wait = self.max_wait if max_wait is None else max_wait
+        started = time.monotonic()
+        slept = False
+        while True:
+            with self._lock:
+                wait = self._wait_time(tokens)
+                waited = time.monotonic() - started
+                if wait <= 0:
+                    self.requests.take(1)
+                    if self.tokens is not None:
+                        self.tokens.take(tokens)
+                    self.stats["requests"] += 1
+                    self.stats["tokens"] += tokens
+                    if slept:
+                        self.stats["waits"] += 1
+                        self.stats["wait_seconds"] += waited
+                    return waited if slept else 0.0
+                if waited + wait > max_wait:
+                    self.stats["rejected"] += 1
+                    raise RateLimitExceeded(self.name, wait)
+            # Re-check at least every second: other callers may report usage meanwhile
+            time.sleep(min(wait, 1.0))
+            slept = True
+
+    def report(self, extra_tokens: int) -> None:
+        """Settle actual usage against the reservation (negative returns budget)."""
+        if self.tokens is None or not extra_tokens:
+            return
+        with self._lock:
+            self.tokens.refill(time.monotonic())
+            self.tokens.take(extra_tokens)
+            self.stats["tokens"] += extra_tokens
+
+    @contextmanager
+    def limit(self, tokens: int = 0, max_wait: Optional[float] = None):
+        """
+        with limiter.limit(estimate) as settle:
+            response = call()
+            settle(actual_tokens)
+        """
+        self.acquire(tokens, max_wait)
+        yield lambda actual: self.report(actual - tokens)
+
+    def status(self) -> Dict:
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            status = {"rpm": self.requests.capacity, "requests_available": round(self.requests.level, 1),
+                      **{k: round(v, 3) if isinstance(v, float) else v for k, v in self.stats.items()}}
+            if self.tokens is not None:
+                self.tokens.refill(now)
+                status.update(tpm=self.tokens.capacity, tokens_available=round(self.tokens.level))
+            return status
+
+
+_limiters: Dict[str, UpstreamLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _env_limit(upstream: str, kind: str, default):
+    value = os.getenv(f"RATE_LIMIT_{upstream.upper()}_{kind.upper()}")
+    return float(value) if value else default
+
+
+def get_limiter(upstream: str) -> UpstreamLimiter:
+    """The process-wide limiter for an upstream in DEFAULT_LIMITS."""
+    if upstream not in _limiters:
+        with _limiters_lock:
+            if upstream not in _limiters:
+                limits = DEFAULT_LIMITS[upstream]
+                _limiters[upstream] = UpstreamLimiter(
+                    upstream,
+                    rpm=_env_limit(upstream, "rpm", limits["rpm"]),
+                    tpm=_env_limit(upstream, "tpm", limits["tpm"]),
+                )
+    return _limiters[upstream]
+
+
+def limiter_status() -> Dict[str, Dict]:
+    """Status of every limiter created so far."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.status() for name, limiter in limiters.items()}
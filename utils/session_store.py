@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+SESSIONS_DB = ".cache/sessions.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    messages TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+"""
+
+
+class SessionStore:
+    """
+    Conversation histories for many concurrent sessions.
+
+    Recently used sessions are kept in a bounded in-memory LRU
+    (`max_sessions`); every update is also written through to SQLite, so an
+    evicted session is lazily reloaded on its next message and nothing is lost
+    on restart. A background sweeper drops sessions idle for `idle_seconds`
+    from memory and deletes those idle for `retention_seconds` from disk.
+
+    History is stored as a list of {"role": "user" | "assistant", "content"}
+    dicts capped at `max_messages`. Use `lock(session_id)` to serialize turns
+    within a session; each session gets its own lock, kept only while someone
+    holds or waits for it, so unrelated sessions never contend.
+    """
+
+    def __init__(self, path: str = SESSIONS_DB, max_sessions: int = 1000, max_messages: int = 20,
+                 idle_seconds: float = 30 * 60, retention_seconds: float = 7 * 24 * 3600):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.idle_seconds = idle_seconds
+        self.retention_seconds = retention_seconds
+
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._session_locks: Dict[str, list] = {}  # session_id -> [lock, holders and waiters]
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        self.loads = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def lock(self, session_id: str):
+        """Serialize turns for one session (different sessions proceed in parallel)."""
+        with self._lock:
+            entry = self._session_locks.setdefault(session_id, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._session_locks[session_id]
+
+    def history(self, session_id: str) -> List[Dict[str, str]]:
+        """The session's messages, loading them from SQLite if not in memory."""
+        with self._lock:
+            entry = self._memory.get(session_id)
+            if entry is not None:
+                entry["last_access"] = time.time()
+                self._memory.move_to_end(session_id)
+                return list(entry["messages"])
+
+        row = self._connect().execute(
+            "SELECT messages FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        messages = json.loads(row[0]) if row else []
+        if row:
+            self.loads += 1
+        self._remember(session_id, messages)
+        return list(messages)
+
+    def append(self, session_id: str, user_message: str, assistant_message: str) -> None:
+        """Record one turn, trimming history to max_messages, and persist it."""
+        messages = self.history(session_id) + [
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": assistant_message},
+        ]
+        messages = messages[-self.max_messages:]
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO sessions (session_id, messages, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET messages = excluded.messages, updated_at = excluded.updated_at",
+            (session_id, json.dumps(messages), now),
+        )
+        conn.commit()
+        self._remember(session_id, messages)
+
+    def clear(self, session_id: str) -> bool:
+        """Forget a session in memory and on disk. Returns True if it existed."""
+        with self._lock:
+            in_memory = self._memory.pop(session_id, None) is not None
+        conn = self._connect()
+        deleted = conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount
+        conn.commit()
+        return in_memory or deleted > 0
+
+    def _remember(self, session_id: str, messages: List[Dict[str, str]]) -> None:
+        with self._lock:
+            self._memory[session_id] = {"messages": messages, "last_access": time.time()}
+            self._memory.move_to_end(session_id)
+            while len(self._memory) > self.max_sessions:
+                self._memory.popitem(last=False)
+                self.evictions += 1
+
+    def sweep(self) -> None:
+        """Drop idle sessions from memory and expired sessions from disk."""
+        now = time.time()
+        with self._lock:
+            idle = [sid for sid, entry in self._memory.items() if now - entry["last_access"] > self.idle_seconds]
+            for session_id in idle:
+                del self._memory[session_id]
+            self.evictions += len(idle)
+        conn = self._connect()
+        conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.retention_seconds,))
+        conn.commit()
+
+    def start(self, interval: float = 60) -> None:
+        """Start the background sweeper thread (idempotent)."""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.sweep()
+                except Exception as e:
+                    print(f"⚠️ Session sweep failed: {e}")
+
+        self._sweeper = threading.Thread(target=loop, name="session-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            in_memory = len(self._memory)
+        stored = self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {"in_memory": in_memory, "stored": stored, "loads": self.loads, "evictions": self.evictions}
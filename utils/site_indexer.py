@@ -0,0 +1,248 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tools.webSearchTool import extract_readable_content
+
+load_dotenv()
+
+SITE_LISTS = [
+    "data/aipi-links/aipi-links.json",
+    "data/meng-links/meng-links.json",
+]
+STATE_FILE = "data/site_index_state.json"
+USER_AGENT = "Mozilla/5.0"
+
+
+def load_url_list(paths: List[str]) -> List[str]:
+    """Load and de-duplicate the URLs from one or more site list JSON files."""
+    urls = []
+    seen = set()
+    for path in paths:
+        with open(path, "r") as f:
+            for url in json.load(f):
+                if url not in seen:
+                    seen.add(url)
+                    urls.append(url)
+    return urls
+
+
+def load_state(path: str = STATE_FILE) -> Dict[str, Dict]:
+    """Load the per-URL crawl state (validators, content hash, chunk count)."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading crawl state: {e}")
+        return {}
+
+
+def save_state(state: Dict[str, Dict], path: str = STATE_FILE) -> None:
+    """Atomically write the crawl state back to disk."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def create_session(pool_size: int) -> requests.Session:
+    """Create a requests session whose connection pool matches the worker count."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+def fetch_page(session: requests.Session, url: str, previous: Optional[Dict], timeout: float = 10) -> Dict:
+    """
+    Fetch one page with a conditional GET.
+
+    Returns a dict with a "status" of "not_modified", "fetched" or "error".
+    Fetched pages carry the extracted title/text and the new validators.
+    """
+    headers = {}
+    if previous:
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+
+    try:
+        response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            return {"url": url, "status": "not_modified"}
+        response.raise_for_status()
+
+        title, text = extract_readable_content(response.text)
+        return {
+            "url": url,
+            "status": "fetched",
+            "title": title,
+            "text": text,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+    except Exception as e:
+        return {"url": url, "status": "error", "error": str(e)}
+
+
+def chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 100) -> List[str]:
+    """Split page text into overlapping chunks for embedding."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return splitter.split_text(text)
+
+
+def _vector_id(url: str, position: int) -> str:
+    url_hash = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    return f"site-{url_hash}-{position}"
+
+
+def index_page(page: Dict, index, embeddings, previous_chunks: int = 0,
+               namespace: Optional[str] = None, batch_size: int = 100) -> int:
+    """
+    Chunk, embed and upsert a single page, removing chunks left over from a
+    longer previous version. Returns the number of chunks written.
+    """
+    chunks = chunk_text(page["text"]) if page["text"] else []
+    if chunks:
+        values = embeddings.embed_documents(chunks)
+        vectors = [
+            {
+                "id": _vector_id(page["url"], position),
+                "values": embedding,
+                "metadata": {
+                    "text": chunk,
+                    "source_file": page["url"],
+                    "title": page.get("title", ""),
+                    "position": position,
+                },
+            }
+            for position, (chunk, embedding) in enumerate(zip(chunks, values))
+        ]
+        for start in range(0, len(vectors), batch_size):
+            index.upsert(vectors=vectors[start:start + batch_size], namespace=namespace)
+
+    stale_ids = [_vector_id(page["url"], position) for position in range(len(chunks), previous_chunks)]
+    if stale_ids:
+        index.delete(ids=stale_ids, namespace=namespace)
+
+    return len(chunks)
+
+
+def index_sites(urls: List[str], index, embeddings, state_path: str = STATE_FILE,
+                max_workers: int = 8, namespace: Optional[str] = None, force: bool = False) -> Dict[str, int]:
+    """
+    Crawl the given URLs concurrently and re-index only the pages whose
+    content changed since the last run.
+
+    Args:
+        urls (List[str]): Pages to crawl
+        index: Pinecone index (anything with upsert/delete)
+        embeddings: Embeddings model (anything with embed_documents)
+        state_path (str): Where validators and content hashes are persisted
+        max_workers (int): Number of concurrent fetches
+        namespace (str): Optional Pinecone namespace
+        force (bool): Ignore stored validators and hashes and re-index everything
+
+    Returns:
+        Dict[str, int]: Counts of unchanged, indexed and failed pages
+    """
+    state = {} if force else load_state(state_path)
+    stats = {"not_modified": 0, "unchanged": 0, "indexed": 0, "error": 0}
+
+    session = create_session(max_workers)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(fetch_page, session, url, state.get(url)) for url in urls]
+
+            for future in as_completed(futures):
+                page = future.result()
+                url = page["url"]
+                previous = state.get(url, {})
+
+                if page["status"] == "not_modified":
+                    stats["not_modified"] += 1
+                    continue
+                if page["status"] == "error":
+                    print(f"❌ {url}: {page['error']}")
+                    stats["error"] += 1
+                    continue
+
+                content_hash = hashlib.sha256(page["text"].encode("utf-8")).hexdigest()
+                entry = {
+                    "etag": page["etag"],
+                    "last_modified": page["last_modified"],
+                    "content_hash": content_hash,
+                    "num_chunks": previous.get("num_chunks", 0),
+                    "indexed_at": previous.get("indexed_at"),
+                }
+
+                if previous.get("content_hash") == content_hash:
+                    stats["unchanged"] += 1
+                else:
+                    try:
+                        entry["num_chunks"] = index_page(page, index, embeddings,
+                                                         previous_chunks=previous.get("num_chunks", 0),
+                                                         namespace=namespace)
+                        entry["indexed_at"] = datetime.now(timezone.utc).isoformat()
+                        stats["indexed"] += 1
+                        print(f"✅ Indexed {url} ({entry['num_chunks']} chunks)")
+                    except Exception as e:
+                        print(f"❌ Failed to index {url}: {e}")
+                        stats["error"] += 1
+                        continue
+
+                state[url] = entry
+                save_state(state, state_path)
+    finally:
+        session.close()
+
+    return stats
+
+
+def get_aipi_index():
+    """Connect to the Pinecone index backing get_AIPI_details."""
+    from pinecone import Pinecone
+
+    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY_AIPI"))
+    return pc.Index(os.getenv("PINECONE_INDEX_AIPI"))
+
+
+if __name__ == "__main__":
+    from utils.openai_client import get_embeddings_model
+
+    parser = argparse.ArgumentParser(description="Crawl the AIPI/MEng site lists and index changed pages.")
+    parser.add_argument("--lists", nargs="+", default=SITE_LISTS, help="Site list JSON files to crawl")
+    parser.add_argument("--state", default=STATE_FILE, help="Crawl state file")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent fetches")
+    parser.add_argument("--namespace", default=None, help="Pinecone namespace")
+    parser.add_argument("--force", action="store_true", help="Re-index every page")
+    args = parser.parse_args()
+
+    stats = index_sites(
+        load_url_list(args.lists),
+        index=get_aipi_index(),
+        embeddings=get_embeddings_model(),
+        state_path=args.state,
+        max_workers=args.workers,
+        namespace=args.namespace,
+        force=args.force,
+    )
+    print(json.dumps(stats, indent=2))
@@ -0,0 +1,191 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+WARMUP_WORKERS = 4
+
+
+class WarmUp:
+    """
+    Background warm-up run once at boot, with readiness reporting.
+
+    `stages` is a list of {step name: callable}; the steps of a stage run
+    concurrently and stages run in order, so a later stage (e.g. precomputing
+    FAQ answers) finds the earlier ones' indexes and connections ready. A
+    failing step is logged and recorded but doesn't hold up readiness: the
+    first request that needs it just pays for it, as it would without warm-up.
+
+    Readiness is reported once the first `ready_after` stages are done
+    (default: all of them); the remaining stages keep running in the
+    background, since requests are served fine without them.
+    """
+
+    def __init__(self, stages: List[Dict[str, Callable[[], Any]]], workers: int = WARMUP_WORKERS,
+                 ready_after: Optional[int] = None):
+        self.stages = stages
+        self.workers = workers
+        self.ready_after = len(stages) if ready_after is None else min(ready_after, len(stages))
+        self.steps: Dict[str, Dict[str, Any]] = {name: {"status": "pending"} for stage in stages for name in stage}
+        self.started_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until ready (or timeout); returns readiness."""
+        return self._ready.wait(timeout)
+
+    def start(self) -> None:
+        """Run the warm-up in a background thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def run(self) -> None:
+        self.started_at = time.time()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="warmup") as pool:
+            for i, stage in enumerate(self.stages):
+                if i == self.ready_after:
+                    self._set_ready()
+                list(pool.map(self._run_step, stage.items()))
+        self._set_ready()
+        self.finished_at = time.time()
+        self._done.set()
+
+        failed = [name for name, step in self.steps.items() if step["status"] == "failed"]
+        print(f"🔥 Warm-up finished in {self.finished_at - self.started_at:.1f}s"
+              + (f" ({len(failed)} failed: {', '.join(failed)})" if failed else ""))
+
+    def _set_ready(self) -> None:
+        if not self._ready.is_set():
+            self.ready_at = time.time()
+            self._ready.set()
+            if self.ready_after < len(self.stages):
+                print(f"✅ Ready after {self.ready_at - self.started_at:.1f}s; warm-up continues in the background")
+
+    def _run_step(self, item) -> None:
+        name, step = item
+        self._update(name, status="running")
+        started = time.perf_counter()
+        try:
+            detail = step()
+            self._update(name, status="ok", seconds=round(time.perf_counter() - started, 3),
+                         **({"detail": detail} if detail is not None else {}))
+        except Exception as e:
+            self._update(name, status="failed", seconds=round(time.perf_counter() - started, 3), error=str(e))
+            print(f"⚠️ Warm-up step {name} failed: {e}")
+
+    def _update(self, name: str, **fields) -> None:
+        with self._lock:
+            self.steps[name] = fields
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            steps = {name: dict(step) for name, step in self.steps.items()}
+        end = self.finished_at or time.time()
+        return {
+            "ready": self.ready,
+            "finished": self.finished,
+            "ready_seconds": round(self.ready_at - self.started_at, 3) if self.ready_at else None,
+            "seconds": round(end - self.started_at, 3) if self.started_at else None,
+            "steps": steps,
+        }
+
+
+# Each step imports its tool module itself, so a missing dependency or
+# credential only fails that step.
+
+def warm_professors():
+    """Professor name index and the columnar table behind query_professors."""
+    from tools.professorsTool import get_professor_index, get_professor_table
+    get_professor_table()
+    return {"professors": len(get_professor_index().professors)}
+
+
+def warm_courses():
+    """Subject lookup (built at import of curriculumTool) and the course search index."""
+    from tools.curriculumTool import SUBJECTS
+    from tools.courseSearchTool import get_search_index
+    return {"subjects": len(SUBJECTS), "courses": len(get_search_index().courses)}
+
+
+def warm_events():
+    """Group/category filter indexes and the first events feed snapshot (starts its refresher)."""
+    from tools.eventsTool import get_filter_options, events_cache
+    groups, categories = get_filter_options()
+    events_cache.ensure_loaded()
+    return {"groups": len(groups.options), "categories": len(categories.options), "events": len(events_cache.events)}
+
+
+def warm_pinecone_mem():
+    from tools.memDatabaseTool import get_index
+    get_index().describe_index_stats()  # resolves the host and opens its TLS connection
+
+
+def warm_pinecone_pratt():
+    from tools.prattDatabaseTool import get_index
+    get_index().describe_index_stats()
+
+
+def warm_pinecone_aipi():
+    from tools.aipiDatabaseTool import get_retriever
+    get_retriever().index.describe_index_stats()
+
+
+def warm_http():
+    """Open pooled connections to the Duke streamer API and the search API."""
+    from utils.rate_limiter import get_limiter
+    from tools.curriculumTool import streamer_client, BASE_URL
+    from tools.webSearchTool import session, SEARCH_URL
+    # Any response will do: the point is the pooled TCP/TLS connection. The
+    # streamer HEAD still spends a "duke" request so the budget stays honest;
+    # the search API has no limiter, and a keyless HEAD isn't billed as a query.
+    get_limiter("duke").acquire(max_wait=5)
+    streamer_client.session.head(BASE_URL, timeout=5)
+    session.head(SEARCH_URL, timeout=5)
+
+
+def warm_openai():
+    """Shared chat and embeddings clients, with one tiny embedding call to open the connection."""
+    from utils.openai_client import get_chat_model, get_embeddings_model
+    get_chat_model()
+    get_embeddings_model().embed_query("warm-up")
+
+
+def default_steps() -> Dict[str, Callable[[], Any]]:
+    """Tool indexes, API clients and connections; independent of each other."""
+    return {
+        "professors": warm_professors,
+        "courses": warm_courses,
+        "events": warm_events,
+        "pinecone_mem": warm_pinecone_mem,
+        "pinecone_pratt": warm_pinecone_pratt,
+        "pinecone_aipi": warm_pinecone_aipi,
+        "http": warm_http,
+        "openai": warm_openai,
+    }
+
+
+def faq_questions(limit: int) -> List[str]:
+    """The first `limit` questions of the eval set, used as the FAQ list."""
+    from evaluation.eval_runner import load_questions
+    return load_questions(limit=limit) if limit > 0 else []
+
+
+def warmup_enabled() -> bool:
+    return os.getenv("WARMUP", "1").lower() not in ("0", "false", "no")